@@ -1,32 +1,43 @@
 """批量重新导入工具 - 清空数据库并重新导入所有Excel文件"""
 import sys
 import os
+import time
 import logging
 from pathlib import Path
 from database import DatabaseManager
 from data_processor import ExcelParser
+from utils.log_utils import setup_logging
+from utils.import_metrics import build_file_metrics, format_metrics, dump_metrics_json
 import config
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('batch_reimport.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
 sys.stdout.reconfigure(encoding='utf-8')
 
+# 配置日志（--verbose 输出解析的详细过程）
+setup_logging(
+    'batch_reimport.log',
+    verbose=config.LOG_VERBOSE or '--verbose' in sys.argv[1:],
+    max_bytes=config.LOG_MAX_BYTES,
+    backup_count=config.LOG_BACKUP_COUNT,
+    stream=sys.stdout
+)
+
 def confirm_action(message):
     """确认操作"""
     print(f"\n⚠️  {message}")
     response = input("确认执行? (yes/no): ").strip().lower()
     return response == 'yes'
 
-def batch_import_directory(db_manager, directory_path):
-    """批量导入目录下的所有Excel文件"""
+def batch_import_directory(db_manager, directory_path, force=False, bulk=False, metrics_json=None):
+    """
+    批量导入目录下的所有Excel文件
+    
+    Args:
+        db_manager: 数据库管理器
+        directory_path: 目录路径
+        force: 是否强制重新导入（默认跳过导入台账中未变化的文件）
+        bulk: 是否使用批量加载模式（延后重建索引和派生数据，用于清空后全量导入）
+        metrics_json: 导入指标JSON的保存路径（None 表示不保存）
+    """
     
     # 查找所有Excel文件
     excel_files = []
@@ -51,39 +62,85 @@ def batch_import_directory(db_manager, directory_path):
         return
     
     # 统计
-    success_count = 0
-    fail_count = 0
-    total_records = 0
+    stats = {'success': 0, 'failed': 0, 'unchanged': 0, 'records': 0, 'unparsable': 0, 'metrics': []}
+    
+    print(f"\n开始批量导入{'（批量加载模式）' if bulk else ''}...\n")
+    start_time = time.perf_counter()
     
-    print(f"\n开始批量导入...\n")
+    # 非批量加载模式下各文件逐个提交，派生数据在全部写入后一次刷新
+    with db_manager.bulk_load() if bulk else db_manager.deferred_maintenance():
+        import_files(db_manager, excel_files, force, stats)
+    
+    elapsed = time.perf_counter() - start_time
+    
+    print(f"\n{'='*80}")
+    print(f"批量导入完成！")
+    print(f"{'='*80}")
+    print(f"  成功文件: {stats['success']}")
+    print(f"  失败文件: {stats['failed']}")
+    print(f"  未变化跳过: {stats['unchanged']}")
+    print(f"  总记录数: {stats['records']:,}")
+    print(f"  无法解析的单元格: {stats['unparsable']:,}")
+    print(f"  总耗时: {elapsed:.1f} 秒{'（含重建索引和派生数据）' if bulk else ''}")
+    print(f"{'='*80}\n")
+    metrics = stats.pop('metrics')
+    logging.info(f"批量导入完成: {stats}, 耗时 {elapsed:.1f} 秒, 批量加载模式: {bulk}")
     
+    if metrics_json:
+        dump_metrics_json(metrics, metrics_json, {'bulk': bulk, 'elapsed_seconds': round(elapsed, 2)})
+        print(f"导入指标已保存到: {metrics_json}")
+
+def import_files(db_manager, excel_files, force, stats):
+    """
+    逐个导入Excel文件，结果累计到stats
+    
+    Args:
+        db_manager: 数据库管理器
+        excel_files: 文件路径列表
+        force: 是否强制重新导入
+        stats: 统计字典（success、failed、unchanged、records、unparsable、metrics）
+    """
     for i, file_path in enumerate(excel_files, 1):
         try:
             print(f"[{i}/{len(excel_files)}] 处理: {file_path.name}")
             
+            # 对照导入台账，跳过未变化的文件
+            record, signature = db_manager.find_unchanged_import(
+                str(file_path), ExcelParser.extract_date_from_filename(file_path.name)
+            )
+            if record is not None and not force:
+                if record['matched_by'] == 'hash':
+                    db_manager.add_import_history(
+                        file_path.name, record['trade_date'], 0, 'unchanged', None, signature
+                    )
+                print(f"  ⏭  文件未变化，已跳过（{record['trade_date']}）")
+                stats['unchanged'] += 1
+                continue
+            
             # 解析Excel
-            df, trade_date = ExcelParser.parse_excel(str(file_path), config.COLUMN_MAPPING)
+            parse_stats = {}
+            df, trade_date = ExcelParser.parse_excel(str(file_path), config.COLUMN_MAPPING, stats=parse_stats)
             
             # 插入数据
-            inserted, skipped = db_manager.insert_batch(df, trade_date)
+            insert_stats = {}
+            inserted, skipped = db_manager.insert_batch(df, trade_date, stats=insert_stats)
+            metrics = build_file_metrics(file_path.name, trade_date, inserted, parse_stats, insert_stats)
+            db_manager.add_import_history(
+                file_path.name, trade_date, inserted, 'success', None, signature, metrics
+            )
             
             print(f"  ✅ 成功导入 {inserted} 条, 跳过 {skipped} 条")
+            print(f"     {format_metrics(metrics)}")
+            stats['metrics'].append(metrics)
             
-            success_count += 1
-            total_records += inserted
+            stats['success'] += 1
+            stats['records'] += inserted
+            stats['unparsable'] += parse_stats.get('unparsable_cells', 0)
             
         except Exception as e:
             print(f"  ❌ 失败: {e}")
-            fail_count += 1
+            stats['failed'] += 1
             logging.error(f"导入失败: {file_path.name}, 错误: {e}", exc_info=True)
-    
-    print(f"\n{'='*80}")
-    print(f"批量导入完成！")
-    print(f"{'='*80}")
-    print(f"  成功文件: {success_count}")
-    print(f"  失败文件: {fail_count}")
-    print(f"  总记录数: {total_records:,}")
-    print(f"{'='*80}\n")
 
 def main():
     """主函数"""
@@ -91,15 +148,33 @@ def main():
     print("批量重新导入工具")
     print("="*80)
     
-    # 可选：清空整个数据库
-    if len(sys.argv) > 1 and sys.argv[1] == '--clear':
+    # --force: 忽略导入台账，重新导入所有文件
+    force = '--force' in sys.argv[1:]
+    
+    # --no-bulk: 清空后仍按普通方式逐个导入（用于对比批量加载模式的耗时）
+    # 仅与 --clear 同时使用时生效，不清空时本来就是逐个导入
+    no_bulk = '--no-bulk' in sys.argv[1:]
+    if no_bulk and '--clear' not in sys.argv[1:]:
+        print("⚠️  --no-bulk 仅与 --clear 同时使用时生效，已忽略")
+    
+    # --metrics-json <路径>: 保存各文件的导入指标，用于回归对比
+    metrics_json = None
+    if '--metrics-json' in sys.argv[1:]:
+        index = sys.argv.index('--metrics-json')
+        if index + 1 >= len(sys.argv):
+            print("❌ --metrics-json 需要指定保存路径")
+            return
+        metrics_json = sys.argv[index + 1]
+    
+    # 可选：清空整个数据库（清空后使用批量加载模式全量导入）
+    bulk = False
+    if '--clear' in sys.argv[1:]:
         if confirm_action("这将删除数据库中的所有数据！"):
             db_manager = DatabaseManager(config.DB_PATH)
-            cursor = db_manager.connection.cursor()
-            cursor.execute("DELETE FROM stock_daily")
-            deleted = cursor.rowcount
-            db_manager.connection.commit()
+            deleted = db_manager.clear_all()
+            db_manager.close()
             print(f"✅ 已删除 {deleted:,} 条旧数据\n")
+            bulk = not no_bulk
         else:
             print("已取消清空操作")
             return
@@ -113,10 +188,9 @@ def main():
     current_count = cursor.fetchone()[0]
     print(f"\n当前数据库记录数: {current_count:,}")
     
-    cursor.execute("SELECT MIN(trade_date), MAX(trade_date) FROM stock_daily")
-    date_range = cursor.fetchone()
-    if date_range[0]:
-        print(f"日期范围: {date_range[0]} 到 {date_range[1]}")
+    dates = db_manager.get_all_dates()
+    if dates:
+        print(f"日期范围: {dates[-1]} 到 {dates[0]}")
     
     # 选择导入目录
     print(f"\n请选择要导入的目录:")
@@ -143,16 +217,14 @@ def main():
         return
     
     # 批量导入
-    batch_import_directory(db_manager, directory)
+    batch_import_directory(db_manager, directory, force=force, bulk=bulk, metrics_json=metrics_json)
     
     # 显示最终统计
     cursor.execute("SELECT COUNT(*) FROM stock_daily")
     final_count = cursor.fetchone()[0]
     print(f"\n最终数据库记录数: {final_count:,}")
     
-    cursor.execute("SELECT COUNT(DISTINCT trade_date) FROM stock_daily")
-    date_count = cursor.fetchone()[0]
-    print(f"包含交易日数: {date_count}")
+    print(f"包含交易日数: {len(db_manager.get_all_dates())}")
 
 if __name__ == '__main__':
     try:
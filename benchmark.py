@@ -0,0 +1,418 @@
+"""性能基准测试工具 - 对比优化前后的实现
+
+用法:
+    python benchmark.py insert [--rows 5000] [--repeat 3]
+    python benchmark.py comparison [--rows 5000] [--repeat 3]
+    python benchmark.py bulk [--rows 5000] [--days 20]
+    python benchmark.py history [--rows 2000] [--days 500] [--repeat 5]
+    python benchmark.py cache [--rows 5000] [--days 22] [--repeat 3]
+    python benchmark.py memory [--rows 5000] [--days 22]
+    python benchmark.py export [--rows 5000] [--days 5] [--format csv]
+"""
+import sys
+import os
+import time
+import argparse
+import contextlib
+import tempfile
+import logging
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import config
+from database import DatabaseManager
+from database.db_manager import DEFAULT_QUERY_COLUMNS
+from utils.export_utils import create_export_writer
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def make_sample_data(rows: int, seed: int = 0) -> pd.DataFrame:
+    """生成与ExcelParser输出结构一致的模拟数据"""
+    rng = np.random.default_rng(seed)
+    sectors = ['银行', '券商', '半导体', '光伏设备', '白酒', '汽车整车', '医疗器械', '软件开发']
+
+    df = pd.DataFrame({
+        'stock_code': [str(i).zfill(6) for i in range(1, rows + 1)],
+        'stock_name': [f"股票{i}" for i in range(1, rows + 1)],
+        'current_price': rng.uniform(2, 200, rows).round(2),
+        'price_change': rng.normal(0, 3, rows).round(2),
+        'description': ['模拟数据'] * rows,
+        'sector': ['、'.join(rng.choice(sectors, 2, replace=False)) for _ in range(rows)],
+        'main_net_amount': rng.normal(0, 5000, rows).round(1),
+        'auction_today_volume': rng.uniform(100, 500000, rows).round(1),
+        'real_market_value': rng.uniform(1e4, 1e7, rows).round(1),
+        'flow_ratio': rng.normal(0, 5, rows).round(2),
+        'net_ratio': rng.normal(0, 5, rows).round(2),
+        'real_turnover_rate': rng.uniform(0, 30, rows).round(2),
+        'turnover_rate': rng.uniform(0, 20, rows).round(2),
+        'volume_ratio': rng.uniform(0.1, 5, rows).round(2),
+        'popularity_value': rng.uniform(0, 1e5, rows).round(0),
+    })
+
+    # 模拟少量缺失值
+    df.loc[df.sample(frac=0.02, random_state=seed).index, 'main_net_amount'] = np.nan
+    return df
+
+
+def legacy_insert_batch(db_manager: DatabaseManager, data: pd.DataFrame, trade_date: str):
+    """优化前的逐行插入实现（iterrows + 单条execute），仅用于对比"""
+    cursor = db_manager.connection.cursor()
+    inserted = 0
+    skipped = 0
+
+    for _, row in data.iterrows():
+        try:
+            cursor.execute('''
+                INSERT OR REPLACE INTO stock_daily
+                (trade_date, stock_code, stock_name, current_price, price_change,
+                 description, sector, main_net_amount, auction_today_volume,
+                 real_market_value, flow_ratio, net_ratio, real_turnover_rate,
+                 turnover_rate, volume_ratio, popularity_value,
+                 auction_net_amount, auction_increase, auction_main_net,
+                 auction_yesterday_volume, main_net_ratio, buy_sell_ratio,
+                 popularity_change)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                trade_date,
+                row.get('stock_code'), row.get('stock_name'), row.get('current_price'),
+                row.get('price_change'), row.get('description'), row.get('sector'),
+                row.get('main_net_amount'), row.get('auction_today_volume'),
+                row.get('real_market_value'), row.get('flow_ratio'), row.get('net_ratio'),
+                row.get('real_turnover_rate'), row.get('turnover_rate'), row.get('volume_ratio'),
+                row.get('popularity_value'), row.get('auction_net_amount'),
+                row.get('auction_increase'), row.get('auction_main_net'),
+                row.get('auction_yesterday_volume'), row.get('main_net_ratio'),
+                row.get('buy_sell_ratio'), row.get('popularity_change'),
+            ))
+            inserted += 1
+        except Exception:
+            skipped += 1
+
+    db_manager.connection.commit()
+    return inserted, skipped
+
+
+def legacy_query_comparison(db_manager: DatabaseManager, trade_date: str,
+                            stock_code: str = None) -> pd.DataFrame:
+    """优化前的前日对比实现（整天查询前一日 + iterrows逐行查字典），仅用于对比"""
+    today_df = db_manager.query_by_date(trade_date, stock_code)
+    prev_date = db_manager._get_previous_trade_date(trade_date)
+    prev_df = db_manager.query_by_date(prev_date)
+    prev_dict = prev_df.set_index('stock_code')[['main_net_amount', 'auction_today_volume']].to_dict('index')
+
+    main_net_ratios = []
+    volume_ratios = []
+    for _, row in today_df.iterrows():
+        code = row['stock_code']
+        main_ratio = None
+        vol_ratio = None
+        if code in prev_dict:
+            today_main = row.get('main_net_amount')
+            prev_main = prev_dict[code].get('main_net_amount')
+            if pd.notna(today_main) and pd.notna(prev_main) and prev_main != 0:
+                main_ratio = today_main / prev_main
+            today_vol = row.get('auction_today_volume')
+            prev_vol = prev_dict[code].get('auction_today_volume')
+            if pd.notna(today_vol) and pd.notna(prev_vol) and prev_vol != 0:
+                vol_ratio = today_vol / prev_vol
+        main_net_ratios.append(main_ratio)
+        volume_ratios.append(vol_ratio)
+
+    today_df['main_net_prev_ratio'] = main_net_ratios
+    today_df['volume_prev_ratio'] = volume_ratios
+    return today_df
+
+
+def _time_it(func, repeat: int) -> float:
+    """执行多次，返回最快一次的耗时（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_insert(args):
+    """对比 insert_batch 与优化前逐行插入的写入速度，并列出 insert_batch 各阶段耗时"""
+    data = make_sample_data(args.rows)
+    stats = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DatabaseManager(os.path.join(tmp_dir, 'bench.db'))
+        try:
+            legacy = _time_it(lambda: legacy_insert_batch(db, data, '2025-01-02'), args.repeat)
+            bulk = _time_it(lambda: db.insert_batch(data, '2025-01-03', stats=stats), args.repeat)
+        finally:
+            db.close()
+
+    print(f"\n写入 {args.rows:,} 行（取 {args.repeat} 次中最快一次）")
+    print(f"  逐行插入 (iterrows):    {legacy:8.3f} 秒  {args.rows / legacy:12,.0f} 行/秒")
+    print(f"  批量插入 (executemany): {bulk:8.3f} 秒  {args.rows / bulk:12,.0f} 行/秒")
+    print(f"  提升: {legacy / bulk:.1f}x")
+    # 逐行插入不维护派生数据；批量插入中派生数据（交易日历、板块、汇总、历史、前日对比）占比较大
+    print("  批量插入各阶段（最后一次）: " + "，".join(
+        f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in stats.items()
+    ))
+
+
+def bench_comparison(args):
+    """对比前日对比值的三种计算方式：iterrows逐行、SQL自连接、导入时持久化"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DatabaseManager(os.path.join(tmp_dir, 'bench.db'))
+        try:
+            db.insert_batch(make_sample_data(args.rows, seed=1), '2025-01-02')
+            db.insert_batch(make_sample_data(args.rows, seed=2), '2025-01-03')
+
+            print(f"\n前日对比查询，每日 {args.rows:,} 行（取 {args.repeat} 次中最快一次）")
+            for label, code in [('整天', None), ('单只股票', '000100')]:
+                legacy = _time_it(lambda: legacy_query_comparison(db, '2025-01-03', code), args.repeat)
+                live = _time_it(lambda: db.query_by_date_with_comparison(
+                    '2025-01-03', stock_code=code, live=True), args.repeat)
+                stored = _time_it(lambda: db.query_by_date_with_comparison(
+                    '2025-01-03', stock_code=code), args.repeat)
+
+                print(f"  [{label}]")
+                print(f"    逐行计算 (iterrows): {legacy * 1000:9.1f} ms")
+                print(f"    SQL自连接 (live):    {live * 1000:9.1f} ms  提升 {legacy / live:.1f}x")
+                print(f"    持久化读取:          {stored * 1000:9.1f} ms  提升 {legacy / stored:.1f}x")
+        finally:
+            db.close()
+
+
+def bench_bulk(args):
+    """对比全量导入的三种方式：逐日维护派生数据、派生数据延后一次刷新、批量加载模式（另外延后建索引、关闭日志）"""
+    days = [make_sample_data(args.rows, seed=day) for day in range(args.days)]
+    dates = [f"2025-{1 + day // 28:02d}-{1 + day % 28:02d}" for day in range(args.days)]
+
+    def load(db_path: str, mode: str) -> float:
+        db = DatabaseManager(db_path)
+        try:
+            start = time.perf_counter()
+            if mode == 'bulk':
+                context = db.bulk_load()
+            elif mode == 'deferred':
+                context = db.deferred_maintenance()
+            else:
+                context = contextlib.nullcontext()
+            with context:
+                for data, trade_date in zip(days, dates):
+                    db.insert_batch(data, trade_date)
+            return time.perf_counter() - start
+        finally:
+            db.close()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        normal = load(os.path.join(tmp_dir, 'normal.db'), 'normal')
+        deferred = load(os.path.join(tmp_dir, 'deferred.db'), 'deferred')
+        bulk = load(os.path.join(tmp_dir, 'bulk.db'), 'bulk')
+
+    total_rows = args.rows * args.days
+    print(f"\n全量导入 {args.days} 天 × {args.rows:,} 行 = {total_rows:,} 行")
+    print(f"  逐日导入（派生数据逐日维护）: {normal:8.2f} 秒  {total_rows / normal:12,.0f} 行/秒")
+    print(f"  派生数据延后一次刷新:         {deferred:8.2f} 秒  {total_rows / deferred:12,.0f} 行/秒"
+          f"  提升 {normal / deferred:.1f}x")
+    print(f"  批量加载模式:                 {bulk:8.2f} 秒  {total_rows / bulk:12,.0f} 行/秒"
+          f"  提升 {normal / bulk:.1f}x")
+
+
+def bench_history(args):
+    """对比单只股票历史的读取方式：stock_daily 按日期范围查询 vs 按代码聚簇的股票历史表"""
+    dates = pd.bdate_range('2023-01-02', periods=args.days).strftime('%Y-%m-%d').tolist()
+    stock_code = str(args.rows // 2).zfill(6)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DatabaseManager(os.path.join(tmp_dir, 'bench.db'))
+        try:
+            with db.bulk_load():
+                for day, trade_date in enumerate(dates):
+                    db.insert_batch(make_sample_data(args.rows, seed=day), trade_date)
+
+            by_range = _time_it(
+                lambda: db.query_by_date_range(dates[0], dates[-1], stock_code), args.repeat)
+            by_history = _time_it(lambda: db.get_stock_history(stock_code), args.repeat)
+        finally:
+            db.close()
+
+    print(f"\n单只股票 {args.days} 个交易日的历史，每日 {args.rows:,} 行（取 {args.repeat} 次中最快一次）")
+    print(f"  stock_daily 日期范围查询 (DataFrame): {by_range * 1000:9.2f} ms")
+    print(f"  股票历史表 (NumPy数组):               {by_history * 1000:9.2f} ms  提升 {by_range / by_history:.1f}x")
+
+
+def _peak_memory(func) -> int:
+    """执行一次，返回期间Python堆内存的峰值增量（字节）"""
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak
+
+
+def bench_cache(args):
+    """对比多日范围查询：SQLite (read_sql_query) vs 内存映射的列式缓存"""
+    dates = pd.bdate_range('2025-01-02', periods=args.days).strftime('%Y-%m-%d').tolist()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_enabled, config.COLUMN_CACHE_ENABLED = config.COLUMN_CACHE_ENABLED, True
+        try:
+            db = DatabaseManager(os.path.join(tmp_dir, 'bench.db'))
+        finally:
+            config.COLUMN_CACHE_ENABLED = cache_enabled
+        try:
+            for day, trade_date in enumerate(dates):
+                db.insert_batch(make_sample_data(args.rows, seed=day), trade_date)
+
+            def query():
+                return db.query_by_date_range(dates[0], dates[-1])
+
+            cached = _time_it(query, args.repeat)
+            cached_peak = _peak_memory(query)
+
+            column_cache, db._column_cache = db._column_cache, None
+            try:
+                sqlite = _time_it(query, args.repeat)
+                sqlite_peak = _peak_memory(query)
+            finally:
+                db._column_cache = column_cache
+        finally:
+            db.close()
+
+    total_rows = args.rows * args.days
+    print(f"\n读取 {args.days} 个交易日 × {args.rows:,} 行 = {total_rows:,} 行（取 {args.repeat} 次中最快一次）")
+    print(f"  SQLite (read_sql_query): {sqlite * 1000:9.1f} ms  峰值内存 {sqlite_peak / 1024 / 1024:8.1f} MB")
+    print(f"  列式缓存 (内存映射):     {cached * 1000:9.1f} ms  峰值内存 {cached_peak / 1024 / 1024:8.1f} MB")
+    print(f"  提升: 耗时 {sqlite / cached:.1f}x，内存 {sqlite_peak / cached_peak:.1f}x")
+
+
+def bench_memory(args):
+    """对比查询结果的内存占用：SELECT * 的默认类型 vs 列裁剪后的紧凑类型"""
+    dates = pd.bdate_range('2025-01-02', periods=args.days).strftime('%Y-%m-%d').tolist()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DatabaseManager(os.path.join(tmp_dir, 'bench.db'))
+        try:
+            for day, trade_date in enumerate(dates):
+                db.insert_batch(make_sample_data(args.rows, seed=day), trade_date)
+
+            cases = [
+                ('单日', lambda: pd.read_sql_query(
+                    "SELECT * FROM stock_daily WHERE trade_date = ? ORDER BY stock_code",
+                    db._reader(), params=[dates[-1]]),
+                 lambda: db.query_by_date(dates[-1])),
+                (f'{args.days}日', lambda: pd.read_sql_query(
+                    "SELECT * FROM stock_daily WHERE trade_date BETWEEN ? AND ? ORDER BY trade_date, stock_code",
+                    db._reader(), params=[dates[0], dates[-1]]),
+                 lambda: db.query_by_date_range(dates[0], dates[-1])),
+            ]
+
+            print(f"\n查询结果内存占用（每日 {args.rows:,} 行，memory_usage(deep=True)）")
+            for label, legacy_query, lean_query in cases:
+                legacy_df = legacy_query()
+                lean_df = lean_query()
+                legacy_mb = legacy_df.memory_usage(deep=True).sum() / 1024 / 1024
+                lean_mb = lean_df.memory_usage(deep=True).sum() / 1024 / 1024
+                print(f"  [{label}]")
+                print(f"    SELECT * ({legacy_df.shape[1]} 列):     {legacy_mb:8.2f} MB")
+                print(f"    紧凑类型 ({lean_df.shape[1]} 列):       {lean_mb:8.2f} MB  减少 {legacy_mb / lean_mb:.1f}x")
+        finally:
+            db.close()
+
+
+def bench_export(args):
+    """对比导出方式：一次性查询后 to_excel/to_csv vs 分块流式导出"""
+    dates = pd.bdate_range('2025-01-02', periods=args.days).strftime('%Y-%m-%d').tolist()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DatabaseManager(os.path.join(tmp_dir, 'bench.db'))
+        try:
+            for day, trade_date in enumerate(dates):
+                db.insert_batch(make_sample_data(args.rows, seed=day), trade_date)
+
+            file_path = os.path.join(tmp_dir, f"export.{args.format}")
+
+            def legacy_export():
+                df = db.query_by_date_range(dates[0], dates[-1])
+                if args.format == 'xlsx':
+                    df.to_excel(file_path, index=False, engine='openpyxl')
+                else:
+                    df.to_csv(file_path, index=False, encoding='utf-8-sig')
+
+            def streaming_export():
+                writer = create_export_writer(file_path, args.format, DEFAULT_QUERY_COLUMNS)
+                for chunk in db.iter_date_range(dates[0], dates[-1]):
+                    writer.write(chunk)
+                writer.finish()
+
+            results = []
+            for export in (legacy_export, streaming_export):
+                start = time.perf_counter()
+                export()
+                elapsed = time.perf_counter() - start
+                results.append((elapsed, _peak_memory(export)))
+        finally:
+            db.close()
+
+    (legacy_time, legacy_peak), (stream_time, stream_peak) = results
+    total_rows = args.rows * args.days
+    print(f"\n导出 {args.days} 个交易日 × {args.rows:,} 行 = {total_rows:,} 行（{args.format}）")
+    print(f"  一次性查询后写出: {legacy_time:8.2f} s  峰值内存 {legacy_peak / 1024 / 1024:8.1f} MB")
+    print(f"  分块流式导出:     {stream_time:8.2f} s  峰值内存 {stream_peak / 1024 / 1024:8.1f} MB")
+    print(f"  峰值内存减少 {legacy_peak / stream_peak:.1f}x")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="性能基准测试")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    insert_parser = subparsers.add_parser('insert', help='批量写入 vs 逐行写入')
+    insert_parser.add_argument('--rows', type=int, default=5000, help='模拟数据行数')
+    insert_parser.add_argument('--repeat', type=int, default=3, help='重复次数')
+    insert_parser.set_defaults(func=bench_insert)
+
+    comparison_parser = subparsers.add_parser('comparison', help='前日对比计算方式对比')
+    comparison_parser.add_argument('--rows', type=int, default=5000, help='每日模拟数据行数')
+    comparison_parser.add_argument('--repeat', type=int, default=3, help='重复次数')
+    comparison_parser.set_defaults(func=bench_comparison)
+
+    bulk_parser = subparsers.add_parser('bulk', help='批量加载模式 vs 逐日导入')
+    bulk_parser.add_argument('--rows', type=int, default=5000, help='每日模拟数据行数')
+    bulk_parser.add_argument('--days', type=int, default=20, help='模拟交易日数')
+    bulk_parser.set_defaults(func=bench_bulk)
+
+    history_parser = subparsers.add_parser('history', help='单只股票历史读取方式对比')
+    history_parser.add_argument('--rows', type=int, default=2000, help='每日模拟数据行数')
+    history_parser.add_argument('--days', type=int, default=500, help='模拟交易日数')
+    history_parser.add_argument('--repeat', type=int, default=5, help='重复次数')
+    history_parser.set_defaults(func=bench_history)
+
+    cache_parser = subparsers.add_parser('cache', help='多日范围查询：SQLite vs 列式缓存')
+    cache_parser.add_argument('--rows', type=int, default=5000, help='每日模拟数据行数')
+    cache_parser.add_argument('--days', type=int, default=22, help='模拟交易日数')
+    cache_parser.add_argument('--repeat', type=int, default=3, help='重复次数')
+    cache_parser.set_defaults(func=bench_cache)
+
+    memory_parser = subparsers.add_parser('memory', help='查询结果内存占用：SELECT * vs 紧凑类型')
+    memory_parser.add_argument('--rows', type=int, default=5000, help='每日模拟数据行数')
+    memory_parser.add_argument('--days', type=int, default=22, help='模拟交易日数')
+    memory_parser.set_defaults(func=bench_memory)
+
+    export_parser = subparsers.add_parser('export', help='一次性导出 vs 分块流式导出')
+    export_parser.add_argument('--rows', type=int, default=5000, help='每日模拟数据行数')
+    export_parser.add_argument('--days', type=int, default=5, help='模拟交易日数')
+    export_parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv', help='导出格式')
+    export_parser.set_defaults(func=bench_export)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    sys.stdout.reconfigure(encoding='utf-8')
+    main()
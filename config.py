@@ -6,6 +6,13 @@ import os
 # 数据库配置
 DB_NAME = "stock_data.db"
 DB_PATH = os.path.join(os.path.dirname(__file__), DB_NAME)
+DB_BUSY_TIMEOUT_MS = 5000  # 数据库被锁定时的等待时间（毫秒）
+DB_CACHE_SIZE_KB = 65536  # 每个连接的页缓存大小（KB）
+DB_MMAP_SIZE = 256 * 1024 * 1024  # 内存映射读取的大小（字节）
+COLUMN_CACHE_ENABLED = False  # 按交易日分区的列式缓存（数据库文件旁的 .columns 目录）：首次查询某天时写入，之后内存映射读取
+QUERY_PROFILING = False  # 记录查询方法的耗时（SQLite / DataFrame 分开统计），也可用 --profile 启动或在"性能"窗口中开启
+SLOW_QUERY_MS = 500  # 慢查询阈值（毫秒），超过时连同查询计划写入日志
+PROFILER_WINDOW = 500  # 每个查询方法保留的最近耗时样本数（用于计算 p50/p95）
 
 # 应用配置
 APP_NAME = "股票数据分析系统"
@@ -13,7 +20,20 @@ APP_VERSION = "1.0.0"
 
 # 表格配置
 DEFAULT_PAGE_SIZE = 500  # 每页显示行数
-MAX_DISPLAY_ROWS = 10000  # 最大显示行数
+MAX_DISPLAY_ROWS = None  # 最大显示行数（None 表示不限制，表格按需渲染可见行）
+
+# 日志配置
+LOG_FILE = "stock_analysis.log"
+LOG_VERBOSE = False  # 输出解析的详细过程（列名、每列映射、样本行、每个无法解析的单元格），也可用 --verbose 启动
+LOG_MAX_BYTES = 10 * 1024 * 1024  # 单个日志文件的最大字节数，超过后轮转
+LOG_BACKUP_COUNT = 5  # 保留的轮转日志文件数
+
+# 导出配置
+EXPORT_CHUNK_ROWS = 5000  # 导出时每次从数据库读取的行数
+
+# 导入配置
+IMPORT_WORKERS = None  # 并行解析Excel的进程数（None表示按CPU核数自动选择，1表示串行）
+EXCEL_STREAMING_READ = True  # 以只读流式方式读取xlsx，只读取已映射的列
 
 # Excel列名映射（根据您的数据格式）
 COLUMN_MAPPING = {
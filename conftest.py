@@ -0,0 +1,50 @@
+"""测试公共数据 - 生成测试行情并提供预先导入若干交易日的数据库"""
+import os
+
+import pandas as pd
+import pytest
+
+from database import DatabaseManager
+
+
+def _make_day(seed: int, rows: int = 200) -> pd.DataFrame:
+    """生成一天的测试数据"""
+    sectors = ['银行', '券商', '半导体', '白酒']
+    return pd.DataFrame({
+        'stock_code': [str(i).zfill(6) for i in range(1, rows + 1)],
+        'stock_name': [f"股票{i}" for i in range(1, rows + 1)],
+        'sector': [f"{sectors[(i + seed) % 4]}、{sectors[(i + seed + 1) % 4]}" for i in range(rows)],
+        'main_net_amount': [float((i * 7 + seed) % 200 - 100) for i in range(rows)],
+        'auction_today_volume': [float(i + seed + 1) for i in range(rows)],
+        'auction_yesterday_volume': [float(i + 1) for i in range(rows)],
+        'turnover_rate': [float(i % 30) for i in range(rows)],
+    })
+
+
+@pytest.fixture
+def make_day():
+    """生成一天测试数据的函数：make_day(seed, rows=200)"""
+    return _make_day
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    """界面相关测试共用的 QApplication（无显示环境下使用 offscreen 平台）"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    QtWidgets = pytest.importorskip('PyQt5.QtWidgets')
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def trade_dates():
+    """db 中已导入的交易日"""
+    return ['2025-01-02', '2025-01-03', '2025-01-06']
+
+
+@pytest.fixture
+def db(tmp_path, trade_dates, make_day):
+    db_manager = DatabaseManager(str(tmp_path / 'test.db'))
+    for seed, trade_date in enumerate(trade_dates, start=1):
+        db_manager.insert_batch(make_day(seed), trade_date)
+    yield db_manager
+    db_manager.close()
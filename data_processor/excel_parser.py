@@ -3,12 +3,22 @@ Excel数据解析模块
 """
 import os
 import re
+import time
 import logging
 from datetime import datetime
-from typing import Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+import numpy as np
 import pandas as pd
 import openpyxl
 
+from utils.memory_utils import get_rss_mb
+
+
+logger = logging.getLogger(__name__)
+
+# 每列汇总日志中列出的无法解析的示例值个数
+UNPARSABLE_SAMPLE_COUNT = 3
+
 
 class ExcelParser:
     """Excel文件解析器"""
@@ -37,77 +47,240 @@ class ExcelParser:
         return None
     
     @staticmethod
-    def parse_excel(file_path: str, column_mapping: dict = None) -> Tuple[pd.DataFrame, str]:
+    def parse_excel(file_path: str, column_mapping: dict = None,
+                    streaming: bool = True, stats: dict = None) -> Tuple[pd.DataFrame, str]:
         """
         解析Excel文件
         
         Args:
             file_path: Excel文件路径
             column_mapping: 列名映射字典
+            streaming: 是否使用流式读取（仅对.xlsx生效，只读取已映射的列）
+            stats: 可选的统计字典，用于回填解析耗时（含 read/normalize/clean 各阶段）、
+                   行数、文件字节数、解析前后本进程的常驻内存增量等信息
             
         Returns:
             (DataFrame, 交易日期)
         """
+        start_time = time.perf_counter()
+        start_rss = get_rss_mb() if stats is not None else None
+        filename = os.path.basename(file_path)
+        unparsable = {}
+        timings = {}
+        
         try:
+            logger.info("📁 开始解析Excel文件: %s", filename)
+            
             # 读取Excel文件
-            if file_path.endswith('.xlsx'):
-                df = pd.read_excel(file_path, engine='openpyxl')
-            elif file_path.endswith('.xls'):
-                df = pd.read_excel(file_path, engine='xlrd')
+            if streaming and file_path.endswith('.xlsx'):
+                df_normalized, first_date = ExcelParser._parse_streaming(
+                    file_path, column_mapping, unparsable, timings
+                )
             else:
-                raise ValueError(f"不支持的文件格式: {file_path}")
-            
-            filename = os.path.basename(file_path)
-            
-            # 🔍 详细日志：打印Excel原始信息
-            logging.info(f"\n{'='*80}")
-            logging.info(f"📁 开始解析Excel文件: {filename}")
-            logging.info(f"{'='*80}")
-            logging.info(f"📊 Excel数据形状: {df.shape[0]} 行 × {df.shape[1]} 列")
-            logging.info(f"📋 Excel列名列表（共{len(df.columns)}列）:")
-            for i, col in enumerate(df.columns, 1):
-                logging.info(f"    {i:2d}. {col}")
-            
-            # 打印第一行数据作为样本
-            if len(df) > 0:
-                logging.info(f"\n💡 第一行数据示例:")
-                for col in df.columns[:10]:  # 只显示前10列
-                    value = df[col].iloc[0]
-                    logging.info(f"    {col}: {value}")
-                if len(df.columns) > 10:
-                    logging.info(f"    ... (还有 {len(df.columns)-10} 列)")
+                read_start = time.perf_counter()
+                if file_path.endswith('.xlsx'):
+                    df = pd.read_excel(file_path, engine='openpyxl')
+                elif file_path.endswith('.xls'):
+                    df = pd.read_excel(file_path, engine='xlrd')
+                else:
+                    raise ValueError(f"不支持的文件格式: {file_path}")
+                timings['read'] = time.perf_counter() - read_start
+                
+                ExcelParser._log_raw_frame(df)
+                first_date = None
+                if '交易日期' in df.columns:
+                    dates = df['交易日期'].dropna()
+                    first_date = dates.iloc[0] if len(dates) > 0 else None
+                
+                # 数据标准化
+                df_normalized = ExcelParser._normalize_data(df, column_mapping, filename, unparsable, timings)
             
             # 从文件名提取日期
             trade_date = ExcelParser.extract_date_from_filename(filename)
             
             if not trade_date:
-                logging.warning(f"⚠️  无法从文件名提取日期: {filename}")
+                logger.warning("⚠️  无法从文件名提取日期: %s", filename)
                 # 尝试从数据中获取日期
-                if '交易日期' in df.columns:
-                    first_date = df['交易日期'].iloc[0]
-                    if pd.notna(first_date):
-                        trade_date = str(first_date).split()[0]
-                        logging.info(f"✓ 从数据列中获取日期: {trade_date}")
-            else:
-                logging.info(f"✓ 从文件名提取日期: {trade_date}")
+                if first_date is not None and pd.notna(first_date):
+                    trade_date = str(first_date).split()[0]
+                    logger.info("✓ 从数据列中获取日期: %s", trade_date)
             
-            # 数据标准化
-            df_normalized = ExcelParser._normalize_data(df, column_mapping, filename)
+            elapsed = time.perf_counter() - start_time
+            unparsable_total = sum(unparsable.values())
+            
+            logger.info(
+                "✅ Excel解析完成: %s，%d 条记录，交易日期 %s，无法解析的单元格 %d 个，耗时 %.2f 秒",
+                filename, len(df_normalized), trade_date, unparsable_total, elapsed
+            )
             
-            logging.info(f"\n✅ Excel解析完成: {filename}")
-            logging.info(f"   - 导入记录数: {len(df_normalized)}")
-            logging.info(f"   - 交易日期: {trade_date}")
-            logging.info(f"{'='*80}\n")
+            if stats is not None:
+                stats['parse_seconds'] = elapsed
+                stats['rows'] = len(df_normalized)
+                end_rss = get_rss_mb()
+                stats['rss_delta_mb'] = end_rss - start_rss if None not in (start_rss, end_rss) else None
+                stats['unparsable_cells'] = unparsable_total
+                stats['unparsable_columns'] = unparsable
+                stats['stage_seconds'] = timings
+                stats['file_bytes'] = os.path.getsize(file_path)
             
             return df_normalized, trade_date
             
         except Exception as e:
-            logging.error(f"❌ 解析Excel失败: {file_path}")
-            logging.error(f"   错误信息: {str(e)}", exc_info=True)
+            logger.error("❌ 解析Excel失败: %s, 错误信息: %s", file_path, e, exc_info=True)
             raise
     
     @staticmethod
-    def _normalize_data(df: pd.DataFrame, column_mapping: dict = None, filename: str = "") -> pd.DataFrame:
+    def parse_excel_with_stats(file_path: str, column_mapping: dict = None,
+                               streaming: bool = True) -> Tuple[pd.DataFrame, str, dict]:
+        """
+        解析Excel文件并返回统计信息（供进程池调用，统计结果随返回值传回主进程）
+        
+        Args:
+            file_path: Excel文件路径
+            column_mapping: 列名映射字典
+            streaming: 是否使用流式读取
+            
+        Returns:
+            (DataFrame, 交易日期, 统计字典)
+        """
+        stats = {}
+        df, trade_date = ExcelParser.parse_excel(file_path, column_mapping, streaming, stats)
+        return df, trade_date, stats
+    
+    @staticmethod
+    def _log_raw_frame(df: pd.DataFrame):
+        """打印Excel原始信息（列名和第一行样本，仅详细日志）"""
+        logger.info("📊 Excel数据形状: %d 行 × %d 列", df.shape[0], df.shape[1])
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        
+        ExcelParser._log_columns(list(df.columns))
+        
+        # 打印第一行数据作为样本
+        if len(df) > 0:
+            ExcelParser._log_first_row("💡 第一行数据示例:", df)
+    
+    @staticmethod
+    def _log_columns(columns: List):
+        """打印Excel列名列表（仅详细日志）"""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "📋 Excel列名列表（共%d列）:\n%s", len(columns),
+                "\n".join(f"    {i:2d}. {col}" for i, col in enumerate(columns, 1))
+            )
+    
+    @staticmethod
+    def _log_first_row(title: str, df: pd.DataFrame):
+        """打印第一行数据（只显示前10列，仅详细日志）"""
+        lines = [f"    {col}: {df[col].iloc[0]}" for col in df.columns[:10]]
+        if len(df.columns) > 10:
+            lines.append(f"    ... (还有 {len(df.columns)-10} 列)")
+        logger.debug("%s\n%s", title, "\n".join(lines))
+    
+    @staticmethod
+    def _log_mapping(mapping_lines: List[str], unmapped_excel_cols: List):
+        """
+        打印列名映射结果
+        
+        每列的映射过程只在详细日志中输出，未配置映射的列合并为一条警告。
+        """
+        if mapping_lines and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔄 列名映射:\n%s", "\n".join(mapping_lines))
+        if unmapped_excel_cols:
+            logger.warning(
+                "⚠️  以下 %d 个Excel列未配置映射（将被忽略）: %s",
+                len(unmapped_excel_cols), ", ".join(str(col) for col in unmapped_excel_cols)
+            )
+    
+    @staticmethod
+    def _parse_streaming(file_path: str, column_mapping: dict = None,
+                         unparsable: Dict[str, int] = None,
+                         timings: Dict[str, float] = None) -> Tuple[pd.DataFrame, object]:
+        """
+        流式解析xlsx文件
+        
+        以只读、仅取值模式打开工作簿，表头只解析一次，逐行只保留已映射的列，
+        未映射的列不会被构建成DataFrame。
+        
+        Args:
+            file_path: Excel文件路径
+            column_mapping: 列名映射
+            unparsable: 可选，回填各列无法解析的单元格数（键为Excel列名）
+            timings: 可选，回填各阶段耗时（read: 读取工作簿，normalize: 按列组装，clean: 清洗）
+            
+        Returns:
+            (清洗后的DataFrame, 第一个非空"交易日期"单元格的原始值或None)
+        """
+        if column_mapping is None:
+            column_mapping = {}
+        if timings is None:
+            timings = {}
+        
+        read_start = time.perf_counter()
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None) or ()
+            header = [str(cell) if cell is not None else None for cell in header]
+            width = len(header)
+            
+            ExcelParser._log_columns(header)
+            
+            # 解析表头，确定需要读取的列位置（同一目标列只取第一次出现的Excel列）
+            indices = []
+            db_columns = []
+            source_columns = {}
+            unmapped_excel_cols = []
+            mapping_lines = []
+            for idx, excel_col in enumerate(header):
+                db_col = column_mapping.get(excel_col)
+                if db_col is None:
+                    unmapped_excel_cols.append(excel_col)
+                elif db_col in db_columns:
+                    mapping_lines.append(f"    ⚠️  跳过: '{excel_col}' -> '{db_col}' (目标列已存在)")
+                else:
+                    indices.append(idx)
+                    db_columns.append(db_col)
+                    source_columns[db_col] = excel_col
+                    mapping_lines.append(f"    ✓ 映射: '{excel_col}' -> '{db_col}'")
+            
+            ExcelParser._log_mapping(mapping_lines, unmapped_excel_cols)
+            
+            date_idx = header.index('交易日期') if '交易日期' in header else None
+            first_date = None
+            
+            # 逐行读取，只保留映射列（空行与 pandas.read_excel 一样保留，由 _clean_with_log 统一筛选）
+            records = []
+            for row in rows:
+                if len(row) < width:
+                    row = row + (None,) * (width - len(row))
+                if first_date is None and date_idx is not None:
+                    first_date = row[date_idx]
+                records.append(tuple(row[i] for i in indices))
+        finally:
+            workbook.close()
+        
+        normalize_start = time.perf_counter()
+        timings['read'] = normalize_start - read_start
+        logger.info("📊 Excel数据形状: %d 行 × %d 列（读取 %d 列）", len(records), width, len(indices))
+        
+        # 按列组装，空单元格统一为NaN（与pandas.read_excel一致）
+        columns = list(zip(*records)) if records else [()] * len(db_columns)
+        data = {}
+        for db_col, values in zip(db_columns, columns):
+            series = pd.Series(values)
+            if series.dtype == object:
+                series = series.where(series.notna(), np.nan)
+            data[db_col] = series
+        normalized_df = pd.DataFrame(data, columns=db_columns)
+        timings['normalize'] = time.perf_counter() - normalize_start
+        
+        return ExcelParser._clean_with_log(normalized_df, source_columns, unparsable, timings), first_date
+    
+    @staticmethod
+    def _normalize_data(df: pd.DataFrame, column_mapping: dict = None, filename: str = "",
+                        unparsable: Dict[str, int] = None,
+                        timings: Dict[str, float] = None) -> pd.DataFrame:
         """
         数据标准化处理
         
@@ -115,14 +288,17 @@ class ExcelParser:
             df: 原始DataFrame
             column_mapping: 列名映射
             filename: 文件名（用于日志）
+            unparsable: 可选，回填各列无法解析的单元格数（键为Excel列名）
+            timings: 可选，回填各阶段耗时（normalize: 列名映射，clean: 清洗）
             
         Returns:
             标准化后的DataFrame
         """
         if column_mapping is None:
             column_mapping = {}
-        
-        logging.info(f"\n🔄 开始列名映射...")
+        if timings is None:
+            timings = {}
+        normalize_start = time.perf_counter()
         
         # 创建新的DataFrame
         normalized_df = pd.DataFrame()
@@ -130,6 +306,8 @@ class ExcelParser:
         # 记录映射情况
         mapped_count = 0
         unmapped_excel_cols = []
+        source_columns = {}
+        mapping_lines = []
         
         # ✅ 修复：遍历Excel的每一列，而不是遍历配置文件
         for excel_col in df.columns:
@@ -138,56 +316,107 @@ class ExcelParser:
                 # 如果目标列还没有数据，才进行映射（避免重复映射覆盖）
                 if db_col not in normalized_df.columns:
                     normalized_df[db_col] = df[excel_col].copy()
-                    logging.info(f"    ✓ 映射: '{excel_col}' -> '{db_col}'")
+                    source_columns[db_col] = excel_col
+                    mapping_lines.append(f"    ✓ 映射: '{excel_col}' -> '{db_col}'")
                     mapped_count += 1
                 else:
-                    logging.info(f"    ⚠️  跳过: '{excel_col}' -> '{db_col}' (目标列已存在)")
+                    mapping_lines.append(f"    ⚠️  跳过: '{excel_col}' -> '{db_col}' (目标列已存在)")
             else:
                 unmapped_excel_cols.append(excel_col)
         
-        # 记录未映射的列
-        if unmapped_excel_cols:
-            logging.warning(f"\n⚠️  以下Excel列未配置映射（将被忽略）:")
-            for col in unmapped_excel_cols:
-                logging.warning(f"    - {col}")
+        ExcelParser._log_mapping(mapping_lines, unmapped_excel_cols)
+        logger.info(
+            "📊 列映射统计: Excel总列数 %d，成功映射 %d 列，未映射 %d 列，结果列数 %d",
+            len(df.columns), mapped_count, len(unmapped_excel_cols), len(normalized_df.columns)
+        )
+        timings['normalize'] = time.perf_counter() - normalize_start
         
-        logging.info(f"\n📊 列映射统计:")
-        logging.info(f"    - Excel总列数: {len(df.columns)}")
-        logging.info(f"    - 成功映射: {mapped_count} 列")
-        logging.info(f"    - 未映射: {len(unmapped_excel_cols)} 列")
-        logging.info(f"    - 结果列数: {len(normalized_df.columns)}")
+        return ExcelParser._clean_with_log(normalized_df, source_columns, unparsable, timings)
+    
+    @staticmethod
+    def _clean_with_log(normalized_df: pd.DataFrame, source_columns: Dict[str, str] = None,
+                        unparsable: Dict[str, int] = None,
+                        timings: Dict[str, float] = None) -> pd.DataFrame:
+        """
+        数据清洗，按列汇总无法解析的单元格，详细日志中打印清洗后的示例数据
+        
+        流式读取和 pandas.read_excel 两种读取方式都经过这里：先去掉没有股票代码的行（空行、合计行等），
+        两种方式得到的行相同，也不会出现股票代码为 'nan' 的记录。
         
-        # 数据清洗
-        logging.info(f"\n🧹 开始数据清洗...")
-        normalized_df = ExcelParser._clean_data(normalized_df)
+        Args:
+            normalized_df: 列名已映射的DataFrame
+            source_columns: 数据库列名 -> Excel列名（用于日志）
+            unparsable: 可选，回填各列无法解析的单元格数（键为Excel列名）
+            timings: 可选，回填清洗耗时（clean）
+            
+        Returns:
+            清洗后的DataFrame
+        """
+        clean_start = time.perf_counter()
+        normalized_df = ExcelParser._drop_rows_without_code(normalized_df)
+        failures = {}
+        normalized_df = ExcelParser._clean_data(normalized_df, failures)
+        if timings is not None:
+            timings['clean'] = time.perf_counter() - clean_start
+        
+        # 每列一条汇总，不逐个单元格输出
+        source_columns = source_columns or {}
+        for col, values in failures.items():
+            excel_col = source_columns.get(col, col)
+            samples = ", ".join(repr(value) for value in list(dict.fromkeys(values))[:UNPARSABLE_SAMPLE_COUNT])
+            logger.warning("⚠️  %s 中有 %d 个单元格无法解析为数值，例如: %s", excel_col, len(values), samples)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "    %s 无法解析的全部值:\n%s", excel_col,
+                    "\n".join(f"    '{value}' (类型: {type(value).__name__})" for value in values)
+                )
+            if unparsable is not None:
+                unparsable[excel_col] = len(values)
         
         # 打印清洗后的示例数据
-        if len(normalized_df) > 0:
-            logging.info(f"\n💾 清洗后的数据示例（第一行）:")
-            for col in normalized_df.columns[:10]:
-                value = normalized_df[col].iloc[0]
-                logging.info(f"    {col}: {value}")
-            if len(normalized_df.columns) > 10:
-                logging.info(f"    ... (还有 {len(normalized_df.columns)-10} 列)")
+        if len(normalized_df) > 0 and logger.isEnabledFor(logging.DEBUG):
+            ExcelParser._log_first_row("💾 清洗后的数据示例（第一行）:", normalized_df)
         
         return normalized_df
     
     @staticmethod
-    def _clean_data(df: pd.DataFrame) -> pd.DataFrame:
+    def _drop_rows_without_code(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        去掉股票代码为空（缺失或只有空白）的行
+        
+        Args:
+            df: 列名已映射的DataFrame（没有 stock_code 列时原样返回）
+            
+        Returns:
+            筛选后的DataFrame（行号重新从0开始）
+        """
+        if 'stock_code' not in df.columns:
+            return df
+        
+        codes = df['stock_code']
+        has_code = codes.notna() & (codes.astype(str).str.strip() != '')
+        dropped = int((~has_code).sum())
+        if dropped == 0:
+            return df
+        
+        logger.info("⏭  跳过 %d 行没有股票代码的记录", dropped)
+        return df[has_code].reset_index(drop=True)
+    
+    @staticmethod
+    def _clean_data(df: pd.DataFrame, failures: Dict[str, list] = None) -> pd.DataFrame:
         """
         数据清洗
         
         Args:
             df: DataFrame
+            failures: 可选，回填各数值列无法解析的原始值（只包含有失败的列）
             
         Returns:
             清洗后的DataFrame
         """
         # 处理股票代码（确保是6位字符串，前导零）
         if 'stock_code' in df.columns:
-            df['stock_code'] = df['stock_code'].apply(
-                lambda x: str(int(x)).zfill(6) if pd.notna(x) and str(x).replace('.', '').isdigit() else str(x)
-            )
+            df['stock_code'] = ExcelParser._normalize_stock_code(df['stock_code'])
         
         # 处理数值字段，移除"万"、"亿"等单位
         numeric_columns = [
@@ -200,7 +429,10 @@ class ExcelParser:
         
         for col in numeric_columns:
             if col in df.columns:
-                df[col] = df[col].apply(ExcelParser._parse_numeric)
+                failed = [] if failures is not None else None
+                df[col] = ExcelParser._parse_numeric_column(df[col], failed)
+                if failed:
+                    failures[col] = failed
         
         # 处理竞价增额字段（保留原始文本，如 "2+", "3+", "5+"）
         if 'auction_increase' in df.columns:
@@ -208,6 +440,93 @@ class ExcelParser:
         
         return df
     
+    @staticmethod
+    def _normalize_stock_code(series: pd.Series) -> pd.Series:
+        """
+        股票代码标准化（整列处理）
+        
+        纯数字代码转为6位字符串并补前导零（如 1 -> "000001"），其他值保持字符串原样。
+        
+        Args:
+            series: 股票代码列
+            
+        Returns:
+            标准化后的股票代码列
+        """
+        # Excel数值单元格读入后通常是整型/浮点列，直接整体转换
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            values = series.to_numpy(dtype=float)
+            result = series.astype(str).fillna('nan')
+            valid = ~np.isnan(values) & (values >= 0) & (values < 1e15)
+            codes = pd.Series(values[valid].astype(np.int64), index=series.index[valid]).astype(str)
+            result[valid] = codes.str.zfill(6)
+            return result
+        
+        # 混合类型：按字符串处理，数字代码去掉小数部分和前导零后重新补齐
+        text = series.where(series.notna(), np.nan).astype(str).fillna('nan')
+        digit_mask = series.notna() & text.str.replace('.', '', regex=False).str.isdigit()
+        if digit_mask.any():
+            digits = text[digit_mask].str.split('.', n=1).str[0].str.lstrip('0')
+            text[digit_mask] = digits.str.zfill(6)
+        return text
+    
+    @staticmethod
+    def _parse_numeric_column(series: pd.Series, failed: list = None) -> pd.Series:
+        """
+        解析数值列（整列处理，结果与逐个调用 _parse_numeric 一致）
+        
+        使用pandas字符串方法一次性去除单位和符号，"亿"统一换算为"万"。
+        无法解析的值不逐个输出日志，由调用方按列汇总。
+        
+        Args:
+            series: 原始列
+            failed: 可选，回填无法解析的原始值
+            
+        Returns:
+            float类型的列，无法解析的值为NaN
+        """
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            return series.astype(float)
+        
+        # 日期时间列：逐个解析时均无法转换为数值
+        if pd.api.types.is_datetime64_any_dtype(series.dtype) or pd.api.types.is_timedelta64_dtype(series.dtype):
+            if failed is not None:
+                failed.extend(series.dropna().tolist())
+            return pd.Series(np.nan, index=series.index, dtype=float)
+        
+        # 只对字符串单元格做文本清洗，其余值（数值、布尔、日期、空值）直接转换
+        is_str = series.map(lambda v: isinstance(v, str)).astype(bool)
+        result = pd.to_numeric(series.where(~is_str), errors='coerce').astype(float)
+        
+        if failed is not None:
+            failed.extend(series[~is_str & series.notna() & result.isna()].tolist())
+        
+        if not is_str.any():
+            return result
+        
+        text = series[is_str].str.strip()
+        has_yi = text.str.contains('亿', regex=False)
+        has_wan = text.str.contains('万', regex=False) & ~has_yi
+        plain = ~has_yi & ~has_wan
+        
+        cleaned = text.str.replace(',', '', regex=False)
+        cleaned = cleaned.mask(has_yi, cleaned.str.replace('亿', '', regex=False))
+        cleaned = cleaned.mask(has_wan, cleaned.str.replace('万', '', regex=False))
+        cleaned = cleaned.mask(plain, cleaned.str.replace('%', '', regex=False))
+        cleaned = cleaned.str.strip()
+        
+        # 空字符串和"-"视为缺失值
+        empty = (cleaned == '') | (cleaned == '-')
+        parsed = pd.to_numeric(cleaned.mask(empty), errors='coerce').astype(float)
+        parsed[has_yi] *= 10000  # 亿转换为万
+        
+        if failed is not None:
+            failed_mask = parsed.isna() & ~empty & (cleaned.str.lower() != 'nan')
+            failed.extend(series[is_str][failed_mask].tolist())
+        
+        result[is_str] = parsed
+        return result
+    
     @staticmethod
     def _parse_numeric(value) -> Optional[float]:
         """
@@ -259,7 +578,7 @@ class ExcelParser:
             return result
             
         except (ValueError, TypeError) as e:
-            logging.warning(f"    ⚠️  无法解析数值: '{value}' (类型: {type(value).__name__})")
+            logger.debug("    ⚠️  无法解析数值: '%s' (类型: %s)", value, type(value).__name__)
             return None
     
     @staticmethod
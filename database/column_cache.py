@@ -0,0 +1,338 @@
+"""
+stock_daily 列式缓存
+每个交易日一个分区，每列一个 .npy 文件，读取时内存映射，不经过 SQLite 行到 Python 对象的转换。
+
+目录结构:
+    <缓存目录>/<交易日期>/<写入代号>/
+        meta.json            分区信息（最后写入，存在即表示分区完整）
+        <列名>.npy           数值列（float64 / int64）
+        <列名>.codes.npy     文本列的字典编码（int32，-1 表示缺失）
+        <列名>.dict.json     文本列的字典
+
+每次写入都使用新的写入代号目录，正在被读取（已映射）的旧分区不会被覆盖，
+旧目录在之后的写入中清理（Windows 下映射中的文件删除失败时跳过）。
+"""
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+from typing import Callable, Collection, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+# 分区格式版本，格式变化时旧分区自动失效
+CACHE_FORMAT_VERSION = 1
+
+_META_FILE = 'meta.json'
+
+
+class CachedPartition:
+    """
+    单个交易日的缓存分区（列数组均为只读内存映射）
+
+    创建时只映射 load 指定的列（查询用到的列）：映射后的文件即使被新的写入清理，
+    已打开的分区仍可继续读取。其余列在首次访问时才映射，分区已被清理时抛出 OSError。
+    """
+
+    def __init__(self, path: str, meta: Dict, load: Collection[str] = ()):
+        """
+        Args:
+            path: 分区目录
+            meta: 分区信息
+            load: 创建时即映射的列
+        """
+        self.path = path
+        self.meta = meta
+        self.columns: List[str] = meta['columns']
+        self.row_count: int = meta['row_count']
+        self._kinds: Dict[str, str] = meta['kinds']
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._dictionaries: Dict[str, np.ndarray] = {}
+
+        for column in load:
+            self.values(column)
+            if self._kinds[column] == 'text':
+                self.dictionary(column)
+
+    def _load(self, file_name: str) -> np.ndarray:
+        """内存映射读取一个数组文件（空数组无法映射，直接读取）"""
+        file_path = os.path.join(self.path, file_name)
+        if self.row_count == 0:
+            return np.load(file_path)
+        return np.load(file_path, mmap_mode='r')
+
+    def is_text(self, column: str) -> bool:
+        """该列在分区中是否按字典编码存储"""
+        return self._kinds[column] == 'text'
+
+    def values(self, column: str) -> np.ndarray:
+        """获取数值列数组，文本列返回字典编码"""
+        array = self._arrays.get(column)
+        if array is None:
+            suffix = '.codes.npy' if self._kinds[column] == 'text' else '.npy'
+            array = self._arrays[column] = self._load(f"{column}{suffix}")
+        return array
+
+    def dictionary(self, column: str) -> np.ndarray:
+        """获取文本列的字典（末尾追加一个None，编码-1正好取到缺失值）"""
+        lookup = self._dictionaries.get(column)
+        if lookup is None:
+            with open(os.path.join(self.path, f"{column}.dict.json"), 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            lookup = np.empty(len(entries) + 1, dtype=object)
+            lookup[:-1] = entries
+            lookup[-1] = None
+            self._dictionaries[column] = lookup
+        return lookup
+
+    def text_mask(self, column: str, predicate: Callable[[object], bool]) -> np.ndarray:
+        """
+        按文本列筛选行：只对字典中的每个不同值调用一次 predicate
+
+        Args:
+            column: 文本列名
+            predicate: 判断字典值是否匹配的函数（缺失值不匹配）
+
+        Returns:
+            与分区等长的布尔数组
+        """
+        lookup = self.dictionary(column)
+        matched = np.array([value is not None and bool(predicate(value)) for value in lookup], dtype=bool)
+        return matched[self.values(column)]
+
+    def to_frame(self, rows: np.ndarray = None, columns: List[str] = None,
+                 categorical: Collection[str] = ()) -> pd.DataFrame:
+        """
+        转换为DataFrame
+
+        不选择行时数值列直接引用内存映射数组（不拷贝）；文本列按字典解码。
+
+        Args:
+            rows: 选中的行号数组（None 表示全部行）
+            columns: 需要的列（None 表示全部列，顺序与 stock_daily 一致）
+            categorical: 直接由字典编码构造为分类类型的文本列（不解码）
+
+        Returns:
+            DataFrame
+        """
+        columns = columns or self.columns
+        data = {
+            column: self.column_categorical(column, rows)
+            if column in categorical and self.is_text(column)
+            else self.column_array(column, rows)
+            for column in columns
+        }
+        return pd.DataFrame(data, columns=columns, copy=False)
+
+    def column_array(self, column: str, rows: np.ndarray = None) -> np.ndarray:
+        """获取一列的值（文本列解码为object数组），rows 为None时数值列不拷贝"""
+        values = self.values(column)
+        if rows is None:
+            values = values.view(np.ndarray)
+        else:
+            values = values[rows]
+        if self._kinds[column] == 'text':
+            values = self.dictionary(column)[values]
+        return values
+
+    def column_categorical(self, column: str, rows: np.ndarray = None) -> pd.Categorical:
+        """
+        文本列以字典编码直接构造分类类型（字典即类别，编码-1即缺失值）
+
+        选择部分行时去掉未出现的类别，与对筛选结果直接转换分类类型得到的类别一致。
+        """
+        codes = self.values(column)
+        if rows is None:
+            return pd.Categorical.from_codes(codes.view(np.ndarray), categories=self.dictionary(column)[:-1])
+        categorical = pd.Categorical.from_codes(codes[rows], categories=self.dictionary(column)[:-1])
+        return categorical.remove_unused_categories()
+
+
+def partitions_to_frame(partitions: List[CachedPartition], selections: List[np.ndarray],
+                        columns: List[str] = None, categorical: Collection[str] = ()) -> pd.DataFrame:
+    """
+    把多个分区拼接为一个DataFrame（逐列拼接数组，不先为每个分区构建DataFrame）
+
+    Args:
+        partitions: 分区列表（列结构相同）
+        selections: 各分区选中的行号数组（None 表示全部行）
+        columns: 需要的列（None 表示全部列）
+        categorical: 构造为分类类型的文本列（各分区的类别取并集）
+
+    Returns:
+        DataFrame
+    """
+    columns = columns or partitions[0].columns
+    data = {}
+    for column in columns:
+        if column in categorical and all(partition.is_text(column) for partition in partitions):
+            data[column] = union_categoricals([
+                partition.column_categorical(column, rows)
+                for partition, rows in zip(partitions, selections)
+            ], ignore_order=True)
+        else:
+            data[column] = np.concatenate([
+                partition.column_array(column, rows)
+                for partition, rows in zip(partitions, selections)
+            ])
+    # 某天整列缺失时该列按文本存储，拼接后重新推断类型，与 SQLite 一次读取的结果一致
+    return pd.DataFrame(data, columns=columns, copy=False).infer_objects()
+
+
+class ColumnCache:
+    """
+    按交易日分区的列式缓存
+
+    每个分区记录写入时的校验标记（由调用方根据交易日历生成），
+    读取时标记不一致即视为失效，由调用方回退到 SQLite。
+    """
+
+    def __init__(self, cache_dir: str):
+        """
+        Args:
+            cache_dir: 缓存目录
+        """
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._sequence = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _date_dir(self, trade_date: str) -> str:
+        return os.path.join(self.cache_dir, trade_date)
+
+    def _new_generation(self) -> str:
+        """生成新的写入代号（同一进程内递增，多进程间按时间和进程号区分）"""
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+        return f"{time.time_ns():x}-{os.getpid()}-{sequence}"
+
+    def read(self, trade_date: str, token: str, columns: List[str],
+             load: Collection[str] = ()) -> Optional[CachedPartition]:
+        """
+        读取交易日分区
+
+        Args:
+            trade_date: 交易日期
+            token: 当前的校验标记
+            columns: 当前 stock_daily 的列（列结构变化后旧分区失效）
+            load: 立即映射的列（见 CachedPartition）
+
+        Returns:
+            分区，不存在或已失效时返回None
+        """
+        date_dir = self._date_dir(trade_date)
+        try:
+            generations = sorted(os.listdir(date_dir), reverse=True)
+        except FileNotFoundError:
+            return None
+
+        for generation in generations:
+            path = os.path.join(date_dir, generation)
+            try:
+                with open(os.path.join(path, _META_FILE), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue  # 未写完或已损坏的分区
+
+            if (meta.get('format') == CACHE_FORMAT_VERSION and meta.get('token') == token
+                    and meta.get('columns') == columns):
+                try:
+                    return CachedPartition(path, meta, load)
+                except (OSError, ValueError) as e:
+                    # 分区在读取过程中被清理
+                    logging.debug(f"缓存分区读取失败: {path}, {str(e)}")
+        return None
+
+    def write(self, trade_date: str, token: str, df: pd.DataFrame):
+        """
+        写入交易日分区（替换该日期的旧分区）
+
+        Args:
+            trade_date: 交易日期
+            token: 校验标记
+            df: 该日期的全部数据（按股票代码排序，列与 stock_daily 一致）
+        """
+        date_dir = self._date_dir(trade_date)
+        path = os.path.join(date_dir, self._new_generation())
+        os.makedirs(path)
+
+        try:
+            kinds = {}
+            for column in df.columns:
+                series = df[column]
+                if pd.api.types.is_integer_dtype(series.dtype):
+                    np.save(os.path.join(path, f"{column}.npy"), series.to_numpy(dtype=np.int64))
+                    kinds[column] = 'int'
+                elif pd.api.types.is_float_dtype(series.dtype):
+                    np.save(os.path.join(path, f"{column}.npy"), series.to_numpy(dtype=np.float64))
+                    kinds[column] = 'float'
+                else:
+                    # 文本列（以及混有文本的数值列）按字典编码
+                    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+                    np.save(os.path.join(path, f"{column}.codes.npy"), codes.astype(np.int32))
+                    with open(os.path.join(path, f"{column}.dict.json"), 'w', encoding='utf-8') as f:
+                        json.dump(uniques.tolist(), f, ensure_ascii=False)
+                    kinds[column] = 'text'
+
+            meta = {
+                'format': CACHE_FORMAT_VERSION,
+                'trade_date': trade_date,
+                'token': token,
+                'row_count': len(df),
+                'columns': list(df.columns),
+                'kinds': kinds,
+            }
+            meta_tmp = os.path.join(path, f"{_META_FILE}.tmp")
+            with open(meta_tmp, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(meta_tmp, os.path.join(path, _META_FILE))
+        except Exception:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+
+        self._remove_generations(date_dir, keep=os.path.basename(path))
+
+    def invalidate(self, trade_date: str):
+        """删除交易日的全部分区"""
+        self._remove_generations(self._date_dir(trade_date))
+
+    def clear(self):
+        """删除全部分区"""
+        try:
+            dates = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return
+        for trade_date in dates:
+            self.invalidate(trade_date)
+
+    @staticmethod
+    def _remove_generations(date_dir: str, keep: str = None):
+        """删除日期目录下的旧分区（映射中无法删除的留待下次清理）"""
+        try:
+            generations = os.listdir(date_dir)
+        except FileNotFoundError:
+            return
+
+        for generation in generations:
+            if generation == keep:
+                continue
+            path = os.path.join(date_dir, generation)
+            # 先删除 meta.json，即使其余文件删除失败该分区也不会再被读取
+            try:
+                os.remove(os.path.join(path, _META_FILE))
+            except OSError:
+                pass
+            shutil.rmtree(path, ignore_errors=True)
+
+        if keep is None:
+            try:
+                os.rmdir(date_dir)
+            except OSError:
+                pass
+        logging.debug(f"已清理缓存分区: {date_dir}")
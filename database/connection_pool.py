@@ -0,0 +1,122 @@
+"""
+SQLite连接池
+每个线程使用独立的只读连接，所有写操作共用一个加锁的写连接，
+配合WAL模式实现导入数据的同时浏览已有数据
+"""
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Type
+
+import config
+
+
+class ConnectionPool:
+    """
+    SQLite连接池
+
+    - 写连接：全局唯一，通过 writer() 加锁后使用
+    - 读连接：每个线程首次读取时创建，可通过 release_reader() 提前关闭
+    - 内存数据库（:memory:）每个连接都是一个独立的空库，读取也使用写连接
+    """
+
+    def __init__(self, db_path: str, on_connect: Optional[Callable[[sqlite3.Connection], None]] = None,
+                 factory: Type[sqlite3.Connection] = sqlite3.Connection):
+        """
+        初始化连接池
+
+        Args:
+            db_path: 数据库文件路径
+            on_connect: 每个新连接创建后的回调（如安装进度回调）
+            factory: 连接类（sqlite3.Connection 的子类）
+        """
+        self.db_path = db_path
+        self._on_connect = on_connect
+        self._factory = factory
+        self._write_lock = threading.RLock()
+        self._readers_lock = threading.Lock()
+        self._readers: Dict[int, sqlite3.Connection] = {}
+        self._in_memory = db_path == ':memory:'
+
+        self._writer = self._connect()
+        journal_mode = self._writer.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        if str(journal_mode).lower() != 'wal' and not self._in_memory:
+            logging.warning(f"数据库不支持WAL模式，当前日志模式: {journal_mode}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """创建连接并设置性能参数"""
+        connection = sqlite3.connect(
+            self.db_path,
+            timeout=config.DB_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+            factory=self._factory
+        )
+        connection.execute(f"PRAGMA busy_timeout={int(config.DB_BUSY_TIMEOUT_MS)}")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(f"PRAGMA cache_size=-{int(config.DB_CACHE_SIZE_KB)}")
+        connection.execute(f"PRAGMA mmap_size={int(config.DB_MMAP_SIZE)}")
+        connection.execute("PRAGMA temp_store=MEMORY")
+
+        if self._on_connect:
+            self._on_connect(connection)
+        return connection
+
+    @property
+    def writer_connection(self) -> sqlite3.Connection:
+        """写连接（写入前应先通过 write_lock 或 writer() 加锁）"""
+        return self._writer
+
+    @property
+    def write_lock(self) -> threading.RLock:
+        """写锁（可重入）"""
+        return self._write_lock
+
+    @contextmanager
+    def writer(self):
+        """加锁后获取写连接"""
+        with self._write_lock:
+            yield self._writer
+
+    def reader(self) -> sqlite3.Connection:
+        """
+        获取当前线程的读连接
+
+        按线程ID而不是 threading.local 保存：Qt线程池中的线程每执行一个任务
+        都会重建Python线程状态，threading.local 无法跨任务保留连接。
+        线程ID只会在原线程结束后才被复用，因此不会有两个线程同时使用同一连接。
+        内存数据库只有写连接上的那一个库，直接返回写连接。
+        """
+        if self._in_memory:
+            return self._writer
+
+        ident = threading.get_ident()
+        with self._readers_lock:
+            connection = self._readers.get(ident)
+            if connection is None:
+                connection = self._readers[ident] = self._connect()
+        return connection
+
+    def release_reader(self):
+        """关闭当前线程的读连接（线程结束前调用）"""
+        with self._readers_lock:
+            connection = self._readers.pop(threading.get_ident(), None)
+        if connection is not None:
+            connection.close()
+
+    def close_readers(self):
+        """关闭所有读连接（下次读取时重新创建），切换日志模式前需要调用"""
+        with self._readers_lock:
+            readers = list(self._readers.values())
+            self._readers.clear()
+        for connection in readers:
+            try:
+                connection.close()
+            except sqlite3.Error as e:
+                logging.warning(f"关闭读连接失败: {str(e)}")
+
+    def close_all(self):
+        """关闭所有连接"""
+        self.close_readers()
+        with self._write_lock:
+            self._writer.close()
@@ -1,15 +1,113 @@
 """
 SQLite数据库管理模块
 """
+import json
 import sqlite3
 import logging
-from typing import List, Dict, Tuple, Optional
+import threading
+import time
+import functools
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Dict, Tuple, Optional
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
+import config
+from utils.file_utils import get_file_signature, compute_file_hash
+from .connection_pool import ConnectionPool
+from .column_cache import ColumnCache, CachedPartition, partitions_to_frame
+from .query_profiler import QueryProfiler, ProfilingConnection, profiled
+
+
+# 批量写入时每次executemany的行数
+DEFAULT_INSERT_CHUNK_SIZE = 2000
+
+# 查询取消检查间隔（SQLite虚拟机指令数）
+CANCEL_CHECK_INTERVAL = 10000
+
+# 写入stock_daily的列（trade_date单独传入）
+_INSERT_COLUMNS = [
+    'stock_code', 'stock_name', 'current_price', 'price_change',
+    'description', 'sector', 'main_net_amount', 'auction_today_volume',
+    'real_market_value', 'flow_ratio', 'net_ratio', 'real_turnover_rate',
+    'turnover_rate', 'volume_ratio', 'popularity_value',
+    'auction_net_amount', 'auction_increase', 'auction_main_net',
+    'auction_yesterday_volume', 'main_net_ratio', 'buy_sell_ratio',
+    'popularity_change',
+]
+
+# 查询结果的默认列：表格显示的列（不含 id、created_at、description 及表格不显示的旧字段）
+DEFAULT_QUERY_COLUMNS = [col['key'] for col in config.DISPLAY_COLUMNS]
+
+# 查询结果中以分类类型返回的文本列（取值重复多，多日结果中股票代码也大量重复）
+CATEGORY_COLUMNS = {
+    'trade_date', 'stock_code', 'stock_name', 'sector', 'description',
+    'auction_increase', 'prev_trade_date', 'created_at',
+}
+
+# 查询结果中保持float64的REAL列：金额和市值以"万"为单位时也常超过float32约7位的有效数字，
+# 这些值会随选中行、导出等离开表格，不能被舍入
+FLOAT64_COLUMNS = {
+    'main_net_amount', 'auction_today_volume', 'real_market_value',
+    'auction_net_amount', 'auction_main_net', 'auction_yesterday_volume',
+}
+
+# 单只股票历史序列的指标列（数值列，stock_history 中按 (stock_code, trade_date) 聚簇存储）
+HISTORY_COLUMNS = [
+    'current_price', 'price_change', 'main_net_amount', 'auction_today_volume',
+    'real_market_value', 'flow_ratio', 'net_ratio', 'real_turnover_rate',
+    'turnover_rate', 'volume_ratio', 'popularity_value', 'auction_net_amount',
+    'auction_main_net', 'auction_yesterday_volume', 'main_net_ratio',
+    'buy_sell_ratio', 'popularity_change',
+]
+
+_INSERT_SQL = (
+    f"INSERT OR REPLACE INTO stock_daily (trade_date, {', '.join(_INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join(['?'] * (len(_INSERT_COLUMNS) + 1))})"
+)
+
+
+# 数据库结构迁移：(版本号, 该版本执行的SQL)，当前版本记录在 PRAGMA user_version
+_SCHEMA_MIGRATIONS = [
+    (1, [
+        # idx_date、idx_date_code 与 UNIQUE(trade_date, stock_code) 的自动索引重复，
+        # 按日查询及按代码排序都由自动索引完成
+        'DROP INDEX IF EXISTS idx_date',
+        'DROP INDEX IF EXISTS idx_date_code',
+        # 板块筛选已改走板块关联表，LIKE '%x%' 用不上板块索引
+        'DROP INDEX IF EXISTS idx_sector',
+        'DROP INDEX IF EXISTS idx_date_sector',
+        # 单只股票的历史查询：按代码定位，按日期有序
+        'DROP INDEX IF EXISTS idx_code',
+        'CREATE INDEX IF NOT EXISTS idx_code_date ON stock_daily(stock_code, trade_date)',
+        # 导入历史按时间倒序查看
+        'CREATE INDEX IF NOT EXISTS idx_import_date ON import_history(import_date)',
+    ]),
+    (2, [
+        # 统计改读 daily_summary，按日统计的覆盖索引已没有查询使用，只增加写入开销
+        'DROP INDEX IF EXISTS idx_date_stats',
+    ]),
+]
+
+
+def _serialized_write(method):
+    """写操作装饰器：持有写锁执行，保证写连接同一时刻只被一个线程使用"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._pool.write_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class DatabaseManager:
-    """数据库管理器"""
+    """
+    数据库管理器
+    
+    写操作使用连接池的写连接（self.connection）并持有写锁；
+    查询使用当前线程的读连接，在WAL模式下导入数据时仍可浏览已提交的数据。
+    查询方法的耗时由 self.profiler 记录（默认关闭，见 config.QUERY_PROFILING）。
+    """
     
     def __init__(self, db_path: str):
         """
@@ -20,12 +118,25 @@ class DatabaseManager:
         """
         self.db_path = db_path
         self.connection = None
+        self._pool = None
+        self._deferred_dates = None  # 延后维护派生数据期间发生变化的日期（未延后时为None）
+        self._cancel_checks = threading.local()  # 各线程当前查询的取消检查函数
+        self._column_cache = None  # 按交易日分区的列式缓存（未启用时为None）
+        self._cache_dirty_dates = set()  # 写入事务中数据发生变化、提交后需要作废缓存分区的日期
+        self.profiler = QueryProfiler(
+            enabled=config.QUERY_PROFILING,
+            slow_threshold_ms=config.SLOW_QUERY_MS,
+            window=config.PROFILER_WINDOW
+        )
         self._init_database()
     
     def _init_database(self):
         """初始化数据库，创建表和索引"""
         try:
-            self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._pool = ConnectionPool(
+                self.db_path, on_connect=self._configure_connection, factory=ProfilingConnection
+            )
+            self.connection = self._pool.writer_connection
             cursor = self.connection.cursor()
             
             # 创建股票日数据表
@@ -60,12 +171,89 @@ class DatabaseManager:
                 )
             ''')
             
-            # 创建索引
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_date ON stock_daily(trade_date)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_code ON stock_daily(stock_code)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_date_code ON stock_daily(trade_date, stock_code)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_sector ON stock_daily(sector)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_date_sector ON stock_daily(trade_date, sector)')
+            # 前日对比列：导入时计算并持久化，加载时直接读取
+            added_columns = self._ensure_columns(cursor, 'stock_daily', {
+                'prev_trade_date': 'TEXT',
+                'main_net_prev_ratio': 'REAL',
+                'volume_prev_ratio': 'REAL',
+            })
+            
+            # 交易日历表：每个交易日一行，替代对 stock_daily 的 DISTINCT 扫描
+            calendar_exists = self._table_exists(cursor, 'trade_calendar')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS trade_calendar (
+                    trade_date TEXT PRIMARY KEY,
+                    row_count INTEGER NOT NULL DEFAULT 0,
+                    import_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    prev_date TEXT,
+                    next_date TEXT
+                )
+            ''')
+            
+            # 板块字典表和 (股票, 板块) 关联表：板块在导入时拆分，筛选时按板块ID精确匹配
+            sectors_exist = self._table_exists(cursor, 'stock_sector')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS sector (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL UNIQUE
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS stock_sector (
+                    sector_id INTEGER NOT NULL,
+                    trade_date TEXT NOT NULL,
+                    stock_code TEXT NOT NULL,
+                    PRIMARY KEY (sector_id, trade_date, stock_code)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_stock_sector_date_code ON stock_sector(trade_date, stock_code)')
+            
+            # 每日汇总表和板块每日汇总表：导入时按日一次扫描算好，统计和趋势不再查询 stock_daily
+            summaries_exist = self._table_exists(cursor, 'daily_summary')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS daily_summary (
+                    trade_date TEXT PRIMARY KEY,
+                    total_count INTEGER NOT NULL,
+                    positive_main_count INTEGER NOT NULL,
+                    negative_main_count INTEGER NOT NULL,
+                    positive_volume_count INTEGER NOT NULL,
+                    up_count INTEGER NOT NULL,
+                    down_count INTEGER NOT NULL,
+                    total_main_net REAL,
+                    total_volume REAL,
+                    avg_price_change REAL,
+                    avg_turnover REAL
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS sector_daily_summary (
+                    trade_date TEXT NOT NULL,
+                    sector_id INTEGER NOT NULL,
+                    stock_count INTEGER NOT NULL,
+                    positive_main_count INTEGER NOT NULL,
+                    up_count INTEGER NOT NULL,
+                    down_count INTEGER NOT NULL,
+                    total_main_net REAL,
+                    total_volume REAL,
+                    avg_price_change REAL,
+                    avg_turnover REAL,
+                    PRIMARY KEY (trade_date, sector_id)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_sector_summary_sector ON sector_daily_summary(sector_id, trade_date)')
+            
+            # 单只股票历史表：按 (股票代码, 交易日期) 聚簇，一只股票的全部历史集中在相邻页面
+            history_exists = self._table_exists(cursor, 'stock_history')
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS stock_history (
+                    stock_code TEXT NOT NULL,
+                    trade_date TEXT NOT NULL,
+                    stock_name TEXT,
+                    {', '.join(f"{col} REAL" for col in HISTORY_COLUMNS)},
+                    PRIMARY KEY (stock_code, trade_date)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_stock_history_date ON stock_history(trade_date)')
             
             # 创建数据导入历史表
             cursor.execute('''
@@ -80,77 +268,803 @@ class DatabaseManager:
                 )
             ''')
             
+            # 导入台账字段：按文件路径、大小、修改时间和内容哈希识别未变化的文件
+            self._ensure_columns(cursor, 'import_history', {
+                'file_path': 'TEXT',
+                'file_size': 'INTEGER',
+                'file_mtime': 'REAL',
+                'content_hash': 'TEXT',
+                'metrics': 'TEXT',  # 导入各阶段耗时等指标（JSON）
+            })
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_import_file ON import_history(file_path, file_size, file_mtime)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_import_hash ON import_history(content_hash)')
+            
+            # 索引按结构版本迁移（见 _SCHEMA_MIGRATIONS）
+            self._migrate_schema(cursor)
+            
             self.connection.commit()
+            
+            # 列式缓存：分区的列必须与当前 stock_daily 的列一致
+            cursor.execute("PRAGMA table_info(stock_daily)")
+            table_info = cursor.fetchall()
+            self._daily_columns = [row[1] for row in table_info]
+            self._real_columns = {row[1] for row in table_info if row[2].upper() == 'REAL'}
+            if config.COLUMN_CACHE_ENABLED and self.db_path != ':memory:':
+                self._column_cache = ColumnCache(f"{self.db_path}.columns")
+            
+            # 旧数据库首次升级：根据已有数据生成交易日历
+            if not calendar_exists:
+                self.rebuild_trade_calendar()
+            
+            # 旧数据库首次升级：拆分已有数据的板块
+            if not sectors_exist:
+                self.rebuild_sectors()
+            
+            # 旧数据库首次升级：生成每日汇总
+            if not summaries_exist:
+                self.rebuild_summaries()
+            
+            # 旧数据库首次升级：生成单只股票历史表
+            if not history_exists:
+                self.rebuild_history()
+            
+            # 旧数据库首次升级：补算所有日期的前日对比值
+            if added_columns:
+                self.rebuild_comparisons()
+            
             logging.info("数据库初始化成功")
             
         except Exception as e:
             logging.error(f"数据库初始化失败: {str(e)}")
             raise
     
-    def insert_batch(self, data: pd.DataFrame, trade_date: str) -> Tuple[int, int]:
+    def _configure_connection(self, connection: sqlite3.Connection):
+        """连接池新建连接时的回调：安装查询取消检查，关联性能分析器"""
+        connection.set_progress_handler(self._should_abort, CANCEL_CHECK_INTERVAL)
+        connection.profiler = self.profiler
+    
+    def _reader(self) -> sqlite3.Connection:
+        """获取当前线程的读连接"""
+        return self._pool.reader()
+    
+    def release_thread_connection(self):
+        """关闭当前线程的读连接（后台线程结束前调用）"""
+        self._pool.release_reader()
+    
+    def _should_abort(self) -> int:
+        """SQLite进度回调：当前线程的查询已被取消时返回非0以中断执行"""
+        is_cancelled = getattr(self._cancel_checks, 'check', None)
+        return 1 if is_cancelled is not None and is_cancelled() else 0
+    
+    @contextmanager
+    def cancellable(self, is_cancelled: Callable[[], bool]):
+        """
+        在当前线程中执行可取消的查询
+        
+        进度回调按线程查找取消检查函数，只会中断本线程的查询，
+        同一连接上其他线程的导入或查询不受影响。被取消的查询抛出
+        sqlite3.OperationalError (interrupted)。
+        
+        Args:
+            is_cancelled: 返回True表示应中断当前查询
+        """
+        self._cancel_checks.check = is_cancelled
+        try:
+            yield
+        finally:
+            self._cancel_checks.check = None
+    
+    @staticmethod
+    def _migrate_schema(cursor):
+        """
+        按 PRAGMA user_version 执行尚未应用的结构迁移
+        
+        Args:
+            cursor: 数据库游标
+        """
+        current_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        for version, statements in _SCHEMA_MIGRATIONS:
+            if version <= current_version:
+                continue
+            for sql in statements:
+                cursor.execute(sql)
+            cursor.execute(f"PRAGMA user_version = {version}")
+            logging.info(f"数据库结构已迁移到版本 {version}")
+    
+    @staticmethod
+    def _table_exists(cursor, table: str) -> bool:
+        """判断数据表是否已存在"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        return cursor.fetchone() is not None
+    
+    @staticmethod
+    def _ensure_columns(cursor, table: str, columns: Dict[str, str]) -> List[str]:
+        """
+        为已有表补充缺失的列（兼容旧版本数据库）
+        
+        Args:
+            cursor: 数据库游标
+            table: 表名
+            columns: {列名: 列类型}
+            
+        Returns:
+            本次新增的列名列表
+        """
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        added = []
+        for name, col_type in columns.items():
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
+                logging.info(f"数据表 {table} 新增列: {name}")
+                added.append(name)
+        return added
+    
+    @_serialized_write
+    def insert_batch(self, data: pd.DataFrame, trade_date: str,
+                     chunk_size: int = DEFAULT_INSERT_CHUNK_SIZE,
+                     stats: Dict = None) -> Tuple[int, int]:
         """
         批量插入数据
         
+        先把DataFrame一次性转换为列数组，再在一个显式事务内按块调用executemany写入。
+        某个块写入失败时回滚该块，并退回逐行插入以统计跳过的记录。
+        
         Args:
             data: pandas DataFrame
             trade_date: 交易日期
+            chunk_size: 每次executemany写入的行数
+            stats: 可选的统计字典，回填各阶段耗时（秒）：
+                   convert（转换参数）、insert（executemany）、derived（派生数据）、
+                   commit（提交）、cache（作废列式缓存分区）
             
         Returns:
             (成功插入数量, 跳过数量)
         """
+        if stats is None:
+            stats = {}
+        stage_start = time.perf_counter()
+        rows = self._to_row_tuples(data, trade_date)
+        stats['convert'] = time.perf_counter() - stage_start
+        if not rows:
+            return 0, 0
+        
         cursor = self.connection.cursor()
         inserted = 0
         skipped = 0
         
-        for _, row in data.iterrows():
+        # 已处于外部事务中时（如批量加载），只使用保存点，不自行提交
+        own_transaction = not self.connection.in_transaction
+        if own_transaction:
+            cursor.execute('BEGIN')
+        
+        stage_start = time.perf_counter()
+        try:
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                cursor.execute('SAVEPOINT insert_chunk')
+                try:
+                    cursor.executemany(_INSERT_SQL, chunk)
+                    inserted += len(chunk)
+                except sqlite3.Error as e:
+                    # 整块失败，回滚后逐行重试，定位并跳过有问题的记录
+                    cursor.execute('ROLLBACK TO insert_chunk')
+                    logging.warning(f"批量写入失败，改为逐行插入: {str(e)}")
+                    chunk_inserted, chunk_skipped = self._insert_rows(cursor, chunk)
+                    inserted += chunk_inserted
+                    skipped += chunk_skipped
+                cursor.execute('RELEASE insert_chunk')
+            stats['insert'] = time.perf_counter() - stage_start
+            
+            stage_start = time.perf_counter()
+            self._update_derived_data(cursor, trade_date)
+            stats['derived'] = time.perf_counter() - stage_start
+            
+            stage_start = time.perf_counter()
+            if own_transaction:
+                self.connection.commit()
+            stats['commit'] = time.perf_counter() - stage_start
+        except Exception:
+            if own_transaction:
+                self.connection.rollback()
+                self._cache_dirty_dates.clear()
+            raise
+        
+        stage_start = time.perf_counter()
+        if own_transaction:
+            self._invalidate_column_cache()
+        stats['cache'] = time.perf_counter() - stage_start
+        
+        return inserted, skipped
+    
+    @contextmanager
+    def bulk_load(self):
+        """
+        批量加载模式（用于清空后全量重新导入）
+        
+        进入时删除 stock_daily 及各派生表的二级索引（保留主键和唯一约束），日志模式设为MEMORY
+        （回滚日志只保存在内存中，不写磁盘，但写入失败的块和文件仍能正常回滚），同步模式设为OFF；
+        期间 insert_batch 不再维护交易日历、板块、汇总、股票历史和前日对比。
+        退出时（包括异常退出）以每类一条集合SQL重建全部派生数据，再重建索引并执行一次ANALYZE，
+        再恢复WAL模式并清空列式缓存（分区在之后首次查询时写入）。整个过程持有写锁。
+        
+        注意：回滚日志不落盘、同步关闭期间进程崩溃或断电可能损坏数据库，只应在可整体重新导入时使用。
+        
+        Yields:
+            DatabaseManager 自身
+        """
+        with self._pool.write_lock:
+            cursor = self.connection.cursor()
+            start = time.perf_counter()
+            
+            # 二级索引先删除，派生数据重建完成后按原定义重建
+            cursor.execute(
+                "SELECT name, sql FROM sqlite_master "
+                "WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN "
+                "('stock_daily', 'stock_sector', 'sector_daily_summary', 'stock_history')"
+            )
+            indexes = cursor.fetchall()
+            for name, _ in indexes:
+                cursor.execute(f"DROP INDEX IF EXISTS {name}")
+            self.connection.commit()
+            
+            # 退出WAL模式需要没有其他连接打开数据库
+            self._pool.close_readers()
+            journal_mode = cursor.execute("PRAGMA journal_mode=MEMORY").fetchone()[0]
+            cursor.execute("PRAGMA synchronous=OFF")
+            logging.info(f"进入批量加载模式：删除 {len(indexes)} 个索引，日志模式 {journal_mode}")
+            
+            self._deferred_dates = set()
             try:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO stock_daily 
-                    (trade_date, stock_code, stock_name, current_price, price_change,
-                     description, sector, main_net_amount, auction_today_volume,
-                     real_market_value, flow_ratio, net_ratio, real_turnover_rate,
-                     turnover_rate, volume_ratio, popularity_value,
-                     auction_net_amount, auction_increase, auction_main_net,
-                     auction_yesterday_volume, main_net_ratio, buy_sell_ratio,
-                     popularity_change)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    trade_date,
-                    row.get('stock_code'),
-                    row.get('stock_name'),
-                    row.get('current_price'),
-                    row.get('price_change'),
-                    row.get('description'),
-                    row.get('sector'),
-                    row.get('main_net_amount'),
-                    row.get('auction_today_volume'),
-                    row.get('real_market_value'),
-                    row.get('flow_ratio'),
-                    row.get('net_ratio'),
-                    row.get('real_turnover_rate'),
-                    row.get('turnover_rate'),
-                    row.get('volume_ratio'),
-                    row.get('popularity_value'),
-                    row.get('auction_net_amount'),
-                    row.get('auction_increase'),
-                    row.get('auction_main_net'),
-                    row.get('auction_yesterday_volume'),
-                    row.get('main_net_ratio'),
-                    row.get('buy_sell_ratio'),
-                    row.get('popularity_change'),
-                ))
+                yield self
+            finally:
+                self._deferred_dates = None
+                load_seconds = time.perf_counter() - start
+                try:
+                    if self.connection.in_transaction:
+                        self.connection.commit()
+                    self._refresh_derived(cursor, None)
+                finally:
+                    # 派生数据重建失败时也要恢复索引和日志模式（已写入的部分直接提交，可再调用 rebuild_* 补齐）
+                    if self.connection.in_transaction:
+                        self.connection.commit()
+                    for _, sql in indexes:
+                        cursor.execute(sql)
+                    cursor.execute("ANALYZE")
+                    self.connection.commit()
+                    
+                    self._pool.close_readers()
+                    cursor.execute("PRAGMA synchronous=NORMAL")
+                    journal_mode = cursor.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+                    if self._column_cache is not None:
+                        self._column_cache.clear()
+                logging.info(
+                    f"批量加载完成：加载 {load_seconds:.2f} 秒，"
+                    f"重建索引及派生数据 {time.perf_counter() - start - load_seconds:.2f} 秒，"
+                    f"日志模式恢复为 {journal_mode}"
+                )
+    
+    @staticmethod
+    def _to_row_tuples(data: pd.DataFrame, trade_date: str) -> List[tuple]:
+        """
+        将DataFrame转换为executemany所需的参数元组列表
+        
+        每列只转换一次：数值列转为Python float，缺失值（NaN）统一转为None。
+        
+        Args:
+            data: pandas DataFrame
+            trade_date: 交易日期
+            
+        Returns:
+            参数元组列表，列顺序与 _INSERT_COLUMNS 一致（首列为交易日期）
+        """
+        row_count = len(data)
+        if row_count == 0:
+            return []
+        
+        arrays = [[trade_date] * row_count]
+        for col in _INSERT_COLUMNS:
+            if col not in data.columns:
+                arrays.append([None] * row_count)
+                continue
+            
+            series = data[col]
+            if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+                values = series.to_numpy(dtype=float)
+                column = values.astype(object)
+                column[np.isnan(values)] = None
+            else:
+                column = series.to_numpy(dtype=object, copy=True)
+                column[pd.isna(column)] = None
+            arrays.append(column.tolist())
+        
+        return list(zip(*arrays))
+    
+    @staticmethod
+    def _insert_rows(cursor, rows: List[tuple]) -> Tuple[int, int]:
+        """
+        逐行插入（慢路径，仅在批量写入失败时使用）
+        
+        Args:
+            cursor: 数据库游标
+            rows: 参数元组列表
+            
+        Returns:
+            (成功插入数量, 跳过数量)
+        """
+        inserted = 0
+        skipped = 0
+        for row in rows:
+            try:
+                cursor.execute(_INSERT_SQL, row)
                 inserted += 1
-            except Exception as e:
-                logging.warning(f"插入数据失败: {str(e)}, 股票代码: {row.get('stock_code')}")
+            except sqlite3.Error as e:
+                logging.warning(f"插入数据失败: {str(e)}, 股票代码: {row[1]}")
                 skipped += 1
+        return inserted, skipped
+    
+    def _update_derived_data(self, cursor, trade_date: str):
+        """
+        某个交易日的数据写入或删除后，维护依赖它的派生数据
+        
+        延后维护期间（bulk_load / deferred_maintenance）只记录日期，结束时统一刷新；
+        否则在同一事务中立即刷新该日期（见 _refresh_derived）。
+        
+        Args:
+            cursor: 数据库游标（与写入处于同一事务）
+            trade_date: 发生变化的交易日期
+        """
+        if self._deferred_dates is not None:
+            self._deferred_dates.add(trade_date)
+            # 当天的数据已经变化，缓存分区不能等到刷新时才作废
+            self._cache_dirty_dates.add(trade_date)
+            return
+        
+        self._refresh_derived(cursor, [trade_date])
+    
+    def _refresh_derived(self, cursor, dates: List[str] = None):
+        """
+        刷新指定日期的派生数据，每类派生数据各执行一次集合SQL，不按日期循环
+        
+        先更新交易日历、板块关联、每日汇总和股票历史；这些日期的前日对比值需要重算，
+        各自下一个交易日的"前一交易日"可能因此改变，也一并重算。
+        涉及日期的列式缓存分区在事务提交后作废，下次查询时重新写入。
+        
+        Args:
+            cursor: 数据库游标（与写入处于同一事务）
+            dates: 发生变化的交易日期，None 表示全部日期（全量重建，缓存由调用方清空）
+        """
+        if dates is not None:
+            dates = sorted(set(dates))
+            if not dates:
+                return
+            self._stage_refresh_dates(cursor, dates)
+        
+        self._refresh_trade_calendar(cursor, dates)
+        
+        self._refresh_sectors(cursor, dates)
+        
+        self._refresh_summaries(cursor, dates)
+        
+        self._refresh_history(cursor, dates)
+        
+        if dates is not None:
+            next_dates = set()
+            for trade_date in dates:
+                cursor.execute(
+                    "SELECT MIN(trade_date) FROM trade_calendar WHERE trade_date > ?", (trade_date,)
+                )
+                next_date = cursor.fetchone()[0]
+                if next_date:
+                    next_dates.add(next_date)
+            dates = sorted(set(dates) | next_dates)
+            self._stage_refresh_dates(cursor, dates)
+            self._cache_dirty_dates.update(dates)
+        self._refresh_comparisons(cursor, dates)
+    
+    @staticmethod
+    def _stage_refresh_dates(cursor, dates: List[str]):
+        """把待刷新的日期写入临时表 refresh_dates（刷新语句按子查询筛选，不受SQL参数个数限制）"""
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS refresh_dates (trade_date TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM temp.refresh_dates")
+        cursor.executemany(
+            "INSERT INTO temp.refresh_dates (trade_date) VALUES (?)", [(trade_date,) for trade_date in dates]
+        )
+    
+    @staticmethod
+    def _refresh_filter(column: str, dates: Optional[List[str]]) -> str:
+        """刷新语句的日期条件（dates 为None时不筛选）"""
+        if dates is None:
+            return "1"
+        return f"{column} IN (SELECT trade_date FROM temp.refresh_dates)"
+    
+    @contextmanager
+    def deferred_maintenance(self):
+        """
+        延后维护派生数据（用于一次导入多个文件）
+        
+        期间 insert_batch 和 delete_by_date 照常逐个提交，只记录发生变化的日期；
+        交易日历、板块、汇总、股票历史和前日对比在退出时（包括异常退出）一次刷新，
+        每个日期及其下一交易日只处理一次。刷新之前新导入的日期不会出现在交易日历中。
+        已处于延后维护（如 bulk_load）时直接执行，不重复刷新。
+        
+        Yields:
+            DatabaseManager 自身
+        """
+        with self._pool.write_lock:
+            nested = self._deferred_dates is not None
+            if not nested:
+                self._deferred_dates = set()
+        if nested:
+            yield self
+            return
+        
+        try:
+            yield self
+        finally:
+            with self._pool.write_lock:
+                dates, self._deferred_dates = self._deferred_dates, None
+                if dates:
+                    start = time.perf_counter()
+                    try:
+                        self._refresh_derived(self.connection.cursor(), dates)
+                        self.connection.commit()
+                    except Exception:
+                        self.connection.rollback()
+                        self._cache_dirty_dates.clear()
+                        raise
+                    self._invalidate_column_cache()
+                    logging.info(
+                        f"派生数据已刷新：{len(dates)} 个交易日，耗时 {time.perf_counter() - start:.2f} 秒"
+                    )
+    
+    def _refresh_trade_calendar(self, cursor, dates: Optional[List[str]]):
+        """
+        重新统计交易日历中指定日期的记录数（没有数据的日期删除），并重新链接前后交易日
         
+        Args:
+            cursor: 数据库游标
+            dates: 交易日期（已写入 refresh_dates），None 表示按 stock_daily 全量重建
+        """
+        where = self._refresh_filter('trade_date', dates)
+        cursor.execute(f"DELETE FROM trade_calendar WHERE {where}")
+        # 全量重建时保留各日期原来的导入时间
+        import_time = "MAX(created_at)" if dates is None else "CURRENT_TIMESTAMP"
+        cursor.execute(f'''
+            INSERT INTO trade_calendar (trade_date, row_count, import_time)
+            SELECT trade_date, COUNT(*), {import_time}
+            FROM stock_daily
+            WHERE {where}
+            GROUP BY trade_date
+        ''')
+        self._link_trade_calendar(cursor)
+    
+    @staticmethod
+    def _link_trade_calendar(cursor):
+        """重新计算交易日历中每个日期的前后交易日（按主键查找，只与交易日数量相关）"""
+        cursor.execute('''
+            UPDATE trade_calendar SET
+                prev_date = (SELECT MAX(c.trade_date) FROM trade_calendar c
+                             WHERE c.trade_date < trade_calendar.trade_date),
+                next_date = (SELECT MIN(c.trade_date) FROM trade_calendar c
+                             WHERE c.trade_date > trade_calendar.trade_date)
+        ''')
+    
+    @_serialized_write
+    def rebuild_trade_calendar(self):
+        """根据 stock_daily 重新生成交易日历（用于旧数据库升级或数据修复）"""
+        cursor = self.connection.cursor()
+        self._refresh_trade_calendar(cursor, None)
         self.connection.commit()
-        return inserted, skipped
+        day_count = cursor.execute("SELECT COUNT(*) FROM trade_calendar").fetchone()[0]
+        logging.info(f"交易日历已重建，共 {day_count} 个交易日")
+    
+    @staticmethod
+    def _split_sectors(sector_text) -> List[str]:
+        """拆分以"、"分隔的板块字符串，去除空白和重复项"""
+        if not sector_text:
+            return []
+        names = []
+        for name in str(sector_text).split('、'):
+            name = name.strip()
+            if name and name not in names:
+                names.append(name)
+        return names
+    
+    def _refresh_sectors(self, cursor, dates: Optional[List[str]]):
+        """
+        重建指定日期的 (股票, 板块) 关联，并清理不再被引用的板块
+        
+        按 (交易日期, 股票代码) 顺序分块读取 stock_daily，每个板块的关联按主键顺序追加写入；
+        每个不同的板块字符串只拆分一次。
+        
+        Args:
+            cursor: 数据库游标
+            dates: 交易日期（已写入 refresh_dates），None 表示全部日期
+        """
+        where = self._refresh_filter('trade_date', dates)
+        cursor.execute(f"DELETE FROM stock_sector WHERE {where}")
+        
+        cursor.execute("SELECT name, id FROM sector")
+        sector_ids = dict(cursor.fetchall())
+        split_cache = {}
+        
+        reader = self.connection.cursor()
+        reader.execute(
+            f"SELECT trade_date, stock_code, sector FROM stock_daily"
+            f" WHERE sector IS NOT NULL AND {where} ORDER BY trade_date, stock_code"
+        )
+        for rows in iter(lambda: reader.fetchmany(DEFAULT_INSERT_CHUNK_SIZE), []):
+            links = []
+            for trade_date, stock_code, sector_text in rows:
+                names = split_cache.get(sector_text)
+                if names is None:
+                    names = split_cache[sector_text] = self._split_sectors(sector_text)
+                    for name in names:
+                        if name not in sector_ids:
+                            cursor.execute("INSERT INTO sector (name) VALUES (?)", (name,))
+                            sector_ids[name] = cursor.lastrowid
+                links.extend((sector_ids[name], trade_date, stock_code) for name in names)
+            links.sort()
+            cursor.executemany(
+                "INSERT OR IGNORE INTO stock_sector (sector_id, trade_date, stock_code) VALUES (?, ?, ?)",
+                links
+            )
+        
+        cursor.execute('''
+            DELETE FROM sector
+            WHERE NOT EXISTS (SELECT 1 FROM stock_sector ss WHERE ss.sector_id = sector.id)
+        ''')
+    
+    @_serialized_write
+    def rebuild_sectors(self):
+        """根据 stock_daily 重新生成板块字典和关联表（用于旧数据库升级或数据修复）"""
+        logging.info("开始拆分板块数据")
+        self._refresh_sectors(self.connection.cursor(), None)
+        self.connection.commit()
+        logging.info("板块数据拆分完成")
+    
+    def _refresh_summaries(self, cursor, dates: Optional[List[str]]):
+        """
+        重新计算指定日期的每日汇总和板块汇总（各一次按日期分组的条件聚合）
+        
+        Args:
+            cursor: 数据库游标
+            dates: 交易日期（已写入 refresh_dates），None 表示全部日期
+        """
+        where = self._refresh_filter('trade_date', dates)
+        cursor.execute(f"DELETE FROM daily_summary WHERE {where}")
+        cursor.execute(f"DELETE FROM sector_daily_summary WHERE {where}")
+        
+        cursor.execute(f'''
+            INSERT INTO daily_summary
+            (trade_date, total_count, positive_main_count, negative_main_count,
+             positive_volume_count, up_count, down_count, total_main_net,
+             total_volume, avg_price_change, avg_turnover)
+            SELECT trade_date,
+                   COUNT(*),
+                   SUM(CASE WHEN main_net_amount > 0 THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN main_net_amount < 0 THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN auction_today_volume > auction_yesterday_volume THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN price_change > 0 THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN price_change < 0 THEN 1 ELSE 0 END),
+                   SUM(main_net_amount),
+                   SUM(auction_today_volume),
+                   AVG(price_change),
+                   AVG(turnover_rate)
+            FROM stock_daily
+            WHERE {where}
+            GROUP BY trade_date
+        ''')
+        
+        cursor.execute(f'''
+            INSERT INTO sector_daily_summary
+            (trade_date, sector_id, stock_count, positive_main_count, up_count,
+             down_count, total_main_net, total_volume, avg_price_change, avg_turnover)
+            SELECT ss.trade_date,
+                   ss.sector_id,
+                   COUNT(*),
+                   SUM(CASE WHEN d.main_net_amount > 0 THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN d.price_change > 0 THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN d.price_change < 0 THEN 1 ELSE 0 END),
+                   SUM(d.main_net_amount),
+                   SUM(d.auction_today_volume),
+                   AVG(d.price_change),
+                   AVG(d.turnover_rate)
+            FROM stock_sector ss
+            JOIN stock_daily d ON d.trade_date = ss.trade_date AND d.stock_code = ss.stock_code
+            WHERE {self._refresh_filter('ss.trade_date', dates)}
+            GROUP BY ss.trade_date, ss.sector_id
+        ''')
     
+    @_serialized_write
+    def rebuild_summaries(self):
+        """根据 stock_daily 重新生成所有日期的每日汇总和板块汇总"""
+        cursor = self.connection.cursor()
+        self._refresh_summaries(cursor, None)
+        self.connection.commit()
+        day_count = cursor.execute("SELECT COUNT(*) FROM daily_summary").fetchone()[0]
+        logging.info(f"每日汇总已重建，共 {day_count} 个交易日")
+    
+    def _refresh_history(self, cursor, dates: Optional[List[str]]):
+        """
+        重新写入指定日期在股票历史表中的记录（按聚簇顺序写入）
+        
+        Args:
+            cursor: 数据库游标
+            dates: 交易日期（已写入 refresh_dates），None 表示全部日期
+        """
+        where = self._refresh_filter('trade_date', dates)
+        cursor.execute(f"DELETE FROM stock_history WHERE {where}")
+        cursor.execute(f'''
+            INSERT INTO stock_history (stock_code, trade_date, stock_name, {', '.join(HISTORY_COLUMNS)})
+            SELECT stock_code, trade_date, stock_name, {', '.join(HISTORY_COLUMNS)}
+            FROM stock_daily
+            WHERE {where}
+            ORDER BY stock_code, trade_date
+        ''')
+    
+    @_serialized_write
+    def rebuild_history(self):
+        """根据 stock_daily 重新生成单只股票历史表"""
+        cursor = self.connection.cursor()
+        self._refresh_history(cursor, None)
+        self.connection.commit()
+        logging.info(f"股票历史表已重建，共 {cursor.rowcount} 条记录")
+    
+    def _refresh_comparisons(self, cursor, dates: Optional[List[str]]):
+        """
+        计算并写入指定日期相对各自前一交易日（取自交易日历）的对比值
+        
+        主力净额对比 = 当天主力净额 / 前一交易日主力净额，成交额对比同理；
+        没有前一交易日、前一交易日没有该股票或其值为0时为NULL。
+        
+        Args:
+            cursor: 数据库游标
+            dates: 交易日期（已写入 refresh_dates），None 表示全部日期
+        """
+        # 三列由同一个子查询一次算出：每行只按主键查一次日历、按唯一索引查一次前一天
+        cursor.execute(f'''
+            UPDATE stock_daily
+            SET (prev_trade_date, main_net_prev_ratio, volume_prev_ratio) = (
+                SELECT c.prev_date,
+                       CASE WHEN p.main_net_amount != 0
+                            THEN stock_daily.main_net_amount / p.main_net_amount END,
+                       CASE WHEN p.auction_today_volume != 0
+                            THEN stock_daily.auction_today_volume / p.auction_today_volume END
+                FROM trade_calendar c
+                LEFT JOIN stock_daily p ON p.trade_date = c.prev_date AND p.stock_code = stock_daily.stock_code
+                WHERE c.trade_date = stock_daily.trade_date
+            )
+            WHERE {self._refresh_filter('trade_date', dates)}
+        ''')
+    
+    @_serialized_write
+    def rebuild_comparisons(self):
+        """重新计算所有日期的前日对比值（用于旧数据库升级或数据修复）"""
+        logging.info("开始重新计算前日对比值")
+        self._refresh_comparisons(self.connection.cursor(), None)
+        self.connection.commit()
+        
+        # 对比值变化不体现在交易日历中，已有的缓存分区全部作废
+        if self._column_cache is not None:
+            self._column_cache.clear()
+        logging.info("前日对比值计算完成")
+    
+    @staticmethod
+    def _cache_tokens(cursor, start_date: str, end_date: str) -> Dict[str, str]:
+        """
+        生成日期范围内各交易日缓存分区的校验标记
+        
+        标记由当天的记录数、导入时间以及前一交易日及其导入时间组成，
+        当天或前一交易日重新导入后（前日对比值随之变化）标记都会改变。
+        
+        Returns:
+            {交易日期: 校验标记}，按日期升序
+        """
+        cursor.execute('''
+            SELECT c.trade_date, c.row_count, c.import_time, c.prev_date, p.import_time
+            FROM trade_calendar c
+            LEFT JOIN trade_calendar p ON p.trade_date = c.prev_date
+            WHERE c.trade_date BETWEEN ? AND ?
+            ORDER BY c.trade_date
+        ''', (start_date, end_date))
+        return {row[0]: '|'.join(str(value) for value in row[1:]) for row in cursor.fetchall()}
+    
+    @staticmethod
+    def _read_date_frame(connection: sqlite3.Connection, trade_date: str) -> pd.DataFrame:
+        """从 SQLite 读取一个交易日的全部数据（按股票代码排序，即缓存分区的内容）"""
+        return pd.read_sql_query(
+            "SELECT * FROM stock_daily WHERE trade_date = ? ORDER BY stock_code",
+            connection,
+            params=[trade_date]
+        )
+    
+    def _write_cache_partition(self, connection: sqlite3.Connection, trade_date: str, token: str) -> bool:
+        """从 SQLite 读取一个交易日并写入缓存分区，写入失败时删除该日期的分区"""
+        try:
+            self._column_cache.write(trade_date, token, self._read_date_frame(connection, trade_date))
+            return True
+        except OSError as e:
+            logging.warning(f"写入列式缓存失败: {trade_date}, {str(e)}")
+            self._column_cache.invalidate(trade_date)
+            return False
+    
+    def _invalidate_column_cache(self):
+        """
+        写入事务提交后，删除数据发生变化的交易日的缓存分区
+        
+        分区不在导入时重写（每次导入都要重新读出整天的数据），由下次查询读穿透写入。
+        """
+        dates, self._cache_dirty_dates = self._cache_dirty_dates, set()
+        if self._column_cache is None:
+            return
+        
+        for trade_date in sorted(dates):
+            self._column_cache.invalidate(trade_date)
+    
+    @_serialized_write
+    def rebuild_column_cache(self):
+        """重新生成所有交易日的列式缓存分区"""
+        if self._column_cache is None:
+            return
+        
+        start = time.perf_counter()
+        self._column_cache.clear()
+        tokens = self._cache_tokens(self.connection.cursor(), '', '9999-99-99')
+        for trade_date, token in tokens.items():
+            self._write_cache_partition(self.connection, trade_date, token)
+        logging.info(f"列式缓存已重建，共 {len(tokens)} 个交易日，耗时 {time.perf_counter() - start:.2f} 秒")
+    
+    def _cached_partitions(self, start_date: str, end_date: str,
+                           load: List[str]) -> Optional[List[CachedPartition]]:
+        """
+        读取日期范围内各交易日的缓存分区（读穿透：未命中的日期从 SQLite 读取后写入缓存）
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            load: 查询用到的列（只映射这些列）
+            
+        Returns:
+            按日期升序的分区列表；未启用缓存或缓存不可用时返回None，由调用方回退到 SQLite
+        """
+        if self._column_cache is None:
+            return None
+        
+        connection = self._reader()
+        tokens = self._cache_tokens(connection.cursor(), start_date, end_date)
+        partitions = []
+        for trade_date, token in tokens.items():
+            partition = self._column_cache.read(trade_date, token, self._daily_columns, load)
+            if partition is None:
+                if not self._write_cache_partition(connection, trade_date, token):
+                    return None
+                partition = self._column_cache.read(trade_date, token, self._daily_columns, load)
+                if partition is None:
+                    return None
+            partitions.append(partition)
+        return partitions
+    
+    def _select_rows(self, partition: CachedPartition, sector: str = None) -> Optional[np.ndarray]:
+        """
+        在缓存分区中按板块筛选（条件含义与 _build_date_filter 一致）
+        
+        Returns:
+            选中的行号数组，没有筛选条件时返回None（表示全部行）
+        """
+        if not sector:
+            return None
+        return np.flatnonzero(
+            partition.text_mask('sector', lambda text: sector in self._split_sectors(text))
+        )
+    
+    @profiled
     def query_by_date(self, trade_date: str, 
                      stock_code: str = None,
                      sector: str = None,
-                     limit: int = None) -> pd.DataFrame:
+                     limit: int = None,
+                     columns: List[str] = None) -> pd.DataFrame:
         """
         按日期查询数据
         
@@ -159,20 +1073,28 @@ class DatabaseManager:
             stock_code: 股票代码（可选）
             sector: 板块（可选）
             limit: 限制返回数量
+            columns: 返回的列（默认 DEFAULT_QUERY_COLUMNS，传入 daily_columns 返回全部列）
             
         Returns:
-            DataFrame
+            DataFrame（紧凑类型，见 _compact_frame）
         """
-        query = "SELECT * FROM stock_daily WHERE trade_date = ?"
-        params = [trade_date]
+        columns = self._resolve_columns(columns)
         
-        if stock_code:
-            query += " AND stock_code = ?"
-            params.append(stock_code)
+        # 整天或按板块查询时优先从列式缓存读取（分区已按股票代码排序）；
+        # 单只股票走 (trade_date, stock_code) 唯一索引，比映射整个分区快
+        partitions = None
+        if not stock_code:
+            load = columns + ['sector'] if sector else columns
+            partitions = self._cached_partitions(trade_date, trade_date, load)
+        if partitions:
+            partition = partitions[0]
+            rows = self._select_rows(partition, sector)
+            if limit:
+                rows = (np.arange(partition.row_count) if rows is None else rows)[:limit]
+            return self._compact_frame(partition.to_frame(rows, columns, CATEGORY_COLUMNS))
         
-        if sector:
-            query += " AND sector LIKE ?"
-            params.append(f"%{sector}%")
+        where, params = self._build_date_filter(trade_date, stock_code, sector)
+        query = f"SELECT {', '.join(columns)} FROM stock_daily WHERE {where}"
         
         # 默认按股票代码排序
         query += " ORDER BY stock_code ASC"
@@ -180,120 +1102,182 @@ class DatabaseManager:
         if limit:
             query += f" LIMIT {limit}"
         
-        return pd.read_sql_query(query, self.connection, params=params)
+        return self._compact_frame(pd.read_sql_query(query, self._reader(), params=params))
     
+    @property
+    def daily_columns(self) -> List[str]:
+        """stock_daily 的全部列"""
+        return list(self._daily_columns)
+    
+    def _resolve_columns(self, columns: List[str] = None) -> List[str]:
+        """检查查询列，未指定时返回默认列"""
+        if columns is None:
+            return DEFAULT_QUERY_COLUMNS
+        
+        unknown = [col for col in columns if col not in self._daily_columns]
+        if unknown:
+            raise ValueError(f"stock_daily 中没有这些列: {', '.join(unknown)}")
+        return list(columns)
+    
+    def _compact_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        把查询结果转换为紧凑类型
+        
+        REAL列转换为float32（整列缺失或混有文本时按数值解析），FLOAT64_COLUMNS 中的金额和市值列
+        保持float64；CATEGORY_COLUMNS 中的文本列转换为分类类型，其余列保持不变。
+        
+        Args:
+            df: 查询结果
+            
+        Returns:
+            转换后的DataFrame
+        """
+        data = {}
+        for column in df.columns:
+            values = df[column]
+            if column in CATEGORY_COLUMNS:
+                if not isinstance(values.dtype, pd.CategoricalDtype):
+                    values = values.astype('category')
+            elif column in self._real_columns:
+                dtype = np.float64 if column in FLOAT64_COLUMNS else np.float32
+                if values.dtype != dtype:
+                    values = pd.to_numeric(values, errors='coerce').astype(dtype)
+            data[column] = values
+        return pd.DataFrame(data, columns=df.columns, copy=False)
+    
+    @staticmethod
+    def _build_date_filter(trade_date: str, stock_code: str = None,
+                           sector: str = None, alias: str = '') -> Tuple[str, list]:
+        """
+        构建按日期查询的WHERE条件
+        
+        Args:
+            trade_date: 交易日期
+            stock_code: 股票代码（可选）
+            sector: 板块（可选）
+            alias: 表别名前缀，如 "t."
+            
+        Returns:
+            (WHERE条件SQL, 参数列表)
+        """
+        conditions = [f"{alias}trade_date = ?"]
+        params = [trade_date]
+        
+        if stock_code:
+            conditions.append(f"{alias}stock_code = ?")
+            params.append(stock_code)
+        
+        if sector:
+            # 通过板块关联表精确匹配，走 (trade_date, stock_code) 唯一索引
+            conditions.append(
+                f"{alias}stock_code IN (SELECT ss.stock_code FROM stock_sector ss"
+                f" JOIN sector s ON s.id = ss.sector_id"
+                f" WHERE s.name = ? AND ss.trade_date = ?)"
+            )
+            params.extend([sector, trade_date])
+        
+        return " AND ".join(conditions), params
+    
+    @profiled
     def query_by_date_with_comparison(self, trade_date: str,
                                       stock_code: str = None,
                                       sector: str = None,
-                                      limit: int = None) -> pd.DataFrame:
+                                      limit: int = None,
+                                      live: bool = False,
+                                      columns: List[str] = None) -> pd.DataFrame:
         """
-        按日期查询数据，并计算与前一天的对比值
+        按日期查询数据，并附带与前一交易日的对比值
         
         Args:
             trade_date: 交易日期
             stock_code: 股票代码（可选）
             sector: 板块（可选）
             limit: 限制返回数量
+            live: 是否实时计算对比值（默认读取导入时已持久化的结果）
+            columns: 返回的列（默认 DEFAULT_QUERY_COLUMNS）
             
         Returns:
-            DataFrame (包含 main_net_prev_ratio 和 volume_prev_ratio 两列)
+            DataFrame (默认列中包含 main_net_prev_ratio 和 volume_prev_ratio 两列)
         """
-        # 查询当天数据
-        today_df = self.query_by_date(trade_date, stock_code, sector, limit)
+        if live:
+            return self._query_comparison_live(trade_date, stock_code, sector, limit, columns)
         
-        if today_df.empty:
-            return today_df
+        # 对比值已在导入时计算并存入 stock_daily，直接读取即可
+        return self.query_by_date(trade_date, stock_code, sector, limit, columns)
+    
+    def _query_comparison_live(self, trade_date: str,
+                               stock_code: str = None,
+                               sector: str = None,
+                               limit: int = None,
+                               columns: List[str] = None) -> pd.DataFrame:
+        """
+        通过自连接实时计算前日对比值
         
-        # 获取前一个交易日
-        prev_date = self._get_previous_trade_date(trade_date)
+        当天筛选后的每一行按 (前一交易日, 股票代码) 走唯一索引关联前一天的数据，
+        只读取匹配到的股票，除数为0或缺失时结果为NULL。
         
-        if prev_date is None:
-            # 没有前一天数据，添加空列
-            today_df['main_net_prev_ratio'] = None
-            today_df['volume_prev_ratio'] = None
-            logging.info(f"日期 {trade_date} 没有前一个交易日，对比列设为空")
-            return today_df
-        
-        # 查询前一天数据
-        prev_df = self.query_by_date(prev_date)
-        
-        if prev_df.empty:
-            # 前一天没有数据
-            today_df['main_net_prev_ratio'] = None
-            today_df['volume_prev_ratio'] = None
-            logging.warning(f"前一个交易日 {prev_date} 没有数据，对比列设为空")
-            return today_df
-        
-        # 创建前一天数据的字典，以stock_code为键
-        prev_dict = prev_df.set_index('stock_code')[['main_net_amount', 'auction_today_volume']].to_dict('index')
-        
-        # 计算对比值
-        main_net_ratios = []
-        volume_ratios = []
-        
-        for _, row in today_df.iterrows():
-            code = row['stock_code']
-            
-            # 主力净额对比
-            if code in prev_dict:
-                today_main = row.get('main_net_amount')
-                prev_main = prev_dict[code].get('main_net_amount')
-                
-                if pd.notna(today_main) and pd.notna(prev_main) and prev_main != 0:
-                    main_ratio = today_main / prev_main
-                else:
-                    main_ratio = None
-            else:
-                main_ratio = None
-            
-            main_net_ratios.append(main_ratio)
-            
-            # 成交额对比
-            if code in prev_dict:
-                today_vol = row.get('auction_today_volume')
-                prev_vol = prev_dict[code].get('auction_today_volume')
-                
-                if pd.notna(today_vol) and pd.notna(prev_vol) and prev_vol != 0:
-                    vol_ratio = today_vol / prev_vol
-                else:
-                    vol_ratio = None
-            else:
-                vol_ratio = None
+        Args:
+            trade_date: 交易日期
+            stock_code: 股票代码（可选）
+            sector: 板块（可选）
+            limit: 限制返回数量
+            columns: 返回的列（默认 DEFAULT_QUERY_COLUMNS）
             
-            volume_ratios.append(vol_ratio)
+        Returns:
+            DataFrame (prev_trade_date、main_net_prev_ratio 和 volume_prev_ratio 列为实时计算值)
+        """
+        columns = self._resolve_columns(columns)
+        prev_date = self._get_previous_trade_date(trade_date)
+        where, params = self._build_date_filter(trade_date, stock_code, sector, alias='t.')
         
-        # 添加对比列
-        today_df['main_net_prev_ratio'] = main_net_ratios
-        today_df['volume_prev_ratio'] = volume_ratios
+        live_columns = {
+            'prev_trade_date': "? AS prev_trade_date",
+            'main_net_prev_ratio': "CASE WHEN p.main_net_amount != 0 "
+                                   "THEN t.main_net_amount / p.main_net_amount END AS main_net_prev_ratio",
+            'volume_prev_ratio': "CASE WHEN p.auction_today_volume != 0 "
+                                 "THEN t.auction_today_volume / p.auction_today_volume END AS volume_prev_ratio",
+        }
+        select_list = ", ".join(live_columns.get(col, f"t.{col}") for col in columns)
+        select_params = [prev_date] if 'prev_trade_date' in columns else []
         
-        logging.info(f"已计算 {trade_date} 与 {prev_date} 的对比值")
+        query = f'''
+            SELECT {select_list}
+            FROM stock_daily t
+            LEFT JOIN stock_daily p
+                   ON p.trade_date = ? AND p.stock_code = t.stock_code
+            WHERE {where}
+            ORDER BY t.stock_code ASC
+        '''
+        if limit:
+            query += f" LIMIT {limit}"
         
-        return today_df
+        return self._compact_frame(
+            pd.read_sql_query(query, self._reader(), params=select_params + [prev_date] + params)
+        )
     
-    def _get_previous_trade_date(self, current_date: str) -> Optional[str]:
+    def _get_previous_trade_date(self, current_date: str, cursor=None) -> Optional[str]:
         """
         获取指定日期的前一个交易日
         
         Args:
             current_date: 当前日期
+            cursor: 数据库游标（写事务中传入写连接的游标，以读取未提交的日历）
             
         Returns:
             前一个交易日，如果不存在则返回None
         """
-        cursor = self.connection.cursor()
-        cursor.execute("""
-            SELECT DISTINCT trade_date 
-            FROM stock_daily 
-            WHERE trade_date < ? 
-            ORDER BY trade_date DESC 
-            LIMIT 1
-        """, (current_date,))
-        
-        result = cursor.fetchone()
-        return result[0] if result else None
+        if cursor is None:
+            cursor = self._reader().cursor()
+        cursor.execute(
+            "SELECT MAX(trade_date) FROM trade_calendar WHERE trade_date < ?",
+            (current_date,)
+        )
+        return cursor.fetchone()[0]
     
+    @profiled
     def query_by_date_range(self, start_date: str, end_date: str,
-                           stock_code: str = None) -> pd.DataFrame:
+                           stock_code: str = None,
+                           columns: List[str] = None) -> pd.DataFrame:
         """
         按日期范围查询数据
         
@@ -301,11 +1285,22 @@ class DatabaseManager:
             start_date: 开始日期
             end_date: 结束日期
             stock_code: 股票代码（可选）
+            columns: 返回的列（默认 DEFAULT_QUERY_COLUMNS）
             
         Returns:
-            DataFrame
+            DataFrame（紧凑类型，见 _compact_frame）
         """
-        query = "SELECT * FROM stock_daily WHERE trade_date BETWEEN ? AND ?"
+        columns = self._resolve_columns(columns)
+        
+        # 多日整表查询优先从列式缓存读取后拼接；单只股票每天只有一行，
+        # 走 idx_code_date 索引远快于映射范围内的每个分区
+        partitions = None if stock_code else self._cached_partitions(start_date, end_date, columns)
+        if partitions:
+            return self._compact_frame(partitions_to_frame(
+                partitions, [None] * len(partitions), columns, CATEGORY_COLUMNS
+            ))
+        
+        query = f"SELECT {', '.join(columns)} FROM stock_daily WHERE trade_date BETWEEN ? AND ?"
         params = [start_date, end_date]
         
         if stock_code:
@@ -314,49 +1309,201 @@ class DatabaseManager:
         
         query += " ORDER BY trade_date, stock_code"
         
-        return pd.read_sql_query(query, self.connection, params=params)
+        return self._compact_frame(pd.read_sql_query(query, self._reader(), params=params))
+    
+    @staticmethod
+    def _build_range_filter(start_date: str, end_date: str, stock_code: str = None,
+                            sector: str = None) -> Tuple[str, list]:
+        """
+        构建按日期范围查询的WHERE条件（板块按每行所在交易日的板块关联精确匹配）
+        
+        Returns:
+            (WHERE条件SQL, 参数列表)
+        """
+        conditions = ["d.trade_date BETWEEN ? AND ?"]
+        params = [start_date, end_date]
+        
+        if stock_code:
+            conditions.append("d.stock_code = ?")
+            params.append(stock_code)
+        
+        if sector:
+            # 板块关联表主键 (sector_id, trade_date, stock_code) 逐行定位
+            conditions.append(
+                "EXISTS (SELECT 1 FROM stock_sector ss"
+                " WHERE ss.sector_id = (SELECT id FROM sector WHERE name = ?)"
+                " AND ss.trade_date = d.trade_date AND ss.stock_code = d.stock_code)"
+            )
+            params.append(sector)
+        
+        return " AND ".join(conditions), params
+    
+    @profiled
+    def count_date_range(self, start_date: str, end_date: str,
+                         stock_code: str = None, sector: str = None) -> int:
+        """
+        统计日期范围内的记录数（导出进度的总数）
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            stock_code: 股票代码（可选）
+            sector: 板块（可选）
+            
+        Returns:
+            记录数
+        """
+        where, params = self._build_range_filter(start_date, end_date, stock_code, sector)
+        cursor = self._reader().cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM stock_daily d WHERE {where}", params)
+        return cursor.fetchone()[0]
     
-    def search_stocks(self, keyword: str, trade_date: str = None) -> pd.DataFrame:
+    def iter_date_range(self, start_date: str, end_date: str,
+                        stock_code: str = None, sector: str = None,
+                        columns: List[str] = None,
+                        chunk_size: int = None) -> Iterator[pd.DataFrame]:
+        """
+        按日期范围分块读取数据（按交易日期、股票代码排序）
+        
+        整个范围只执行一条查询，游标每次取 chunk_size 行，内存占用与总行数无关。
+        各块的列类型固定：REAL列为float64（整块缺失时也是），其余列保持SQLite返回的类型，
+        便于导出时各块写入同一个表结构。
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            stock_code: 股票代码（可选）
+            sector: 板块（可选）
+            columns: 返回的列（默认 DEFAULT_QUERY_COLUMNS）
+            chunk_size: 每块行数（默认 config.EXPORT_CHUNK_ROWS）
+            
+        Yields:
+            DataFrame
+        """
+        columns = self._resolve_columns(columns)
+        where, params = self._build_range_filter(start_date, end_date, stock_code, sector)
+        query = (
+            f"SELECT {', '.join(f'd.{col}' for col in columns)} FROM stock_daily d"
+            f" WHERE {where} ORDER BY d.trade_date, d.stock_code"
+        )
+        
+        chunks = pd.read_sql_query(
+            query, self._reader(), params=params,
+            chunksize=chunk_size or config.EXPORT_CHUNK_ROWS
+        )
+        for chunk in chunks:
+            for column in columns:
+                if column in self._real_columns and chunk[column].dtype != np.float64:
+                    chunk[column] = pd.to_numeric(chunk[column], errors='coerce').astype(np.float64)
+            yield chunk
+    
+    @profiled
+    def get_stock_history(self, stock_code: str, start_date: str = None, end_date: str = None,
+                          columns: List[str] = None) -> Dict[str, np.ndarray]:
+        """
+        获取单只股票的历史序列（从按代码聚簇的股票历史表读取，按日期升序）
+        
+        Args:
+            stock_code: 股票代码
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            columns: 指标列（可选，默认 HISTORY_COLUMNS 全部）
+            
+        Returns:
+            {列名: NumPy数组}，包含 trade_date、stock_name 和各指标列；
+            指标列为float64数组，缺失值为NaN
+        """
+        metrics = list(columns) if columns else HISTORY_COLUMNS
+        unknown = [col for col in metrics if col not in HISTORY_COLUMNS]
+        if unknown:
+            raise ValueError(f"不支持的历史指标: {', '.join(unknown)}")
+        
+        query = f"SELECT trade_date, stock_name, {', '.join(metrics)} FROM stock_history WHERE stock_code = ?"
+        params = [stock_code]
+        if start_date:
+            query += " AND trade_date >= ?"
+            params.append(start_date)
+        if end_date:
+            query += " AND trade_date <= ?"
+            params.append(end_date)
+        query += " ORDER BY trade_date"
+        
+        cursor = self._reader().cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        values = list(zip(*rows)) if rows else [()] * (len(metrics) + 2)
+        
+        history = {
+            'trade_date': np.array(values[0], dtype=object),
+            'stock_name': np.array(values[1], dtype=object),
+        }
+        for col, col_values in zip(metrics, values[2:]):
+            try:
+                history[col] = np.array(col_values, dtype=np.float64)
+            except (ValueError, TypeError):
+                # 个别单元格保存的是无法转换的文本
+                history[col] = pd.to_numeric(
+                    pd.Series(col_values, dtype=object), errors='coerce'
+                ).to_numpy(dtype=np.float64)
+        return history
+    
+    @profiled
+    def search_stocks(self, keyword: str, trade_date: str = None,
+                      columns: List[str] = None) -> pd.DataFrame:
         """
         搜索股票
         
         Args:
             keyword: 关键词（股票代码或名称）
             trade_date: 交易日期（可选）
+            columns: 返回的列（默认 DEFAULT_QUERY_COLUMNS）
             
         Returns:
-            DataFrame
+            DataFrame（紧凑类型，见 _compact_frame）
         """
-        query = "SELECT * FROM stock_daily WHERE (stock_code LIKE ? OR stock_name LIKE ?)"
+        columns = self._resolve_columns(columns)
+        query = f"SELECT {', '.join(columns)} FROM stock_daily WHERE (stock_code LIKE ? OR stock_name LIKE ?)"
         params = [f"%{keyword}%", f"%{keyword}%"]
         
         if trade_date:
             query += " AND trade_date = ?"
             params.append(trade_date)
         
-        return pd.read_sql_query(query, self.connection, params=params)
+        return self._compact_frame(pd.read_sql_query(query, self._reader(), params=params))
     
+    @profiled
     def get_all_dates(self) -> List[str]:
-        """获取所有已导入的交易日期"""
-        cursor = self.connection.cursor()
-        cursor.execute("SELECT DISTINCT trade_date FROM stock_daily ORDER BY trade_date DESC")
+        """获取所有已导入的交易日期（从交易日历读取，按日期倒序）"""
+        cursor = self._reader().cursor()
+        cursor.execute("SELECT trade_date FROM trade_calendar ORDER BY trade_date DESC")
         return [row[0] for row in cursor.fetchall()]
     
+    @profiled
+    def get_latest_date(self) -> Optional[str]:
+        """获取最近的交易日期，数据库为空时返回None"""
+        cursor = self._reader().cursor()
+        cursor.execute("SELECT MAX(trade_date) FROM trade_calendar")
+        return cursor.fetchone()[0]
+    
+    @profiled
+    def get_trade_calendar(self) -> pd.DataFrame:
+        """获取交易日历（日期、记录数、导入时间、前后交易日）"""
+        return pd.read_sql_query(
+            "SELECT * FROM trade_calendar ORDER BY trade_date DESC",
+            self._reader()
+        )
+    
+    @profiled
     def get_all_sectors(self) -> List[str]:
-        """获取所有板块"""
-        cursor = self.connection.cursor()
-        cursor.execute("SELECT DISTINCT sector FROM stock_daily WHERE sector IS NOT NULL")
-        sectors = set()
-        for row in cursor.fetchall():
-            if row[0]:
-                # 板块可能是逗号分隔的多个板块
-                for sector in str(row[0]).split('、'):
-                    sectors.add(sector.strip())
-        return sorted(list(sectors))
+        """获取所有板块（从板块字典表读取）"""
+        cursor = self._reader().cursor()
+        cursor.execute("SELECT name FROM sector ORDER BY name")
+        return [row[0] for row in cursor.fetchall()]
     
+    @profiled
     def get_statistics(self, trade_date: str) -> Dict:
         """
-        获取指定日期的统计信息
+        获取指定日期的统计信息（从每日汇总表读取）
         
         Args:
             trade_date: 交易日期
@@ -364,60 +1511,194 @@ class DatabaseManager:
         Returns:
             统计信息字典
         """
-        cursor = self.connection.cursor()
+        cursor = self._reader().cursor()
+        cursor.execute("SELECT * FROM daily_summary WHERE trade_date = ?", (trade_date,))
+        row = cursor.fetchone()
         
-        # 总股票数
-        cursor.execute("SELECT COUNT(*) FROM stock_daily WHERE trade_date = ?", (trade_date,))
-        total_count = cursor.fetchone()[0]
+        if row is None:
+            return {
+                'trade_date': trade_date,
+                'total_count': 0,
+                'positive_main_count': 0,
+                'negative_main_count': 0,
+                'positive_volume_count': 0,
+                'up_count': 0,
+                'down_count': 0,
+                'total_main_net': 0,
+                'total_volume': 0,
+                'avg_price_change': 0,
+                'avg_turnover': 0
+            }
         
-        # 主力净流入股票数
-        cursor.execute(
-            "SELECT COUNT(*) FROM stock_daily WHERE trade_date = ? AND main_net_amount > 0",
-            (trade_date,)
-        )
-        positive_main_count = cursor.fetchone()[0]
+        stats = dict(zip([col[0] for col in cursor.description], row))
+        for key in ('total_main_net', 'total_volume'):
+            stats[key] = stats[key] or 0
+        stats['avg_price_change'] = round(stats['avg_price_change'] or 0, 2)
+        stats['avg_turnover'] = round(stats['avg_turnover'] or 0, 2)
+        return stats
+    
+    @profiled
+    def get_sector_statistics(self, trade_date: str) -> pd.DataFrame:
+        """
+        获取指定日期各板块的汇总（按主力净额倒序）
         
-        # 成交额增长股票数
-        cursor.execute(
-            "SELECT COUNT(*) FROM stock_daily WHERE trade_date = ? AND auction_today_volume > auction_yesterday_volume",
-            (trade_date,)
-        )
-        positive_volume_count = cursor.fetchone()[0]
+        Args:
+            trade_date: 交易日期
+            
+        Returns:
+            DataFrame，包含 sector、stock_count、positive_main_count、up_count、
+            down_count、total_main_net、total_volume、avg_price_change、avg_turnover
+        """
+        query = '''
+            SELECT s.name AS sector, ds.stock_count, ds.positive_main_count,
+                   ds.up_count, ds.down_count, ds.total_main_net, ds.total_volume,
+                   ds.avg_price_change, ds.avg_turnover
+            FROM sector_daily_summary ds
+            JOIN sector s ON s.id = ds.sector_id
+            WHERE ds.trade_date = ?
+            ORDER BY ds.total_main_net DESC
+        '''
+        return pd.read_sql_query(query, self._reader(), params=[trade_date])
+    
+    @profiled
+    def get_statistics_trend(self, days: int = 30, sector: str = None) -> pd.DataFrame:
+        """
+        获取最近若干交易日的汇总趋势（按日期升序）
         
-        # 平均换手率
-        cursor.execute(
-            "SELECT AVG(turnover_rate) FROM stock_daily WHERE trade_date = ? AND turnover_rate IS NOT NULL",
-            (trade_date,)
-        )
-        avg_turnover = cursor.fetchone()[0] or 0
+        Args:
+            days: 交易日数
+            sector: 板块名称（可选，指定时返回该板块的趋势）
+            
+        Returns:
+            DataFrame，每个交易日一行
+        """
+        if sector:
+            query = '''
+                SELECT * FROM (
+                    SELECT ds.trade_date, ds.stock_count AS total_count, ds.positive_main_count,
+                           ds.up_count, ds.down_count, ds.total_main_net, ds.total_volume,
+                           ds.avg_price_change, ds.avg_turnover
+                    FROM sector_daily_summary ds
+                    WHERE ds.sector_id = (SELECT id FROM sector WHERE name = ?)
+                    ORDER BY ds.trade_date DESC
+                    LIMIT ?
+                ) ORDER BY trade_date
+            '''
+            params = [sector, days]
+        else:
+            query = '''
+                SELECT * FROM (
+                    SELECT * FROM daily_summary ORDER BY trade_date DESC LIMIT ?
+                ) ORDER BY trade_date
+            '''
+            params = [days]
         
-        return {
-            'total_count': total_count,
-            'positive_main_count': positive_main_count,
-            'positive_volume_count': positive_volume_count,
-            'avg_turnover': round(avg_turnover, 2)
-        }
+        return pd.read_sql_query(query, self._reader(), params=params)
     
+    @_serialized_write
     def add_import_history(self, file_name: str, trade_date: str, 
                           records_count: int, status: str, 
-                          error_message: str = None):
-        """添加导入历史记录"""
+                          error_message: str = None,
+                          file_signature: Dict = None,
+                          metrics: Dict = None):
+        """
+        添加导入历史记录
+        
+        Args:
+            file_name: 文件名
+            trade_date: 交易日期
+            records_count: 导入记录数
+            status: 状态（success / failed / unchanged）
+            error_message: 错误信息
+            file_signature: 文件签名（file_path、file_size、file_mtime、content_hash），用于导入台账
+            metrics: 导入指标（各阶段耗时、行/秒、读取字节数、解析内存增量），以JSON保存
+        """
+        signature = file_signature or {}
         cursor = self.connection.cursor()
         cursor.execute('''
             INSERT INTO import_history 
-            (file_name, trade_date, records_count, status, error_message)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (file_name, trade_date, records_count, status, error_message))
+            (file_name, trade_date, records_count, status, error_message,
+             file_path, file_size, file_mtime, content_hash, metrics)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (file_name, trade_date, records_count, status, error_message,
+              signature.get('file_path'), signature.get('file_size'),
+              signature.get('file_mtime'), signature.get('content_hash'),
+              json.dumps(metrics, ensure_ascii=False) if metrics else None))
         self.connection.commit()
     
+    @profiled
+    def find_unchanged_import(self, file_path: str,
+                              expected_trade_date: str = None) -> Tuple[Optional[Dict], Dict]:
+        """
+        在导入台账中查找未变化的已导入文件
+        
+        先按路径、大小、修改时间匹配（只读取文件元数据）；未命中时计算内容哈希，
+        再按哈希和大小匹配（文件被移动或仅修改时间变化）。
+        只有对应交易日期的数据仍在库中时，记录才视为有效。
+        仅内容一致时，记录的交易日期还须等于 expected_trade_date
+        （同一内容另存为其他日期的文件需要导入）。
+        
+        Args:
+            file_path: 文件路径
+            expected_trade_date: 文件对应的交易日期（通常取自文件名），不传时哈希匹配不算未变化
+            
+        Returns:
+            (匹配的导入记录或None, 文件签名)。文件签名在未命中时包含content_hash，
+            可直接传给 add_import_history 记录本次导入。
+        """
+        signature = get_file_signature(file_path)
+        cursor = self._reader().cursor()
+        
+        valid_record_sql = '''
+            SELECT h.trade_date, h.import_date, h.records_count, h.content_hash
+            FROM import_history h
+            WHERE {condition}
+              AND h.status IN ('success', 'unchanged')
+              AND EXISTS (SELECT 1 FROM trade_calendar c WHERE c.trade_date = h.trade_date)
+            ORDER BY h.id DESC
+            LIMIT 1
+        '''
+        
+        cursor.execute(
+            valid_record_sql.format(condition="h.file_path = ? AND h.file_size = ? AND h.file_mtime = ?"),
+            (signature['file_path'], signature['file_size'], signature['file_mtime'])
+        )
+        row = cursor.fetchone()
+        matched_by = 'signature'
+        
+        if row is None:
+            matched_by = 'hash'
+            signature['content_hash'] = compute_file_hash(file_path)
+            cursor.execute(
+                valid_record_sql.format(condition="h.content_hash = ? AND h.file_size = ?"),
+                (signature['content_hash'], signature['file_size'])
+            )
+            row = cursor.fetchone()
+            if row is not None and row[0] != expected_trade_date:
+                row = None
+        
+        if row is None:
+            return None, signature
+        
+        signature['content_hash'] = row[3]
+        record = {
+            'trade_date': row[0],
+            'import_date': row[1],
+            'records_count': row[2],
+            'matched_by': matched_by,  # signature: 路径/大小/时间一致；hash: 仅内容一致
+        }
+        return record, signature
+    
+    @profiled
     def get_import_history(self, limit: int = 100) -> pd.DataFrame:
         """获取导入历史"""
         return pd.read_sql_query(
             "SELECT * FROM import_history ORDER BY import_date DESC LIMIT ?",
-            self.connection,
+            self._reader(),
             params=[limit]
         )
     
+    @_serialized_write
     def delete_by_date(self, trade_date: str) -> int:
         """
         删除指定日期的数据
@@ -430,12 +1711,37 @@ class DatabaseManager:
         """
         cursor = self.connection.cursor()
         cursor.execute("DELETE FROM stock_daily WHERE trade_date = ?", (trade_date,))
+        deleted = cursor.rowcount
+        self._update_derived_data(cursor, trade_date)
+        self.connection.commit()
+        self._invalidate_column_cache()
+        return deleted
+    
+    @_serialized_write
+    def clear_all(self) -> int:
+        """
+        清空所有股票数据（同时清空交易日历、板块数据、每日汇总和股票历史）
+        
+        Returns:
+            删除的行数
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("DELETE FROM stock_daily")
+        deleted = cursor.rowcount
+        cursor.execute("DELETE FROM trade_calendar")
+        cursor.execute("DELETE FROM stock_sector")
+        cursor.execute("DELETE FROM sector")
+        cursor.execute("DELETE FROM daily_summary")
+        cursor.execute("DELETE FROM sector_daily_summary")
+        cursor.execute("DELETE FROM stock_history")
         self.connection.commit()
-        return cursor.rowcount
+        if self._column_cache is not None:
+            self._column_cache.clear()
+        return deleted
     
     def close(self):
         """关闭数据库连接"""
-        if self.connection:
-            self.connection.close()
+        if self._pool:
+            self._pool.close_all()
             logging.info("数据库连接已关闭")
 
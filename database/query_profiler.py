@@ -0,0 +1,274 @@
+"""
+查询性能分析
+按 DatabaseManager 的方法（操作）统计耗时，区分SQLite执行耗时和DataFrame构建耗时。
+
+连接池的连接使用 ProfilingConnection 创建，其游标在分析启用且当前线程有正在记录的
+操作时，累计 execute / fetch* 的耗时并记录执行的SQL和参数；其余时间（pandas构建
+DataFrame、类型转换、读取列式缓存）计为DataFrame耗时。
+每个操作保留最近若干次的样本用于计算p50/p95，超过阈值的慢查询连同
+EXPLAIN QUERY PLAN 写入日志。
+"""
+import time
+import sqlite3
+import logging
+import threading
+import functools
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+# 日志和慢查询列表中参数的最大显示长度
+_MAX_PARAMS_REPR = 200
+
+
+class _OperationRecord:
+    """一次操作（一次方法调用）的记录"""
+
+    __slots__ = ('method', 'start', 'sqlite_seconds', 'statements')
+
+    def __init__(self, method: str):
+        self.method = method
+        self.start = time.perf_counter()
+        self.sqlite_seconds = 0.0
+        self.statements = []  # (连接, SQL, 参数)
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """记录SQLite耗时的游标（未启用分析或当前线程没有正在记录的操作时直接执行）"""
+
+    def execute(self, sql, parameters=()):
+        record = _current_record(self.connection)
+        if record is None:
+            return super().execute(sql, parameters)
+        record.statements.append((self.connection, sql, parameters))
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            record.sqlite_seconds += time.perf_counter() - start
+
+    def fetchone(self):
+        record = _current_record(self.connection)
+        if record is None:
+            return super().fetchone()
+        start = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            record.sqlite_seconds += time.perf_counter() - start
+
+    def fetchmany(self, size=None):
+        record = _current_record(self.connection)
+        size = self.arraysize if size is None else size
+        if record is None:
+            return super().fetchmany(size)
+        start = time.perf_counter()
+        try:
+            return super().fetchmany(size)
+        finally:
+            record.sqlite_seconds += time.perf_counter() - start
+
+    def fetchall(self):
+        record = _current_record(self.connection)
+        if record is None:
+            return super().fetchall()
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            record.sqlite_seconds += time.perf_counter() - start
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """游标为 ProfilingCursor 的连接（Connection.execute 也经由 cursor() 创建游标）"""
+
+    profiler: Optional['QueryProfiler'] = None
+
+    def cursor(self, factory=ProfilingCursor):
+        return super().cursor(factory)
+
+
+def _current_record(connection) -> Optional[_OperationRecord]:
+    profiler = getattr(connection, 'profiler', None)
+    if profiler is None or not profiler.enabled:
+        return None
+    return getattr(profiler._local, 'record', None)
+
+
+def _result_rows(result) -> int:
+    """操作返回的行数（DataFrame、列表按长度，历史序列按日期数，其余计为1行）"""
+    if result is None:
+        return 0
+    if isinstance(result, (pd.DataFrame, list)):
+        return len(result)
+    if isinstance(result, dict) and isinstance(result.get('trade_date'), np.ndarray):
+        return len(result['trade_date'])
+    return 1
+
+
+def _format_params(params) -> str:
+    text = repr(list(params) if isinstance(params, tuple) else params)
+    return text if len(text) <= _MAX_PARAMS_REPR else text[:_MAX_PARAMS_REPR] + '...'
+
+
+class QueryProfiler:
+    """
+    查询性能分析器（默认关闭，启用后才记录）
+
+    同一线程内嵌套调用的操作（如 query_by_date_with_comparison 调用 query_by_date）
+    只按最外层操作记录一次。
+    """
+
+    def __init__(self, enabled: bool = False, slow_threshold_ms: float = 500,
+                 window: int = 500, slow_log_size: int = 50):
+        """
+        Args:
+            enabled: 是否启用
+            slow_threshold_ms: 慢查询阈值（毫秒），总耗时超过该值的操作写入日志
+            window: 每个操作保留的最近样本数（p50/p95 按这些样本计算）
+            slow_log_size: 保留的最近慢查询条数
+        """
+        self.enabled = enabled
+        self.slow_threshold_ms = slow_threshold_ms
+        self.window = window
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._samples: Dict[str, deque] = {}  # 操作 -> (总耗时, SQLite耗时, DataFrame耗时, 行数)
+        self._counts: Dict[str, int] = {}
+        self._slow_queries = deque(maxlen=slow_log_size)
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._slow_queries.clear()
+
+    def run(self, method: str, func, *args, **kwargs):
+        """
+        执行并记录一次操作
+
+        Args:
+            method: 操作名称
+            func: 被调用的函数
+
+        Returns:
+            func 的返回值
+        """
+        if not self.enabled or getattr(self._local, 'record', None) is not None:
+            return func(*args, **kwargs)
+
+        record = self._local.record = _OperationRecord(method)
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            self._local.record = None
+        self._finish(record, _result_rows(result))
+        return result
+
+    def _finish(self, record: _OperationRecord, rows: int):
+        """汇总一次操作，超过阈值时记录慢查询"""
+        total = time.perf_counter() - record.start
+        sqlite_seconds = min(record.sqlite_seconds, total)
+        sample = (total, sqlite_seconds, total - sqlite_seconds, rows)
+
+        with self._lock:
+            samples = self._samples.get(record.method)
+            if samples is None:
+                samples = self._samples[record.method] = deque(maxlen=self.window)
+            samples.append(sample)
+            self._counts[record.method] = self._counts.get(record.method, 0) + 1
+
+        if total * 1000 >= self.slow_threshold_ms:
+            self._log_slow(record, sample)
+
+    def _log_slow(self, record: _OperationRecord, sample: tuple):
+        """记录慢查询及其查询计划"""
+        total, sqlite_seconds, frame_seconds, rows = sample
+        statements = []
+        for connection, sql, params in record.statements:
+            statements.append({
+                'sql': ' '.join(sql.split()),
+                'params': _format_params(params),
+                'plan': self._explain(connection, sql, params),
+            })
+
+        entry = {
+            'time': time.strftime('%H:%M:%S'),
+            'method': record.method,
+            'total_ms': total * 1000,
+            'sqlite_ms': sqlite_seconds * 1000,
+            'frame_ms': frame_seconds * 1000,
+            'rows': rows,
+            'statements': statements,
+        }
+        with self._lock:
+            self._slow_queries.append(entry)
+
+        lines = [
+            f"慢查询: {record.method} 耗时 {entry['total_ms']:.1f} ms"
+            f"（SQLite {entry['sqlite_ms']:.1f} ms，DataFrame {entry['frame_ms']:.1f} ms），{rows} 行"
+        ]
+        for statement in statements:
+            lines.append(f"  SQL: {statement['sql']}")
+            lines.append(f"  参数: {statement['params']}")
+            lines.extend(f"    {detail}" for detail in statement['plan'])
+        logger.warning("\n".join(lines))
+
+    @staticmethod
+    def _explain(connection, sql: str, params) -> List[str]:
+        """获取查询计划（非查询语句或执行失败时返回空列表）"""
+        if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return []
+        try:
+            return [row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        except sqlite3.Error as e:
+            return [f"(无法获取查询计划: {str(e)})"]
+
+    def stats(self) -> List[Dict]:
+        """
+        各操作的统计
+
+        Returns:
+            每个操作一条，按总耗时p95降序：method、count（累计次数）、samples（窗口内样本数）、
+            p50_ms、p95_ms、max_ms、sqlite_p50_ms、frame_p50_ms、avg_rows
+        """
+        with self._lock:
+            snapshot = {method: list(samples) for method, samples in self._samples.items()}
+            counts = dict(self._counts)
+
+        result = []
+        for method, samples in snapshot.items():
+            values = np.array(samples, dtype=np.float64)
+            totals_ms = values[:, 0] * 1000
+            result.append({
+                'method': method,
+                'count': counts[method],
+                'samples': len(samples),
+                'p50_ms': float(np.percentile(totals_ms, 50)),
+                'p95_ms': float(np.percentile(totals_ms, 95)),
+                'max_ms': float(totals_ms.max()),
+                'sqlite_p50_ms': float(np.percentile(values[:, 1], 50) * 1000),
+                'frame_p50_ms': float(np.percentile(values[:, 2], 50) * 1000),
+                'avg_rows': float(values[:, 3].mean()),
+            })
+        result.sort(key=lambda item: item['p95_ms'], reverse=True)
+        return result
+
+    def slow_queries(self) -> List[Dict]:
+        """最近的慢查询（按时间先后）"""
+        with self._lock:
+            return list(self._slow_queries)
+
+
+def profiled(method):
+    """查询方法装饰器：DatabaseManager 启用性能分析时按方法名记录耗时"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return self.profiler.run(method.__name__, method, self, *args, **kwargs)
+    return wrapper
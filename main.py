@@ -3,20 +3,21 @@
 """
 import sys
 import logging
+import multiprocessing
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QFont
 from ui.main_window import MainWindow
+from utils.log_utils import setup_logging as setup_async_logging
+import config
 
 
 def setup_logging():
-    """配置日志"""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('stock_analysis.log', encoding='utf-8'),
-            logging.StreamHandler()
-        ]
+    """配置日志（后台线程写入按大小轮转的日志文件，--verbose 输出详细日志）"""
+    setup_async_logging(
+        config.LOG_FILE,
+        verbose=config.LOG_VERBOSE or '--verbose' in sys.argv[1:],
+        max_bytes=config.LOG_MAX_BYTES,
+        backup_count=config.LOG_BACKUP_COUNT
     )
 
 
@@ -24,6 +25,10 @@ def main():
     """主函数"""
     # 配置日志
     setup_logging()
+    
+    # --profile: 启动即记录查询耗时（也可在"性能"窗口中开启）
+    if '--profile' in sys.argv[1:]:
+        config.QUERY_PROFILING = True
     logging.info("=" * 50)
     logging.info("股票数据分析系统启动")
     logging.info("=" * 50)
@@ -55,5 +60,7 @@ def main():
 
 
 if __name__ == '__main__':
+    # 打包成exe后，进程池子进程需要此调用才能正常启动
+    multiprocessing.freeze_support()
     main()
 
@@ -0,0 +1,75 @@
+"""测试并行批量导入 - 进程池解析、子进程日志回传、按交易日期顺序写入
+
+用法:
+    python -m pytest test_batch_import.py
+"""
+import io
+import logging
+
+import pandas as pd
+import pytest
+
+import config
+from data_processor import ExcelParser
+from utils.log_utils import setup_logging, shutdown_logging
+from utils.thread_worker import BatchImportWorker
+
+
+# 文件名 -> 行数（提交顺序与交易日期顺序不同）
+FILES = {'2025-01-09.xlsx': 3, '2025-01-07.xlsx': 1, '2025-01-08.xlsx': 2}
+
+
+@pytest.fixture
+def excel_files(tmp_path):
+    paths = []
+    for filename, rows in FILES.items():
+        file_path = tmp_path / filename
+        pd.DataFrame({
+            '股票代码': [str(i).zfill(6) for i in range(1, rows + 1)],
+            '股票名称': [f"股票{i}" for i in range(1, rows + 1)],
+            '主力净额': [f"{i}万" for i in range(1, rows + 1)],
+        }).to_excel(file_path, index=False)
+        paths.append(str(file_path))
+    return paths
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """启用异步日志（子进程日志经进程间队列写入同一文件），结束后恢复原来的根日志器"""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    path = tmp_path / 'import.log'
+    setup_logging(str(path), stream=io.StringIO())
+    yield path
+    shutdown_logging()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_parallel_import_keeps_date_order(db, excel_files, log_file):
+    worker = BatchImportWorker(excel_files, db, ExcelParser(), config.COLUMN_MAPPING, max_workers=2)
+    imported, completed = [], []
+    worker.file_imported.connect(
+        lambda filename, records, success, message: imported.append((filename, records, success))
+    )
+    worker.all_completed.connect(lambda *totals: completed.append(totals))
+    worker.run()
+
+    assert imported == [
+        ('2025-01-07.xlsx', 1, True),
+        ('2025-01-08.xlsx', 2, True),
+        ('2025-01-09.xlsx', 3, True),
+    ]
+    assert completed == [(3, 0, 6)]
+    assert db.get_all_dates()[:3] == ['2025-01-09', '2025-01-08', '2025-01-07']
+    assert [len(db.query_by_date(date)) for date in ['2025-01-07', '2025-01-08', '2025-01-09']] == [1, 2, 3]
+
+    # 子进程中的解析日志由主进程写入同一日志文件
+    shutdown_logging()
+    log_text = log_file.read_text(encoding='utf-8')
+    assert '使用 2 个进程并行解析 3 个文件' in log_text
+    for filename in FILES:
+        assert f"Excel解析完成: {filename}" in log_text
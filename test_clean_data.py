@@ -0,0 +1,160 @@
+"""测试数据清洗 - 整列处理与原逐单元格处理的结果对比，流式读取与 pandas.read_excel 的结果对比
+
+用法:
+    python -m pytest test_clean_data.py
+样本文件: sample_data 目录下的Excel文件（不存在时跳过该项）
+"""
+import glob
+import os
+from datetime import datetime
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+import config
+from data_processor import ExcelParser
+
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), 'sample_data')
+
+NUMERIC_COLUMNS = [
+    'current_price', 'price_change', 'auction_net_amount', 'auction_main_net',
+    'auction_today_volume', 'auction_yesterday_volume',
+    'main_net_amount', 'real_market_value', 'main_net_ratio', 'flow_ratio',
+    'net_ratio', 'buy_sell_ratio', 'turnover_rate', 'real_turnover_rate',
+    'volume_ratio', 'popularity_value', 'popularity_change'
+]
+
+
+def legacy_stock_code(series: pd.Series) -> pd.Series:
+    """原逐单元格的股票代码处理"""
+    return series.apply(
+        lambda x: str(int(x)).zfill(6) if pd.notna(x) and str(x).replace('.', '').isdigit() else str(x)
+    )
+
+
+def legacy_numeric(series: pd.Series) -> pd.Series:
+    """原逐单元格的数值解析"""
+    return series.apply(ExcelParser._parse_numeric)
+
+
+def assert_numeric_equal(actual: pd.Series, expected: pd.Series):
+    """按数值比较两列，NaN与None视为相等"""
+    np.testing.assert_allclose(
+        actual.astype(float).to_numpy(),
+        expected.astype(float).to_numpy(),
+        rtol=1e-12, equal_nan=True
+    )
+
+
+@pytest.mark.parametrize('values', [
+    ['1000万', '1.2亿', '-3.5亿', '12.5%', '1,234.5', '-', '', '  ', None, np.nan],
+    ['5000', ' 3,070万 ', '亿', '-万', 'abc', '1.2万亿', '7315.3亿', '0'],
+    [1, 2.5, None, '3万', '-0.8%'],
+    [np.nan, np.nan],
+])
+def test_parse_numeric_column_matches_legacy(values):
+    series = pd.Series(values, dtype=object)
+    assert_numeric_equal(ExcelParser._parse_numeric_column(series), legacy_numeric(series))
+
+
+def test_unparsable_cells_summarized_per_column(caplog):
+    """无法解析的单元格按列汇总为一条警告，并回填到统计中"""
+    df = pd.DataFrame({
+        'stock_code': ['1', '2', '3', '4'],
+        'flow_ratio': ['abc', '1.5%', 'abc', '--'],
+        'turnover_rate': ['1%', '2%', '3%', '4%'],
+    })
+    unparsable = {}
+    with caplog.at_level('INFO'):
+        ExcelParser._clean_with_log(df, {'flow_ratio': '净流占比'}, unparsable)
+
+    assert unparsable == {'净流占比': 3}
+    warnings = [record.getMessage() for record in caplog.records if record.levelname == 'WARNING']
+    assert warnings == ["⚠️  净流占比 中有 3 个单元格无法解析为数值，例如: 'abc', '--'"]
+
+
+def test_parse_numeric_column_numeric_dtype():
+    series = pd.Series([1.5, np.nan, -3.0])
+    assert_numeric_equal(ExcelParser._parse_numeric_column(series), legacy_numeric(series))
+
+
+@pytest.mark.parametrize('series', [
+    pd.Series([1, 2.5, None], dtype=object),  # 没有字符串的混合列
+    pd.Series(pd.to_datetime(['2025-01-02', None])),  # 日期列
+    pd.Series([pd.Timestamp('2025-01-02'), '1万', 3], dtype=object),
+    pd.Series([True, False]),  # 布尔列
+    pd.Series([True, None], dtype=object),
+], ids=['object_no_strings', 'datetime', 'object_datetime', 'bool', 'object_bool'])
+def test_parse_numeric_column_non_text_columns(series):
+    """不含字符串的列不经过字符串清洗，结果与逐个解析一致"""
+    assert_numeric_equal(ExcelParser._parse_numeric_column(series), legacy_numeric(series))
+
+
+@pytest.mark.parametrize('values', [
+    [1, 600519, 2, 300750],
+    [1.0, 600519.0, np.nan],
+    ['000001', '600519', 'SH600519', '1', np.nan],
+    [1, '000002', 'ABC', 600519.0],
+])
+def test_normalize_stock_code_matches_legacy(values):
+    series = pd.Series(values)
+    actual = ExcelParser._normalize_stock_code(series)
+    expected = legacy_stock_code(series)
+    assert actual.tolist() == expected.tolist()
+
+
+@pytest.mark.skipif(not glob.glob(os.path.join(SAMPLE_DIR, '*.xlsx')), reason='没有样本文件')
+@pytest.mark.parametrize('file_path', sorted(glob.glob(os.path.join(SAMPLE_DIR, '*.xlsx'))))
+def test_sample_files_match_legacy(file_path):
+    raw = pd.read_excel(file_path, engine='openpyxl')
+
+    for excel_col, db_col in config.COLUMN_MAPPING.items():
+        if excel_col not in raw.columns:
+            continue
+        series = raw[excel_col]
+        if db_col == 'stock_code':
+            assert ExcelParser._normalize_stock_code(series).tolist() == legacy_stock_code(series).tolist()
+        elif db_col in NUMERIC_COLUMNS:
+            assert_numeric_equal(ExcelParser._parse_numeric_column(series), legacy_numeric(series))
+
+
+@pytest.fixture
+def irregular_workbook(tmp_path):
+    """含空行、不等长行、以文本存储的数字和交易日期列的工作簿（文件名中没有日期）"""
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(['交易日期', '股票代码', '股票名称', '主力净额', '涨幅', '备注'])
+    sheet.append([None, 1, '平安银行', '1.5亿', 0.5, '首行无日期'])
+    sheet.append([])
+    sheet.append([datetime(2025, 1, 7), '000002', '万科A', '-3000万'])
+    sheet.append([None, None, None, None, None, '合计'])
+    sheet.append([datetime(2025, 1, 7), '600519', '贵州茅台', '2500', '1.25'])
+    sheet.append([datetime(2025, 1, 7), '  ', '空白代码', 10])
+    sheet.append([None, None, '只有名称'])
+    sheet.append([datetime(2025, 1, 7), 300750.0, '宁德时代', '--', None, None])
+    sheet.append([])
+    file_path = tmp_path / 'export.xlsx'
+    workbook.save(file_path)
+    return str(file_path)
+
+
+def test_streaming_matches_read_excel(irregular_workbook):
+    """流式读取与 pandas.read_excel 得到相同的行和值，没有股票代码的行都被去掉"""
+    streamed_stats, read_stats = {}, {}
+    streamed, streamed_date = ExcelParser.parse_excel(
+        irregular_workbook, config.COLUMN_MAPPING, streaming=True, stats=streamed_stats
+    )
+    read, read_date = ExcelParser.parse_excel(
+        irregular_workbook, config.COLUMN_MAPPING, streaming=False, stats=read_stats
+    )
+
+    pd.testing.assert_frame_equal(streamed, read)
+    assert streamed_date == read_date == '2025-01-07'
+    assert streamed_stats['unparsable_columns'] == read_stats['unparsable_columns'] == {'主力净额': 1}
+    assert list(streamed['stock_code']) == ['000001', '000002', '600519', '300750']
+    assert 'nan' not in set(streamed['stock_code'])
+    np.testing.assert_array_equal(streamed['main_net_amount'], [15000.0, -3000.0, 2500.0, np.nan])
+    np.testing.assert_array_equal(streamed['price_change'], [0.5, np.nan, 1.25, np.nan])
@@ -0,0 +1,90 @@
+"""测试列式缓存 - 缓存读取结果必须与 SQLite 查询一致
+
+用法:
+    python -m pytest test_column_cache.py
+"""
+import os
+
+import pandas as pd
+import pytest
+
+import config
+from database import DatabaseManager
+
+
+@pytest.fixture(autouse=True)
+def cache_enabled(monkeypatch):
+    """列式缓存默认关闭，本文件的测试数据库都启用缓存"""
+    monkeypatch.setattr(config, 'COLUMN_CACHE_ENABLED', True)
+
+
+def without_cache(db_manager: DatabaseManager, action):
+    """关闭缓存执行 action（直接查询 SQLite）"""
+    column_cache, db_manager._column_cache = db_manager._column_cache, None
+    try:
+        return action()
+    finally:
+        db_manager._column_cache = column_cache
+
+
+def assert_same_as_sqlite(db_manager: DatabaseManager, action):
+    cached = action()
+    expected = without_cache(db_manager, action)
+    # 分类类型的类别顺序取决于读取路径，只比较取值
+    pd.testing.assert_frame_equal(cached, expected, check_dtype=False, check_categorical=False)
+
+
+QUERY_CASES = {
+    'date': lambda db: db.query_by_date('2025-01-03'),
+    'code': lambda db: db.query_by_date('2025-01-03', stock_code='000010'),
+    'sector': lambda db: db.query_by_date('2025-01-03', sector='银行'),
+    'sector_limit': lambda db: db.query_by_date('2025-01-03', sector='白酒', limit=7),
+    'comparison': lambda db: db.query_by_date_with_comparison('2025-01-06', sector='券商'),
+    'range': lambda db: db.query_by_date_range('2025-01-01', '2025-01-31'),
+    'range_code': lambda db: db.query_by_date_range('2025-01-01', '2025-01-31', '000010'),
+}
+
+
+@pytest.mark.parametrize('name', sorted(QUERY_CASES))
+def test_cached_query_matches_sqlite(db, name):
+    assert_same_as_sqlite(db, lambda: QUERY_CASES[name](db))
+
+
+def test_partitions_written_on_first_read(db, trade_dates):
+    """导入时不写分区，首次整天查询时写入"""
+    assert os.listdir(db._column_cache.cache_dir) == []
+    db.query_by_date_range(trade_dates[0], trade_dates[-1])
+    assert sorted(os.listdir(db._column_cache.cache_dir)) == trade_dates
+
+
+def test_single_stock_queries_use_sqlite(db):
+    """单只股票的查询走索引，不读取也不写入分区"""
+    db.query_by_date('2025-01-03', stock_code='000010')
+    db.query_by_date_range('2025-01-01', '2025-01-31', '000010')
+    assert os.listdir(db._column_cache.cache_dir) == []
+
+
+def test_partition_maps_only_loaded_columns(db):
+    db.query_by_date('2025-01-02')
+    token = db._cache_tokens(db._reader().cursor(), '2025-01-02', '2025-01-02')['2025-01-02']
+    partition = db._column_cache.read('2025-01-02', token, db.daily_columns, ['stock_code', 'main_net_amount'])
+    assert set(partition._arrays) == {'stock_code', 'main_net_amount'}
+    assert set(partition._dictionaries) == {'stock_code'}
+
+
+def test_reimport_refreshes_next_day(db, make_day):
+    """重新导入某天后，当天和下一交易日（前日对比值变化）的缓存都更新"""
+    db.query_by_date('2025-01-06')
+    db.insert_batch(make_day(9, rows=150), '2025-01-03')
+    assert_same_as_sqlite(db, lambda: db.query_by_date('2025-01-03'))
+    assert_same_as_sqlite(db, lambda: db.query_by_date('2025-01-06'))
+
+    db.delete_by_date('2025-01-03')
+    assert not os.path.exists(os.path.join(db._column_cache.cache_dir, '2025-01-03'))
+    assert_same_as_sqlite(db, lambda: db.query_by_date_range('2025-01-01', '2025-01-31'))
+
+
+def test_read_through_after_clear(db):
+    db._column_cache.clear()
+    assert_same_as_sqlite(db, lambda: db.query_by_date('2025-01-02'))
+    assert os.listdir(db._column_cache.cache_dir) == ['2025-01-02']
@@ -0,0 +1,96 @@
+"""测试连接池 - WAL模式下写事务进行中，其他线程的读连接不被阻塞并读到已提交的数据
+
+用法:
+    python -m pytest test_connection_pool.py
+"""
+import threading
+
+import pytest
+
+from database.connection_pool import ConnectionPool
+
+
+def read_in_thread(action):
+    """在新线程中用该线程自己的读连接执行 action，返回结果（异常原样抛出）"""
+    outcome = {}
+
+    def run():
+        try:
+            outcome['result'] = action()
+        except Exception as e:  # 交给调用线程抛出
+            outcome['error'] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive(), '读取被写事务阻塞'
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
+
+@pytest.fixture
+def pool(tmp_path):
+    connection_pool = ConnectionPool(str(tmp_path / 'pool.db'))
+    with connection_pool.writer() as writer:
+        writer.execute('CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)')
+        writer.execute("INSERT INTO item (name) VALUES ('committed')")
+        writer.commit()
+    yield connection_pool
+    connection_pool.close_all()
+
+
+def count_items(pool: ConnectionPool) -> int:
+    return pool.reader().execute('SELECT COUNT(*) FROM item').fetchone()[0]
+
+
+def test_reader_sees_committed_data_during_write(pool):
+    assert pool.writer_connection.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+    with pool.writer() as writer:
+        writer.execute("INSERT INTO item (name) VALUES ('pending')")
+        assert writer.in_transaction
+        # 写事务未提交：其他线程的读连接不等待写锁，只看到已提交的一行
+        assert read_in_thread(lambda: count_items(pool)) == 1
+        writer.commit()
+
+    assert read_in_thread(lambda: count_items(pool)) == 2
+
+
+def test_readers_are_per_thread(pool):
+    main_reader = pool.reader()
+    assert pool.reader() is main_reader
+    assert main_reader is not pool.writer_connection
+    assert read_in_thread(pool.reader) is not main_reader
+
+    pool.release_reader()
+    assert pool.reader() is not main_reader
+
+
+def test_manager_reads_during_insert(db, make_day):
+    """insert_batch 的写事务进行到提交前时，其他线程查询到的仍是已提交的交易日"""
+    in_transaction, release = threading.Event(), threading.Event()
+    seen = {}
+
+    def pause_before_commit(sql):
+        if sql.strip().upper() == 'COMMIT' and not in_transaction.is_set():
+            in_transaction.set()
+            release.wait(10)
+
+    def insert():
+        db.insert_batch(make_day(4), '2025-01-07')
+
+    db.connection.set_trace_callback(pause_before_commit)
+    writer = threading.Thread(target=insert)
+    writer.start()
+    try:
+        assert in_transaction.wait(10)
+        seen['dates'] = read_in_thread(db.get_all_dates)
+        seen['rows'] = len(read_in_thread(lambda: db.query_by_date('2025-01-06')))
+    finally:
+        release.set()
+        writer.join(10)
+        db.connection.set_trace_callback(None)
+
+    assert seen == {'dates': ['2025-01-06', '2025-01-03', '2025-01-02'], 'rows': 200}
+    assert read_in_thread(db.get_all_dates)[0] == '2025-01-07'
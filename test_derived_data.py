@@ -0,0 +1,265 @@
+"""测试派生数据 - 交易日历、板块关联、汇总、股票历史和前日对比在各种导入方式下与逐日维护一致
+
+用法:
+    python -m pytest test_derived_data.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+from database import DatabaseManager
+
+
+# 乱序导入，覆盖插入到已有日期之前的情况
+IMPORT_ORDER = ['2025-01-06', '2025-01-02', '2025-01-08', '2025-01-03']
+
+
+def derived_snapshot(db_manager: DatabaseManager) -> dict:
+    """读取全部派生数据（去掉导入时间等与导入方式无关的列）"""
+    dates = sorted(db_manager.get_all_dates())
+    return {
+        'calendar': db_manager.get_trade_calendar().drop(columns=['import_time']),
+        'sectors': db_manager.get_all_sectors(),
+        'comparison': pd.concat([
+            db_manager.query_by_date(trade_date, columns=[
+                'trade_date', 'stock_code', 'prev_trade_date', 'main_net_prev_ratio', 'volume_prev_ratio'
+            ]).astype({'trade_date': str, 'stock_code': str, 'prev_trade_date': object})
+            for trade_date in dates
+        ], ignore_index=True),
+        'statistics': [db_manager.get_statistics(trade_date) for trade_date in dates],
+        # 主力净额相同的板块先后顺序不固定，按板块名排序后比较
+        'sector_statistics': pd.concat([
+            db_manager.get_sector_statistics(trade_date).sort_values('sector')
+            for trade_date in dates
+        ], ignore_index=True),
+        'history': db_manager.get_stock_history('000010'),
+    }
+
+
+def assert_same_snapshot(actual: dict, expected: dict):
+    pd.testing.assert_frame_equal(actual['calendar'], expected['calendar'])
+    assert actual['sectors'] == expected['sectors']
+    pd.testing.assert_frame_equal(actual['comparison'], expected['comparison'])
+    assert actual['statistics'] == expected['statistics']
+    pd.testing.assert_frame_equal(actual['sector_statistics'], expected['sector_statistics'])
+    for column, values in expected['history'].items():
+        np.testing.assert_array_equal(actual['history'][column], values, err_msg=column)
+
+
+@pytest.fixture
+def load_days(tmp_path, make_day):
+    """按 IMPORT_ORDER 导入到新数据库，mode 为 normal / deferred / bulk"""
+    managers = []
+
+    def load(mode: str) -> DatabaseManager:
+        db_manager = DatabaseManager(str(tmp_path / f"{mode}.db"))
+        managers.append(db_manager)
+        if mode == 'deferred':
+            context = db_manager.deferred_maintenance()
+        elif mode == 'bulk':
+            context = db_manager.bulk_load()
+        else:
+            context = None
+        if context is None:
+            for seed, trade_date in enumerate(IMPORT_ORDER, start=1):
+                db_manager.insert_batch(make_day(seed), trade_date)
+        else:
+            with context:
+                for seed, trade_date in enumerate(IMPORT_ORDER, start=1):
+                    db_manager.insert_batch(make_day(seed), trade_date)
+        return db_manager
+
+    yield load
+    for db_manager in managers:
+        db_manager.close()
+
+
+@pytest.mark.parametrize('mode', ['deferred', 'bulk'])
+def test_deferred_maintenance_matches_per_file(load_days, mode):
+    assert_same_snapshot(derived_snapshot(load_days(mode)), derived_snapshot(load_days('normal')))
+
+
+def test_deferred_maintenance_hides_new_dates_until_exit(db, make_day):
+    with db.deferred_maintenance():
+        db.insert_batch(make_day(5), '2025-01-07')
+        assert '2025-01-07' not in db.get_all_dates()
+    assert db.get_all_dates()[0] == '2025-01-07'
+    assert db.get_trade_calendar().set_index('trade_date').loc['2025-01-07', 'prev_date'] == '2025-01-06'
+
+
+COMPARISON_COLUMNS = ['stock_code', 'prev_trade_date', 'main_net_prev_ratio', 'volume_prev_ratio']
+
+
+def assert_persisted_matches_live(db_manager: DatabaseManager):
+    """每个交易日持久化的对比值都与自连接实时计算的结果一致"""
+    for trade_date in db_manager.get_all_dates():
+        persisted = db_manager.query_by_date_with_comparison(trade_date, columns=COMPARISON_COLUMNS)
+        live = db_manager.query_by_date_with_comparison(trade_date, live=True, columns=COMPARISON_COLUMNS)
+        assert list(persisted['stock_code']) == list(live['stock_code']), trade_date
+        assert list(persisted['prev_trade_date']) == list(live['prev_trade_date']), trade_date
+        for column in ['main_net_prev_ratio', 'volume_prev_ratio']:
+            np.testing.assert_allclose(
+                persisted[column].to_numpy(dtype=float), live[column].to_numpy(dtype=float),
+                rtol=1e-6, err_msg=f"{trade_date} {column}"
+            )
+
+
+def test_persisted_ratios_follow_earlier_day_changes(db, make_day):
+    """在已有日期之前或之间插入、删除交易日后，后一交易日的持久化对比值随之更新"""
+    db.insert_batch(make_day(7), '2024-12-31')
+    db.insert_batch(make_day(8), '2025-01-05')
+    assert_persisted_matches_live(db)
+    assert db.query_by_date('2025-01-02', columns=['prev_trade_date'])['prev_trade_date'][0] == '2024-12-31'
+    assert db.query_by_date('2025-01-06', columns=['prev_trade_date'])['prev_trade_date'][0] == '2025-01-05'
+
+    db.delete_by_date('2025-01-05')
+    db.delete_by_date('2024-12-31')
+    assert_persisted_matches_live(db)
+    ratios = db.query_by_date('2025-01-02', columns=['prev_trade_date', 'main_net_prev_ratio'])
+    assert ratios['prev_trade_date'].isna().all()
+    assert ratios['main_net_prev_ratio'].isna().all()
+
+
+def test_live_comparison_matches_pandas(db):
+    """自连接实时对比值与 pandas 按股票代码合并前一交易日计算的结果一致（含板块筛选）"""
+    columns = ['stock_code', 'main_net_amount', 'auction_today_volume']
+    today = db.query_by_date('2025-01-06', sector='券商', columns=columns)
+    previous = db.query_by_date('2025-01-03', columns=columns)
+    expected = today.merge(previous, on='stock_code', how='left', suffixes=('', '_prev'))
+    main_net_prev = expected['main_net_amount_prev'].to_numpy(dtype=float)
+    volume_prev = expected['auction_today_volume_prev'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        main_net_ratio = np.where(main_net_prev != 0, expected['main_net_amount'] / main_net_prev, np.nan)
+        volume_ratio = np.where(volume_prev != 0, expected['auction_today_volume'] / volume_prev, np.nan)
+
+    live = db.query_by_date_with_comparison('2025-01-06', sector='券商', live=True, columns=COMPARISON_COLUMNS)
+    assert len(live) > 0
+    assert list(live['stock_code']) == list(today['stock_code'])
+    assert set(live['prev_trade_date']) == {'2025-01-03'}
+    np.testing.assert_allclose(live['main_net_prev_ratio'].to_numpy(dtype=float), main_net_ratio, rtol=1e-6)
+    np.testing.assert_allclose(live['volume_prev_ratio'].to_numpy(dtype=float), volume_ratio, rtol=1e-6)
+
+
+@pytest.mark.parametrize('mode', ['normal', 'deferred', 'bulk'])
+def test_calendar_links_after_out_of_order_import(load_days, mode):
+    """乱序导入后交易日历的前后交易日链接与按日期排序的结果一致，删除日期后重新链接"""
+    db_manager = load_days(mode)
+    expected = sorted(IMPORT_ORDER)
+    calendar = db_manager.get_trade_calendar().sort_values('trade_date').reset_index(drop=True)
+    calendar = calendar.astype(object).where(calendar.notna(), None)
+    assert list(calendar['trade_date']) == expected
+    assert list(calendar['prev_date']) == [None] + expected[:-1]
+    assert list(calendar['next_date']) == expected[1:] + [None]
+    assert list(calendar['row_count']) == [200] * len(expected)
+
+    db_manager.delete_by_date('2025-01-06')
+    calendar = db_manager.get_trade_calendar().set_index('trade_date')
+    assert '2025-01-06' not in calendar.index
+    assert calendar.loc['2025-01-03', 'next_date'] == '2025-01-08'
+    assert calendar.loc['2025-01-08', 'prev_date'] == '2025-01-03'
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_sector_filter_matches_whole_names(tmp_path, monkeypatch, make_day, cached):
+    """板块筛选通过关联表按完整板块名匹配，不匹配包含该名称的其他板块"""
+    monkeypatch.setattr(config, 'COLUMN_CACHE_ENABLED', cached)
+    day = make_day(1, rows=6)
+    day['sector'] = ['银行', '地方银行', '银行Ⅱ', '券商、银行', ' 银行 、券商', '券商']
+    db_manager = DatabaseManager(str(tmp_path / 'sectors.db'))
+    try:
+        db_manager.insert_batch(day, '2025-01-02')
+        assert db_manager.get_all_sectors() == sorted(['银行', '地方银行', '银行Ⅱ', '券商'])
+
+        expected = ['000001', '000004', '000005']
+        for _ in range(2):  # 启用缓存时第二次查询读取缓存分区
+            assert list(db_manager.query_by_date('2025-01-02', sector='银行')['stock_code']) == expected
+        assert db_manager.count_date_range('2025-01-02', '2025-01-02', sector='银行') == 3
+        chunks = db_manager.iter_date_range('2025-01-02', '2025-01-02', sector='银行')
+        assert list(pd.concat(chunks)['stock_code']) == expected
+        assert db_manager.query_by_date('2025-01-02', sector='银').empty
+
+        sector_counts = db_manager.get_sector_statistics('2025-01-02').set_index('sector')['stock_count']
+        assert sector_counts.to_dict() == {'银行': 3, '地方银行': 1, '银行Ⅱ': 1, '券商': 3}
+    finally:
+        db_manager.close()
+
+
+def schema_state(db_manager: DatabaseManager) -> dict:
+    """索引定义、日志模式和同步模式"""
+    connection = db_manager.connection
+    return {
+        'indexes': sorted(connection.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+        ).fetchall()),
+        'journal_mode': connection.execute('PRAGMA journal_mode').fetchone()[0],
+        'synchronous': connection.execute('PRAGMA synchronous').fetchone()[0],
+    }
+
+
+def test_bulk_load_restores_state_after_exception(db, make_day):
+    """批量加载中途抛出异常时，已写入日期的派生数据仍会重建，索引和WAL模式恢复"""
+    before = schema_state(db)
+    assert before['journal_mode'] == 'wal'
+
+    with pytest.raises(RuntimeError):
+        with db.bulk_load():
+            db.insert_batch(make_day(4), '2025-01-07')
+            assert schema_state(db)['journal_mode'] == 'memory'
+            raise RuntimeError('导入中断')
+
+    assert schema_state(db) == before
+    assert db.get_all_dates()[0] == '2025-01-07'
+    assert_persisted_matches_live(db)
+
+    # 退出后恢复逐个文件即时维护
+    db.insert_batch(make_day(5), '2025-01-08')
+    assert db.get_all_dates()[0] == '2025-01-08'
+
+
+def test_bulk_load_restores_state_when_refresh_fails(db, make_day, monkeypatch):
+    before = schema_state(db)
+
+    def failing_refresh(cursor, dates=None):
+        raise RuntimeError('重建派生数据失败')
+
+    with pytest.raises(RuntimeError, match='重建派生数据失败'):
+        with monkeypatch.context() as patch:
+            patch.setattr(db, '_refresh_derived', failing_refresh)
+            with db.bulk_load():
+                db.insert_batch(make_day(4), '2025-01-07')
+
+    assert schema_state(db) == before
+    # 数据已写入，重新执行一次全量重建即可补齐派生数据
+    assert db.query_by_date('2025-01-07', columns=['stock_code']).shape[0] == 200
+    db.rebuild_trade_calendar()
+    assert db.get_all_dates()[0] == '2025-01-07'
+
+
+def test_bulk_load_rolls_back_failed_rows_and_files(db, make_day, monkeypatch):
+    """批量加载中写入失败的块和文件能正常回滚（日志模式为MEMORY），数据库保持完整"""
+    bad_day = make_day(4)
+    bad_day.loc[5, 'stock_code'] = None  # 违反 NOT NULL，整块回滚后逐行插入并跳过该行
+
+    update_derived = db._update_derived_data
+
+    def fail_on_date(cursor, trade_date):
+        if trade_date == '2025-01-08':
+            raise RuntimeError('文件导入中断')
+        update_derived(cursor, trade_date)
+
+    monkeypatch.setattr(db, '_update_derived_data', fail_on_date)
+    with db.bulk_load():
+        assert db.insert_batch(bad_day, '2025-01-07') == (199, 1)
+        with pytest.raises(RuntimeError):
+            db.insert_batch(make_day(5), '2025-01-08')
+        # 与 batch_reimport.import_files 一样，失败后继续导入下一个文件
+        assert db.insert_batch(make_day(6), '2025-01-09') == (200, 0)
+
+    connection = db.connection
+    assert connection.execute('PRAGMA integrity_check').fetchone()[0] == 'ok'
+    counts = dict(connection.execute('SELECT trade_date, COUNT(*) FROM stock_daily GROUP BY trade_date'))
+    assert counts == {'2025-01-02': 200, '2025-01-03': 200, '2025-01-06': 200, '2025-01-07': 199, '2025-01-09': 200}
+    calendar = db.get_trade_calendar().set_index('trade_date')['row_count']
+    assert calendar.to_dict() == counts
+    assert_persisted_matches_live(db)
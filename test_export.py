@@ -0,0 +1,77 @@
+"""测试分块导出 - 导出文件的内容必须与一次性查询一致
+
+用法:
+    python -m pytest test_export.py
+"""
+import os
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from database.db_manager import DEFAULT_QUERY_COLUMNS
+from utils.export_utils import XlsxExportWriter, create_export_writer
+
+
+def export(db_manager, file_path, export_format, **filters):
+    writer = create_export_writer(str(file_path), export_format, DEFAULT_QUERY_COLUMNS)
+    for chunk in db_manager.iter_date_range('2025-01-01', '2025-01-31', chunk_size=70, **filters):
+        writer.write(chunk)
+    writer.finish()
+    return writer
+
+
+def test_chunks_match_single_query(db):
+    chunks = list(db.iter_date_range('2025-01-01', '2025-01-31', chunk_size=70))
+    assert len(chunks) == 9
+    # 整块缺失的REAL列也是float64，各块类型一致
+    assert all(chunk['main_net_prev_ratio'].dtype == np.float64 for chunk in chunks)
+
+    combined = pd.concat(chunks, ignore_index=True)
+    expected = db.query_by_date_range('2025-01-01', '2025-01-31')
+    assert len(combined) == db.count_date_range('2025-01-01', '2025-01-31') == 600
+    assert list(combined['stock_code']) == list(expected['stock_code'])
+    np.testing.assert_allclose(combined['main_net_amount'], expected['main_net_amount'].to_numpy(dtype=float))
+
+
+def test_sector_filter_matches_query_by_date(db):
+    combined = pd.concat(db.iter_date_range('2025-01-03', '2025-01-03', sector='银行'), ignore_index=True)
+    expected = db.query_by_date('2025-01-03', sector='银行')
+    assert list(combined['stock_code']) == list(expected['stock_code'])
+    assert db.count_date_range('2025-01-03', '2025-01-03', sector='银行') == len(expected)
+
+
+def test_csv_export(db, tmp_path, trade_dates):
+    file_path = tmp_path / 'out.csv'
+    writer = export(db, file_path, 'csv', stock_code='000010')
+    assert writer.rows_written == 3
+    assert not os.path.exists(writer.temp_path)
+
+    df = pd.read_csv(file_path, encoding='utf-8-sig', dtype={'stock_code': str})
+    assert list(df.columns) == DEFAULT_QUERY_COLUMNS
+    assert list(df['trade_date']) == trade_dates
+    assert set(df['stock_code']) == {'000010'}
+
+
+def test_xlsx_export_splits_sheets(db, tmp_path):
+    file_path = tmp_path / 'out.xlsx'
+    writer = XlsxExportWriter(str(file_path), ['trade_date', 'stock_code', 'main_net_amount'],
+                              ['交易日期', '股票代码', '主力净额'], max_rows=251)
+    for chunk in db.iter_date_range('2025-01-01', '2025-01-31', chunk_size=70):
+        writer.write(chunk)
+    writer.finish()
+
+    workbook = load_workbook(file_path, read_only=True)
+    assert workbook.sheetnames == ['数据', '数据_2', '数据_3']
+    rows = [row for sheet in workbook.worksheets for row in sheet.iter_rows(values_only=True)]
+    workbook.close()
+    assert rows[0] == ('交易日期', '股票代码', '主力净额')
+    assert len(rows) == 600 + 3
+
+
+def test_abort_removes_partial_file(db, tmp_path):
+    file_path = tmp_path / 'out.xlsx'
+    writer = create_export_writer(str(file_path), 'xlsx', DEFAULT_QUERY_COLUMNS)
+    writer.write(next(db.iter_date_range('2025-01-01', '2025-01-31', chunk_size=70)))
+    writer.abort()
+    assert not file_path.exists() and not os.path.exists(writer.temp_path)
@@ -0,0 +1,70 @@
+"""测试导入台账 - 未变化的文件跳过，内容相同但文件名日期不同的文件仍需导入
+
+用法:
+    python -m pytest test_import_ledger.py
+"""
+import shutil
+
+import pandas as pd
+import pytest
+
+import config
+from data_processor import ExcelParser
+from utils.thread_worker import BatchImportWorker
+
+
+@pytest.fixture
+def excel_file(tmp_path):
+    file_path = tmp_path / '2025-01-07.xlsx'
+    pd.DataFrame({
+        '股票代码': ['000001', '000002'],
+        '股票名称': ['平安银行', '万科A'],
+        '主力净额': ['1.5亿', '-3000万'],
+    }).to_excel(file_path, index=False)
+    return file_path
+
+
+def run_import(db, file_paths):
+    """串行执行一次批量导入，返回 {文件名: 消息}"""
+    messages = {}
+    worker = BatchImportWorker([str(path) for path in file_paths], db, ExcelParser(),
+                               config.COLUMN_MAPPING, max_workers=1)
+    worker.file_imported.connect(lambda filename, records, success, message: messages.update({filename: message}))
+    worker.run()
+    return messages
+
+
+def test_unchanged_file_skipped(db, excel_file):
+    assert run_import(db, [excel_file])['2025-01-07.xlsx'].startswith('成功导入')
+    assert run_import(db, [excel_file])['2025-01-07.xlsx'].startswith('文件未变化')
+
+
+def test_find_unchanged_import_checks_trade_date(db, excel_file, tmp_path):
+    """仅内容一致时，DatabaseManager 按 expected_trade_date 判断是否未变化"""
+    run_import(db, [excel_file])
+    copied = shutil.copy(excel_file, tmp_path / 'copy.xlsx')
+
+    record, signature = db.find_unchanged_import(copied, '2025-01-07')
+    assert record['matched_by'] == 'hash'
+    assert record['trade_date'] == '2025-01-07'
+
+    record, signature = db.find_unchanged_import(copied, '2025-01-08')
+    assert record is None
+    assert signature['content_hash']
+
+    assert db.find_unchanged_import(copied)[0] is None
+
+
+def test_hash_match_requires_same_date(db, excel_file, tmp_path):
+    """仅内容一致时，文件名日期与台账一致才跳过"""
+    run_import(db, [excel_file])
+
+    moved_dir = tmp_path / 'moved'
+    moved_dir.mkdir()
+    moved = shutil.copy(excel_file, moved_dir / '2025-01-07.xlsx')
+    renamed = shutil.copy(excel_file, tmp_path / '2025-01-08.xlsx')
+
+    messages = run_import(db, [moved, renamed])
+    assert messages['2025-01-07.xlsx'].startswith('文件未变化')
+    assert messages['2025-01-08.xlsx'].startswith('成功导入')
+    assert '2025-01-08' in db.get_all_dates()
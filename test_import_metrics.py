@@ -0,0 +1,73 @@
+"""测试导入指标 - 解析和写入各阶段耗时回填、写入导入历史并可导出为JSON
+
+用法:
+    python -m pytest test_import_metrics.py
+"""
+import json
+import sys
+
+import pandas as pd
+import pytest
+
+import config
+from data_processor import ExcelParser
+from utils.import_metrics import IMPORT_STAGES, PARSE_STAGES, build_file_metrics, dump_metrics_json
+
+
+@pytest.fixture
+def excel_file(tmp_path):
+    file_path = tmp_path / '2025-01-07.xlsx'
+    pd.DataFrame({
+        '股票代码': ['000001', '000002', '000003'],
+        '股票名称': ['平安银行', '万科A', '国华网安'],
+        '主力净额': ['1.5亿', '-3000万', '--'],
+    }).to_excel(file_path, index=False)
+    return str(file_path)
+
+
+@pytest.mark.parametrize('streaming', [True, False])
+def test_parse_stats_include_stages(excel_file, streaming):
+    df, trade_date, stats = ExcelParser.parse_excel_with_stats(excel_file, config.COLUMN_MAPPING, streaming)
+    assert trade_date == '2025-01-07'
+    assert set(stats['stage_seconds']) == set(PARSE_STAGES)
+    assert all(seconds >= 0 for seconds in stats['stage_seconds'].values())
+    assert stats['file_bytes'] > 0
+    if sys.platform.startswith('linux'):
+        assert stats['rss_delta_mb'] is not None
+
+
+def test_insert_stats_include_stages(db, make_day):
+    insert_stats = {}
+    inserted, _ = db.insert_batch(make_day(1), '2025-01-07', stats=insert_stats)
+    assert inserted == 200
+    assert set(insert_stats) == {'convert', 'insert', 'derived', 'commit', 'cache'}
+
+
+def test_metrics_persisted_and_dumped(db, excel_file, tmp_path):
+    df, trade_date, parse_stats = ExcelParser.parse_excel_with_stats(excel_file, config.COLUMN_MAPPING)
+    insert_stats = {}
+    inserted, _ = db.insert_batch(df, trade_date, stats=insert_stats)
+
+    metrics = build_file_metrics('2025-01-07.xlsx', trade_date, inserted, parse_stats, insert_stats)
+    assert list(metrics['stages']) == [key for key, _ in IMPORT_STAGES]
+    assert metrics['total_seconds'] == pytest.approx(sum(metrics['stages'].values()), abs=1e-3)
+    assert metrics['rows'] == 3
+    assert metrics['unparsable_cells'] == 1  # '--'
+    # 内存只取该文件解析前后的增量，不混入写入进程的数值
+    assert metrics['rss_delta_mb'] == (
+        None if parse_stats['rss_delta_mb'] is None else round(parse_stats['rss_delta_mb'], 1)
+    )
+
+    db.add_import_history('2025-01-07.xlsx', trade_date, inserted, 'success', metrics=metrics)
+    db.add_import_history('2025-01-08.xlsx', '2025-01-08', 0, 'failed', '读取失败')
+    history = db.get_import_history().set_index('file_name')
+    assert json.loads(history.loc['2025-01-07.xlsx', 'metrics']) == metrics
+    assert pd.isna(history.loc['2025-01-08.xlsx', 'metrics'])
+
+    json_path = tmp_path / 'metrics.json'
+    dump_metrics_json([metrics, metrics], str(json_path), {'workers': 1})
+    document = json.loads(json_path.read_text(encoding='utf-8'))
+    assert document['file_count'] == 2
+    assert document['rows'] == 6
+    assert document['workers'] == 1
+    assert document['stage_totals']['read'] == pytest.approx(2 * metrics['stages']['read'], abs=1e-3)
@@ -0,0 +1,83 @@
+"""测试日志跟随读取 - 只读取新追加的内容，识别轮转和清空
+
+用法:
+    python -m pytest test_log_utils.py
+"""
+import os
+
+from utils.log_utils import LogTailer, LogBuffer
+
+
+def append(path, text):
+    with open(path, 'a', encoding='utf-8', newline='') as f:
+        f.write(text)
+
+
+def record(level, message):
+    return f"2025-01-02 09:30:00,000 - root - {level} - {message}\n"
+
+
+def test_reads_only_appended_lines(tmp_path):
+    path = tmp_path / 'app.log'
+    append(path, record('INFO', '第一行') + record('ERROR', '第二行'))
+    tailer = LogTailer(str(path))
+
+    lines, restarted = tailer.read_new_lines()
+    assert [line.rsplit(' - ', 1)[1] for line in lines] == ['第一行', '第二行']
+    assert not restarted
+    assert tailer.read_new_lines() == ([], False)
+
+    # 没写完的半行留到下次
+    append(path, record('INFO', '第三行') + '2025-01-02 09:30:01,000 - root - WAR')
+    lines, _ = tailer.read_new_lines()
+    assert len(lines) == 1 and lines[0].endswith('第三行')
+    append(path, 'NING - 第四行\r\n')
+    lines, _ = tailer.read_new_lines()
+    assert lines == ['2025-01-02 09:30:01,000 - root - WARNING - 第四行']
+
+
+def test_truncation_and_rotation(tmp_path):
+    path = tmp_path / 'app.log'
+    append(path, record('INFO', '旧内容') * 3)
+    tailer = LogTailer(str(path))
+    tailer.read_new_lines()
+
+    # 清空后重新写入
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(record('INFO', '清空后'))
+    lines, restarted = tailer.read_new_lines()
+    assert restarted and len(lines) == 1 and lines[0].endswith('清空后')
+
+    # 轮转：原文件改名，新建同名文件（即使新文件比已读位置更长）
+    os.replace(path, tmp_path / 'app.log.1')
+    append(path, record('INFO', '轮转后') * 5)
+    lines, restarted = tailer.read_new_lines()
+    assert restarted and len(lines) == 5
+
+    os.remove(path)
+    assert tailer.read_new_lines() == ([], True)
+
+
+def test_initial_read_starts_at_line_boundary(tmp_path):
+    path = tmp_path / 'app.log'
+    append(path, ''.join(record('INFO', f"第{i}行") for i in range(1000)))
+    tailer = LogTailer(str(path), initial_bytes=len(record('INFO', '第999行').encode('utf-8')) * 3)
+
+    lines, _ = tailer.read_new_lines()
+    assert [line.rsplit(' - ', 1)[1] for line in lines] == ['第997行', '第998行', '第999行']
+
+
+def test_buffer_filters_by_level():
+    buffer = LogBuffer(max_lines=4)
+    buffer.extend([
+        record('INFO', 'a').strip(),
+        record('ERROR', 'b').strip(),
+        'Traceback (most recent call last):',
+        record('INFO', 'c').strip(),
+        record('WARNING', 'd').strip(),
+    ])
+    assert len(buffer) == 4
+    assert [line for _, line in buffer.filtered('ERROR')] == [
+        record('ERROR', 'b').strip(), 'Traceback (most recent call last):'
+    ]
+    assert [level for level, _ in buffer.filtered()] == ['ERROR', 'ERROR', 'INFO', 'WARNING']
@@ -0,0 +1,197 @@
+"""测试查询计划 - DatabaseManager 的每条查询都必须走索引
+
+用法:
+    python -m pytest test_query_plans.py
+说明: 记录各方法实际执行的SQL，逐条执行 EXPLAIN QUERY PLAN，
+      大表（stock_daily、stock_sector、import_history）上不允许出现全表扫描。
+      search_stocks 不指定日期时是 LIKE '%关键词%' 模糊搜索，必然扫描，不在检查范围内。
+"""
+import re
+import sqlite3
+
+import numpy as np
+import pytest
+
+from database import DatabaseManager
+
+
+# 允许全表扫描的小表（每个交易日/板块一行）
+SMALL_TABLES = {'trade_calendar', 'sector', 'daily_summary'}
+
+
+def traced_statements(db_manager: DatabaseManager, action) -> list:
+    """执行 action，返回期间写连接和当前线程读连接上执行的查询/更新语句（参数已展开）"""
+    statements = []
+    connections = [db_manager.connection, db_manager._reader()]
+    for connection in connections:
+        connection.set_trace_callback(statements.append)
+    try:
+        action()
+    finally:
+        for connection in connections:
+            connection.set_trace_callback(None)
+
+    return [
+        sql for sql in statements
+        if sql.lstrip().upper().startswith(('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH'))
+    ]
+
+
+def query_plan(db_manager: DatabaseManager, sql: str) -> list:
+    """获取查询计划的描述行"""
+    return [row[3] for row in db_manager.connection.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def full_scans(plan: list) -> list:
+    """找出计划中不走索引的大表扫描"""
+    scans = []
+    for detail in plan:
+        match = re.match(r'SCAN (\w+)$', detail)
+        if match and match.group(1) not in SMALL_TABLES:
+            scans.append(detail)
+    return scans
+
+
+def sample_file(tmp_path):
+    file_path = tmp_path / '2025-01-03.xlsx'
+    file_path.write_bytes(b'placeholder')
+    return str(file_path)
+
+
+QUERY_CASES = {
+    'query_by_date': lambda db, tmp: db.query_by_date('2025-01-03'),
+    'query_by_date_code': lambda db, tmp: db.query_by_date('2025-01-03', stock_code='000010'),
+    'query_by_date_sector': lambda db, tmp: db.query_by_date('2025-01-03', sector='银行'),
+    'comparison_live': lambda db, tmp: db.query_by_date_with_comparison('2025-01-03', sector='券商', live=True),
+    'query_by_date_range': lambda db, tmp: db.query_by_date_range('2025-01-01', '2025-01-31'),
+    'query_by_date_range_code': lambda db, tmp: db.query_by_date_range('2025-01-01', '2025-01-31', '000010'),
+    'count_date_range_sector': lambda db, tmp: db.count_date_range('2025-01-01', '2025-01-31', sector='银行'),
+    'iter_date_range_sector': lambda db, tmp: list(db.iter_date_range('2025-01-01', '2025-01-31', sector='银行')),
+    'search_stocks_by_date': lambda db, tmp: db.search_stocks('股票1', '2025-01-03'),
+    'get_all_dates': lambda db, tmp: db.get_all_dates(),
+    'get_latest_date': lambda db, tmp: db.get_latest_date(),
+    'get_trade_calendar': lambda db, tmp: db.get_trade_calendar(),
+    'get_all_sectors': lambda db, tmp: db.get_all_sectors(),
+    'get_statistics': lambda db, tmp: db.get_statistics('2025-01-03'),
+    'get_sector_statistics': lambda db, tmp: db.get_sector_statistics('2025-01-03'),
+    'get_statistics_trend': lambda db, tmp: db.get_statistics_trend(30),
+    'get_statistics_trend_sector': lambda db, tmp: db.get_statistics_trend(30, sector='银行'),
+    'get_stock_history': lambda db, tmp: db.get_stock_history('000010'),
+    'get_stock_history_range': lambda db, tmp: db.get_stock_history('000010', '2025-01-01', '2025-01-02'),
+    'find_unchanged_import': lambda db, tmp: db.find_unchanged_import(sample_file(tmp)),
+    'get_import_history': lambda db, tmp: db.get_import_history(),
+    'delete_by_date': lambda db, tmp: db.delete_by_date('2025-01-02'),
+}
+
+
+def assert_uses_indexes(db_manager: DatabaseManager, name: str, action):
+    statements = traced_statements(db_manager, action)
+    assert statements, f"{name} 没有执行任何查询"
+
+    for sql in statements:
+        scans = full_scans(query_plan(db_manager, sql))
+        assert not scans, f"{name} 出现全表扫描 {scans}:\n{sql}"
+
+
+@pytest.mark.parametrize('name', sorted(QUERY_CASES))
+def test_queries_use_indexes(db, tmp_path, name):
+    assert_uses_indexes(db, name, lambda: QUERY_CASES[name](db, tmp_path))
+
+
+def test_insert_batch_uses_indexes(db, make_day):
+    assert_uses_indexes(db, 'insert_batch', lambda: db.insert_batch(make_day(3), '2025-01-06'))
+
+
+def test_query_by_date_needs_no_sort(db):
+    """按日查询按股票代码排序，应直接由 (trade_date, stock_code) 唯一索引提供顺序"""
+    statements = traced_statements(db, lambda: db.query_by_date('2025-01-03', sector='白酒'))
+    for sql in statements:
+        plan = query_plan(db, sql)
+        assert not any('TEMP B-TREE' in detail for detail in plan), plan
+
+
+def test_statistics_read_summary_only(db):
+    """统计和趋势只读取汇总表，不访问 stock_daily"""
+    def read_statistics():
+        db.get_statistics('2025-01-03')
+        db.get_sector_statistics('2025-01-03')
+        db.get_statistics_trend(30)
+        db.get_statistics_trend(30, sector='银行')
+
+    for sql in traced_statements(db, read_statistics):
+        assert 'stock_daily' not in sql, sql
+
+
+def test_stock_history_matches_daily(db):
+    """股票历史表与 stock_daily 一致，删除日期后同步更新"""
+    history = db.get_stock_history('000010')
+    daily = db.query_by_date_range('2025-01-01', '2025-01-31', '000010')
+    assert list(history['trade_date']) == list(daily['trade_date'])
+    assert history['main_net_amount'].dtype == np.float64
+    np.testing.assert_allclose(history['main_net_amount'], daily['main_net_amount'].to_numpy(dtype=float), rtol=1e-6)
+
+    db.delete_by_date('2025-01-02')
+    assert list(db.get_stock_history('000010')['trade_date']) == ['2025-01-03', '2025-01-06']
+
+    with pytest.raises(ValueError):
+        db.get_stock_history('000010', columns=['sector'])
+
+
+def test_amount_columns_keep_float64(db, make_day):
+    """金额和市值列保持float64，超过float32有效位数的值原样返回"""
+    day = make_day(9, rows=3)
+    day['main_net_amount'] = [123456789.12, -98765.4321, 1.5]
+    day['real_market_value'] = [2345678.91, 12.0, 0.0]
+    db.insert_batch(day, '2025-01-07')
+
+    df = db.query_by_date('2025-01-07')
+    assert df['main_net_amount'].dtype == np.float64
+    assert df['real_market_value'].dtype == np.float64
+    assert list(df['main_net_amount']) == [123456789.12, -98765.4321, 1.5]
+    assert list(df['real_market_value']) == [2345678.91, 12.0, 0.0]
+    assert df['turnover_rate'].dtype == np.float32
+
+
+def test_redundant_indexes_removed(db):
+    indexes = {
+        row[0] for row in db.connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'stock_daily'"
+        )
+    }
+    assert not indexes & {'idx_date', 'idx_code', 'idx_date_code', 'idx_sector', 'idx_date_sector'}
+    assert 'idx_code_date' in indexes
+    assert 'idx_date_stats' not in indexes
+
+
+def test_migration_drops_stats_index(tmp_path):
+    """版本1的数据库升级时删除已无查询使用的 idx_date_stats"""
+    db_path = str(tmp_path / 'v1.db')
+    DatabaseManager(db_path).close()
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(
+            'CREATE INDEX idx_date_stats ON stock_daily('
+            'trade_date, main_net_amount, auction_today_volume, auction_yesterday_volume, turnover_rate)'
+        )
+        connection.execute('PRAGMA user_version = 1')
+    connection.close()
+
+    db_manager = DatabaseManager(db_path)
+    try:
+        names = {row[0] for row in db_manager.connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert 'idx_date_stats' not in names
+        assert db_manager.connection.execute('PRAGMA user_version').fetchone()[0] == 2
+    finally:
+        db_manager.close()
+
+
+def test_in_memory_database(make_day):
+    """内存数据库的读取与写入使用同一个库"""
+    db_manager = DatabaseManager(':memory:')
+    try:
+        db_manager.insert_batch(make_day(1, rows=20), '2025-01-02')
+        assert db_manager.get_all_dates() == ['2025-01-02']
+        df = db_manager.query_by_date('2025-01-02')
+        assert len(df) == 20
+        assert list(df['stock_code'][:2]) == ['000001', '000002']
+    finally:
+        db_manager.close()
@@ -0,0 +1,71 @@
+"""测试查询性能分析 - 按方法统计耗时，慢查询记录SQL、参数和查询计划
+
+用法:
+    python -m pytest test_query_profiler.py
+"""
+import logging
+
+import pytest
+
+
+def test_disabled_by_default(db):
+    db.query_by_date('2025-01-03')
+    assert db.profiler.stats() == []
+
+
+def test_stats_per_method(db):
+    db.profiler.enabled = True
+    for _ in range(3):
+        db.query_by_date('2025-01-03', sector='银行')
+    db.get_statistics('2025-01-03')
+    # 嵌套调用只按最外层记录
+    db.query_by_date_with_comparison('2025-01-03')
+
+    stats = {item['method']: item for item in db.profiler.stats()}
+    assert set(stats) == {'query_by_date', 'get_statistics', 'query_by_date_with_comparison'}
+    assert stats['query_by_date']['count'] == 3
+    assert stats['query_by_date']['avg_rows'] == 100
+    assert stats['get_statistics']['avg_rows'] == 1
+    for item in stats.values():
+        assert 0 <= item['p50_ms'] <= item['p95_ms'] <= item['max_ms']
+        assert item['sqlite_p50_ms'] >= 0 and item['frame_p50_ms'] >= 0
+
+    db.profiler.reset()
+    assert db.profiler.stats() == []
+
+
+def test_rolling_window(db):
+    db.profiler.enabled = True
+    db.profiler.window = 5
+    for _ in range(8):
+        db.get_all_dates()
+    stats = db.profiler.stats()[0]
+    assert stats['count'] == 8
+    assert stats['samples'] == 5
+
+
+def test_sqlite_time_recorded(db, monkeypatch):
+    """列式缓存关闭时，按日查询的SQL经过计时游标"""
+    monkeypatch.setattr(db, '_column_cache', None)
+    db.profiler.enabled = True
+    db.profiler.slow_threshold_ms = 0
+    db.query_by_date('2025-01-03', stock_code='000010')
+
+    entry = db.profiler.slow_queries()[-1]
+    assert entry['method'] == 'query_by_date'
+    assert entry['rows'] == 1
+    assert entry['sqlite_ms'] > 0
+    assert entry['sqlite_ms'] + entry['frame_ms'] == pytest.approx(entry['total_ms'])
+    statement = entry['statements'][-1]
+    assert 'FROM stock_daily' in statement['sql']
+    assert "'000010'" in statement['params']
+    assert any('USING' in detail for detail in statement['plan'])
+
+
+def test_slow_query_logged(db, caplog):
+    db.profiler.enabled = True
+    db.profiler.slow_threshold_ms = 0
+    with caplog.at_level(logging.WARNING, logger='database.query_profiler'):
+        db.search_stocks('股票1', '2025-01-03')
+    assert '慢查询: search_stocks' in caplog.text
+    assert 'SQL: SELECT' in caplog.text
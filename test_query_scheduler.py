@@ -0,0 +1,108 @@
+"""测试查询调度 - 被新查询取代或取消的查询结果一律丢弃，快速连续的提交只执行最后一次
+
+用法:
+    python -m pytest test_query_scheduler.py
+"""
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('PyQt5')
+from utils.query_scheduler import QueryScheduler
+
+
+def wait_until(qapp, predicate, timeout: float = 5.0):
+    """处理事件直到 predicate 成立（线程池的完成信号在GUI线程中派发）"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, '等待超时'
+        qapp.processEvents()
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def scheduler(qapp, db):
+    query_scheduler = QueryScheduler(db, debounce_ms=20)
+    yield query_scheduler
+    query_scheduler.shutdown()
+    qapp.processEvents()
+
+
+@pytest.fixture
+def emitted(scheduler):
+    """调度器发出的结果 (结果, 上下文) 和错误信息"""
+    signals = {'completed': [], 'failed': []}
+    scheduler.query_completed.connect(lambda result, context: signals['completed'].append((result, context)))
+    scheduler.query_failed.connect(signals['failed'].append)
+    return signals
+
+
+def test_stale_generation_dropped(qapp, scheduler, emitted):
+    """旧查询在新查询提交后才完成，其结果不会发出"""
+    started, release = threading.Event(), threading.Event()
+
+    def slow_query():
+        started.set()
+        release.wait(5)
+        return 'old'
+
+    old = scheduler.submit(slow_query, context='old')
+    assert started.wait(5)
+    new = scheduler.submit(lambda: 'new', context='new')
+    assert scheduler.is_stale(old) and not scheduler.is_stale(new)
+
+    wait_until(qapp, lambda: emitted['completed'])
+    release.set()
+    assert scheduler._pool.waitForDone(5000)
+    qapp.processEvents()
+    assert emitted['completed'] == [('new', 'new')]
+
+
+def test_stale_failure_dropped(qapp, scheduler, emitted):
+    started, release = threading.Event(), threading.Event()
+
+    def failing_query():
+        started.set()
+        release.wait(5)
+        raise RuntimeError('interrupted')
+
+    scheduler.submit(failing_query)
+    assert started.wait(5)
+    scheduler.submit(lambda: 'new')
+    release.set()
+    wait_until(qapp, lambda: emitted['completed'])
+    assert scheduler._pool.waitForDone(5000)
+    qapp.processEvents()
+    assert emitted['failed'] == []
+    assert emitted['completed'] == [('new', None)]
+
+
+def test_debounced_submits_run_latest_only(qapp, scheduler, emitted):
+    calls = []
+    for keyword in ['0', '00', '000']:
+        scheduler.submit(lambda k=keyword: calls.append(k) or k, context=keyword, debounce=True)
+    wait_until(qapp, lambda: emitted['completed'])
+    assert calls == ['000']
+    assert emitted['completed'] == [('000', '000')]
+
+
+def test_cancelled_query_not_emitted(qapp, scheduler, emitted, db):
+    """取消后进行中的数据库查询被中断，结果和错误都不发出"""
+    busy = []
+    scheduler.busy_changed.connect(busy.append)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_query():
+        started.set()
+        release.wait(5)
+        return db.query_by_date('2025-01-03')
+
+    scheduler.submit(slow_query)
+    assert started.wait(5)
+    scheduler.cancel()
+    release.set()
+    assert scheduler._pool.waitForDone(5000)
+    qapp.processEvents()
+    assert emitted['completed'] == [] and emitted['failed'] == []
+    assert busy == [True, False]
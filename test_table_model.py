@@ -0,0 +1,86 @@
+"""测试表格模型 - StockTableModel 的显示文本、排序顺序和视图行到数据行的映射
+
+用法:
+    python -m pytest test_table_model.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('PyQt5')
+from PyQt5.QtCore import Qt
+
+from ui.data_table_view import DataTableView
+
+
+COLUMNS = [
+    {'key': 'stock_code', 'name': '股票代码', 'width': 100},
+    {'key': 'stock_name', 'name': '股票名称', 'width': 100},
+    {'key': 'main_net_amount', 'name': '主力净额', 'width': 100},
+]
+
+
+@pytest.fixture
+def view(qapp):
+    table_view = DataTableView(COLUMNS)
+    table_view.set_data(pd.DataFrame({
+        'stock_code': ['000001', '000002', '000003', '000004'],
+        'stock_name': ['平安银行', None, '国华网安', '万科A'],
+        'main_net_amount': [15000.0, np.nan, -3000.0, 15000.0],
+    }))
+    yield table_view
+    table_view.deleteLater()
+
+
+def column_texts(model, column: int) -> list:
+    return [model.data(model.index(row, column)) for row in range(model.rowCount())]
+
+
+def test_model_displays_frame(view):
+    model = view.model
+    assert model.rowCount() == 4
+    assert model.columnCount() == 3
+    assert model.headerData(2, Qt.Horizontal) == '主力净额'
+    assert column_texts(model, 0) == ['000001', '000002', '000003', '000004']
+    assert column_texts(model, 2) == ['1.5亿', '', '-3000.0万', '1.5亿']
+    assert [model.source_row(row) for row in range(4)] == [0, 1, 2, 3]
+
+
+def test_selected_row_maps_to_source_row(view):
+    view.model.sort(0, Qt.DescendingOrder)
+    view.table.selectRow(0)
+    assert view.get_selected_row_data()['stock_code'] == '000004'
+
+
+@pytest.mark.parametrize('order, expected', [
+    (Qt.AscendingOrder, ['000003', '000001', '000004', '000002']),
+    (Qt.DescendingOrder, ['000001', '000004', '000003', '000002']),
+])
+def test_sort_numeric_column(view, order, expected):
+    """数值列按数值排序，相同值保持原顺序，缺失值在升序和降序时都排在最后"""
+    model = view.model
+    model.sort(2, order)
+    assert column_texts(model, 0) == expected
+    assert [model.source_row(row) for row in range(4)] == [int(code) - 1 for code in expected]
+
+
+def test_sort_text_column_and_restore(view):
+    model = view.model
+    model.sort(1, Qt.AscendingOrder)
+    assert column_texts(model, 1)[-1] == ''
+    assert column_texts(model, 1)[:3] == sorted(['平安银行', '国华网安', '万科A'])
+
+    model.sort(-1)
+    assert column_texts(model, 0) == ['000001', '000002', '000003', '000004']
+    assert [model.source_row(row) for row in range(4)] == [0, 1, 2, 3]
+
+
+def test_sort_keeps_selection_on_same_data_row(view):
+    """排序后持久索引（选中行）仍指向同一条数据"""
+    view.table.selectRow(2)
+    view.model.sort(2, Qt.DescendingOrder)
+    assert view.get_selected_row_data()['stock_code'] == '000003'
+    assert view.table.selectionModel().selectedRows()[0].row() == 2
+    view.model.sort(0, Qt.DescendingOrder)
+    assert view.get_selected_row_data()['stock_code'] == '000003'
+    assert view.table.selectionModel().selectedRows()[0].row() == 1
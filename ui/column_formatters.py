@@ -0,0 +1,194 @@
+"""
+表格列格式化器
+按列类型注册格式化函数，一次性把整列数值格式化为显示字符串
+"""
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+import config
+
+
+# 需要显示"万/亿"单位的字段（数据库中存储的单位是"万"）
+MONEY_COLUMNS = [
+    'auction_today_volume',      # 成交额
+    'auction_yesterday_volume',   # 昨日成交额
+    'real_market_value',          # 实流市值
+    'main_net_amount',            # 主力净额
+    'auction_net_amount',         # 竞价净额
+    'auction_main_net',           # 增额
+]
+
+# 百分比字段
+PERCENT_COLUMNS = [
+    'price_change',          # 涨幅
+    'flow_ratio',            # 净流占比
+    'net_ratio',             # 净成占比
+    'turnover_rate',         # 换手率
+    'real_turnover_rate',    # 实换手率
+]
+
+# 对比比率字段（显示为百分比变化）
+RATIO_COLUMNS = [
+    'main_net_prev_ratio',   # 主力净额前日对比
+    'volume_prev_ratio',     # 成交额前日对比
+]
+
+# 其他数值字段
+NUMERIC_COLUMNS = [
+    'current_price', 'buy_sell_ratio', 'volume_ratio',
+    'popularity_value', 'popularity_change', 'main_net_ratio'
+]
+
+ColumnFormatter = Callable[[np.ndarray], np.ndarray]
+
+
+def _apply_format(fmt: str, values: np.ndarray) -> List[str]:
+    """对一组浮点数套用同一个格式串"""
+    return [fmt % value for value in values.tolist()]
+
+
+def format_money_array(values: np.ndarray) -> np.ndarray:
+    """
+    格式化金额（自动添加万/亿单位）
+
+    Args:
+        values: 不含缺失值的浮点数组（单位：万）
+
+    Returns:
+        格式化后的字符串数组，如 "3070.0万"、"7315.3亿"
+    """
+    out = np.empty(len(values), dtype=object)
+    abs_values = np.abs(values)
+
+    # 大于等于10000万显示为"亿"，小于1万的保留两位小数
+    yi_mask = abs_values >= 10000
+    wan_mask = ~yi_mask & (abs_values >= 1)
+    small_mask = ~yi_mask & ~wan_mask
+
+    out[yi_mask] = _apply_format('%.1f亿', values[yi_mask] / 10000)
+    out[wan_mask] = _apply_format('%.1f万', values[wan_mask])
+    out[small_mask] = _apply_format('%.2f万', values[small_mask])
+    out[values == 0] = "0"
+    return out
+
+
+def format_percent_array(values: np.ndarray) -> np.ndarray:
+    """格式化百分比字段，如 "3.25%" """
+    return np.array(_apply_format('%.2f%%', values), dtype=object)
+
+
+def format_ratio_array(values: np.ndarray) -> np.ndarray:
+    """
+    格式化对比比率（统一为百分比变化）
+
+    Args:
+        values: 不含缺失值的比率数组（1.5表示1.5倍）
+
+    Returns:
+        格式化后的字符串数组，如 "50.0%"、"-20.0%"、"0%"
+    """
+    percent_change = (values - 1) * 100
+    out = np.array(_apply_format('%.1f%%', percent_change), dtype=object)
+    out[percent_change == 0] = "0%"
+    return out
+
+
+def format_number_array(values: np.ndarray) -> np.ndarray:
+    """格式化其他数值字段（根据数值大小决定小数位）"""
+    out = np.empty(len(values), dtype=object)
+    abs_values = np.abs(values)
+
+    large_mask = abs_values >= 1000
+    medium_mask = ~large_mask & (abs_values >= 1)
+    small_mask = ~large_mask & ~medium_mask
+
+    out[large_mask] = _apply_format('%.1f', values[large_mask])
+    out[medium_mask] = _apply_format('%.2f', values[medium_mask])
+    out[small_mask] = _apply_format('%.3f', values[small_mask])
+    return out
+
+
+def _numeric_formatter(format_array: Callable[[np.ndarray], np.ndarray],
+                       invalid_text: Callable[[object], str]) -> ColumnFormatter:
+    """
+    包装数值格式化函数：缺失值显示为空，无法转换为数值的单元格使用 invalid_text
+
+    Args:
+        format_array: 处理不含缺失值浮点数组的格式化函数
+        invalid_text: 非数值单元格的显示文本
+
+    Returns:
+        整列格式化函数
+    """
+    def format_column(values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values)
+        out = np.full(len(values), "", dtype=object)
+
+        if values.dtype.kind in 'biuf':
+            numbers = values.astype(float)
+            invalid = np.zeros(len(values), dtype=bool)
+        else:
+            numbers = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=float)
+            invalid = np.isnan(numbers) & ~pd.isna(values)
+
+        valid = ~np.isnan(numbers)
+        if valid.any():
+            out[valid] = format_array(numbers[valid])
+        for idx in np.flatnonzero(invalid):
+            out[idx] = invalid_text(values[idx])
+        return out
+
+    return format_column
+
+
+def format_text_array(values: np.ndarray) -> np.ndarray:
+    """格式化文本字段：缺失值显示为空，其余转为字符串"""
+    values = np.asarray(values)
+    missing = pd.isna(values)
+    return np.array(
+        ["" if is_missing else str(value) for value, is_missing in zip(values.tolist(), missing)],
+        dtype=object
+    )
+
+
+def _build_formatter(col_key: str) -> ColumnFormatter:
+    """根据字段类型选择格式化函数"""
+    if col_key in MONEY_COLUMNS:
+        return _numeric_formatter(format_money_array, str)
+    if col_key in RATIO_COLUMNS:
+        return _numeric_formatter(format_ratio_array, lambda value: "-")
+    if col_key in PERCENT_COLUMNS:
+        return _numeric_formatter(format_percent_array, str)
+    if col_key in NUMERIC_COLUMNS:
+        return _numeric_formatter(format_number_array, str)
+    return format_text_array
+
+
+# 启动时根据显示列配置构建一次
+COLUMN_FORMATTERS: Dict[str, ColumnFormatter] = {
+    col['key']: _build_formatter(col['key']) for col in config.DISPLAY_COLUMNS
+}
+
+
+def get_formatter(col_key: str) -> ColumnFormatter:
+    """获取字段的整列格式化函数（未在显示列中配置的字段按需构建并缓存）"""
+    formatter = COLUMN_FORMATTERS.get(col_key)
+    if formatter is None:
+        formatter = COLUMN_FORMATTERS[col_key] = _build_formatter(col_key)
+    return formatter
+
+
+def format_column(values, col_key: str) -> np.ndarray:
+    """
+    一次性格式化整列数据
+
+    Args:
+        values: 列数据（NumPy数组或Series）
+        col_key: 字段名
+
+    Returns:
+        与输入等长的显示字符串数组
+    """
+    return get_formatter(col_key)(np.asarray(values))
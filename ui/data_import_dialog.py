@@ -5,12 +5,14 @@ import os
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel,
     QPushButton, QFileDialog, QTextEdit, QProgressBar,
-    QMessageBox, QGroupBox
+    QMessageBox, QGroupBox, QCheckBox, QTableWidget, QTableWidgetItem,
+    QHeaderView
 )
 from PyQt5.QtCore import Qt
 import logging
 
 from utils.thread_worker import BatchImportWorker
+from utils.import_metrics import IMPORT_STAGES, dump_metrics_json
 import config
 
 
@@ -30,8 +32,8 @@ class DataImportDialog(QDialog):
         """初始化UI"""
         self.setWindowTitle("批量导入数据")
         self.setModal(True)
-        self.setMinimumWidth(700)
-        self.setMinimumHeight(500)
+        self.setMinimumWidth(800)
+        self.setMinimumHeight(650)
         
         layout = QVBoxLayout(self)
         
@@ -69,6 +71,10 @@ class DataImportDialog(QDialog):
         self.file_list_label.setStyleSheet("color: #999; font-style: italic;")
         file_layout.addWidget(self.file_list_label)
         
+        # 强制重新导入（默认跳过已导入且未变化的文件）
+        self.force_checkbox = QCheckBox("强制重新导入（不跳过已导入且未变化的文件）")
+        file_layout.addWidget(self.force_checkbox)
+        
         file_group.setLayout(file_layout)
         layout.addWidget(file_group)
         
@@ -98,9 +104,30 @@ class DataImportDialog(QDialog):
         log_group.setLayout(log_layout)
         layout.addWidget(log_group)
         
+        # 导入指标：每个文件一行，各阶段耗时（秒）
+        metrics_group = QGroupBox("导入指标")
+        metrics_layout = QVBoxLayout()
+        
+        headers = ["文件", "行数", "大小(MB)"] + [title for _, title in IMPORT_STAGES] + ["合计(秒)", "行/秒", "解析内存增量(MB)"]
+        self.metrics_table = QTableWidget(0, len(headers))
+        self.metrics_table.setHorizontalHeaderLabels(headers)
+        self.metrics_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.metrics_table.verticalHeader().setVisible(False)
+        self.metrics_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.metrics_table.setMaximumHeight(180)
+        metrics_layout.addWidget(self.metrics_table)
+        
+        metrics_group.setLayout(metrics_layout)
+        layout.addWidget(metrics_group)
+        
         # 按钮区域
         button_layout = QHBoxLayout()
         
+        self.btn_export_metrics = QPushButton("导出指标JSON")
+        self.btn_export_metrics.setEnabled(False)
+        self.btn_export_metrics.clicked.connect(self.export_metrics)
+        button_layout.addWidget(self.btn_export_metrics)
+        
         self.btn_start = QPushButton("开始导入")
         self.btn_start.setEnabled(False)
         self.btn_start.clicked.connect(self.start_import)
@@ -185,22 +212,29 @@ class DataImportDialog(QDialog):
         self.btn_start.setEnabled(False)
         self.btn_select_files.setEnabled(False)
         self.btn_select_folder.setEnabled(False)
+        self.force_checkbox.setEnabled(False)
         
-        # 清空日志
+        # 清空日志和指标
         self.log_text.clear()
         self.log_text.append("开始导入...\n")
+        self.metrics_table.setRowCount(0)
+        self.btn_export_metrics.setEnabled(False)
         
         # 创建工作线程
         self.worker = BatchImportWorker(
             self.file_paths,
             self.db_manager,
             self.excel_parser,
-            config.COLUMN_MAPPING
+            config.COLUMN_MAPPING,
+            max_workers=config.IMPORT_WORKERS,
+            streaming=config.EXCEL_STREAMING_READ,
+            force=self.force_checkbox.isChecked()
         )
         
         # 连接信号
         self.worker.progress_updated.connect(self.on_progress_updated)
         self.worker.file_imported.connect(self.on_file_imported)
+        self.worker.file_metrics.connect(self.on_file_metrics)
         self.worker.all_completed.connect(self.on_all_completed)
         
         # 启动线程
@@ -210,7 +244,7 @@ class DataImportDialog(QDialog):
         """进度更新"""
         progress = int((current / total) * 100)
         self.progress_bar.setValue(progress)
-        self.progress_label.setText(f"正在导入 ({current}/{total}): {filename}")
+        self.progress_label.setText(f"已解析 ({current}/{total}): {filename}")
     
     def on_file_imported(self, filename: str, records: int, success: bool, message: str):
         """文件导入完成"""
@@ -224,6 +258,49 @@ class DataImportDialog(QDialog):
             self.log_text.verticalScrollBar().maximum()
         )
     
+    def on_file_metrics(self, metrics: dict):
+        """显示单个文件的导入指标"""
+        file_mb = metrics['file_bytes'] / (1024 * 1024) if metrics.get('file_bytes') is not None else None
+        # (值, 格式)
+        values = [(metrics['file_name'], "{}"), (metrics['rows'], "{}"), (file_mb, "{:.2f}")]
+        values += [(metrics['stages'].get(key), "{:.2f}") for key, _ in IMPORT_STAGES]
+        values += [
+            (metrics['total_seconds'], "{:.2f}"),
+            (metrics.get('rows_per_second'), "{:.0f}"),
+            (metrics.get('rss_delta_mb'), "{:.0f}"),
+        ]
+        
+        row = self.metrics_table.rowCount()
+        self.metrics_table.insertRow(row)
+        for col, (value, fmt) in enumerate(values):
+            text = "-" if value is None else fmt.format(value)
+            item = QTableWidgetItem(text)
+            if col > 0:
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            self.metrics_table.setItem(row, col, item)
+        self.metrics_table.scrollToBottom()
+    
+    def export_metrics(self):
+        """把本次导入的全部文件指标导出为JSON"""
+        if not self.worker or not self.worker.metrics:
+            return
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "导出导入指标", "import_metrics.json", "JSON文件 (*.json)"
+        )
+        if not file_path:
+            return
+        
+        try:
+            dump_metrics_json(self.worker.metrics, file_path, {
+                'workers': config.IMPORT_WORKERS,
+                'streaming': config.EXCEL_STREAMING_READ,
+            })
+            QMessageBox.information(self, "成功", f"指标已导出到:\n{file_path}")
+        except OSError as e:
+            logging.error(f"导出导入指标失败: {str(e)}")
+            QMessageBox.critical(self, "错误", f"导出失败: {str(e)}")
+    
     def on_all_completed(self, success_count: int, fail_count: int, total_records: int):
         """全部导入完成"""
         self.progress_bar.setValue(100)
@@ -234,11 +311,14 @@ class DataImportDialog(QDialog):
         self.log_text.append(f"导入完成！")
         self.log_text.append(f"成功: {success_count} 个文件")
         self.log_text.append(f"失败: {fail_count} 个文件")
+        if self.worker.skipped_count:
+            self.log_text.append(f"跳过: {self.worker.skipped_count} 个文件（未变化）")
         self.log_text.append(f"总共导入: {total_records} 条记录")
         self.log_text.append("="*50)
         
         # 启用关闭按钮
         self.btn_cancel.setText("完成")
+        self.btn_export_metrics.setEnabled(bool(self.worker.metrics))
         
         # 显示消息框
         QMessageBox.information(
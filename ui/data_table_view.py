@@ -1,39 +1,192 @@
 """
 数据表格视图
 """
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView, QLabel
-from PyQt5.QtCore import Qt, QCoreApplication
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableView, QAbstractItemView
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
 from PyQt5.QtGui import QColor
+import numpy as np
 import pandas as pd
 import config
+from ui.column_formatters import (
+    format_column, format_money_array, format_ratio_array,
+    MONEY_COLUMNS, PERCENT_COLUMNS, RATIO_COLUMNS, NUMERIC_COLUMNS
+)
 
 
-class NumericTableWidgetItem(QTableWidgetItem):
-    """支持数值排序的表格项"""
+class StockTableModel(QAbstractTableModel):
+    """
+    基于DataFrame列数组的表格模型
     
-    def __lt__(self, other):
-        """重写小于比较，用于排序"""
-        # 尝试获取UserRole数据进行数值比较
-        self_data = self.data(Qt.UserRole)
-        other_data = other.data(Qt.UserRole)
+    只保存每列的NumPy数组，颜色在 data() 中按需计算，视图只会请求可见行，
+    因此行数不再受限制。显示文本在某列首次被请求时整列格式化并缓存，
+    重新排序或再次显示同一结果集时不会重复格式化。
+    排序只对该列的类型化数组做一次稳定 argsort，得到视图行到数据行的映射。
+    """
+    
+    def __init__(self, view, columns=None, parent=None):
+        """
+        Args:
+            view: 提供 get_foreground / get_background 的 DataTableView
+            columns: 显示列配置（默认 config.DISPLAY_COLUMNS）
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self._view = view
+        self._columns = columns or config.DISPLAY_COLUMNS
+        self._arrays = [None] * len(self._columns)
+        self._display = [None] * len(self._columns)
+        self._sort_keys = [None] * len(self._columns)
+        self._order = None  # 视图行 -> 数据行，None 表示原始顺序
+        self._frame = None
+        self._row_count = 0
+    
+    def set_frame(self, df: pd.DataFrame):
+        """替换模型数据（仅保存列数组引用，不逐单元格拷贝）"""
+        self.beginResetModel()
+        if df is not None and df is self._frame:
+            # 同一结果集再次显示，保留已格式化的文本
+            self.endResetModel()
+            return
         
-        # 如果两者都有UserRole数据，按数值比较
-        if self_data is not None and other_data is not None:
-            try:
-                return float(self_data) < float(other_data)
-            except (ValueError, TypeError):
-                pass
+        self._frame = df
+        self._display = [None] * len(self._columns)
+        self._sort_keys = [None] * len(self._columns)
+        self._order = None
+        if df is None or len(df) == 0:
+            self._arrays = [None] * len(self._columns)
+            self._row_count = 0
+        else:
+            self._arrays = [
+                df[col['key']].to_numpy() if col['key'] in df.columns else None
+                for col in self._columns
+            ]
+            self._row_count = len(df)
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._columns[section]['name']
+        return str(section + 1)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        
+        values = self._arrays[index.column()]
+        if values is None:
+            return None
+        
+        row = self.source_row(index.row())
+        
+        if role == Qt.DisplayRole:
+            return self._display_column(index.column())[row]
         
-        # 否则按文本比较
-        return super().__lt__(other)
+        value = values[row]
+        col_key = self._columns[index.column()]['key']
+        
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.ForegroundRole:
+            return self._view.get_foreground(value, col_key)
+        if role == Qt.BackgroundRole:
+            return self._view.get_background(value, col_key)
+        return None
+    
+    def source_row(self, row: int) -> int:
+        """视图行号转换为数据行号"""
+        return row if self._order is None else int(self._order[row])
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        """
+        按列排序（缺失值始终排在最后）
+        
+        Args:
+            column: 列索引，-1 表示恢复原始顺序
+            order: 升序/降序
+        """
+        if column < 0 or self._arrays[column] is None:
+            new_order = None
+        else:
+            keys = pd.Series(self._sort_key_column(column))
+            new_order = keys.sort_values(
+                ascending=(order == Qt.AscendingOrder),
+                kind='stable',
+                na_position='last'
+            ).index.to_numpy()
+        
+        if new_order is None and self._order is None:
+            return
+        
+        self.layoutAboutToBeChanged.emit()
+        
+        # 记录持久索引对应的数据行，排序后映射到新的视图行
+        persistent = self.persistentIndexList()
+        source_rows = [self.source_row(index.row()) for index in persistent]
+        
+        self._order = new_order
+        if new_order is None:
+            view_rows = source_rows
+        else:
+            inverse = np.empty(len(new_order), dtype=np.int64)
+            inverse[new_order] = np.arange(len(new_order))
+            view_rows = [int(inverse[row]) for row in source_rows]
+        
+        self.changePersistentIndexList(
+            persistent,
+            [self.index(row, index.column()) for row, index in zip(view_rows, persistent)]
+        )
+        self.layoutChanged.emit()
+    
+    def _display_column(self, column: int) -> np.ndarray:
+        """获取整列显示文本，首次请求时一次性格式化"""
+        display = self._display[column]
+        if display is None:
+            display = format_column(self._arrays[column], self._columns[column]['key'])
+            self._display[column] = display
+        return display
+    
+    def _sort_key_column(self, column: int) -> np.ndarray:
+        """获取整列排序键：数值字段转为浮点数组，文本字段按字符串比较"""
+        keys = self._sort_keys[column]
+        if keys is None:
+            values = self._arrays[column]
+            col_key = self._columns[column]['key']
+            numeric_cols = MONEY_COLUMNS + PERCENT_COLUMNS + RATIO_COLUMNS + NUMERIC_COLUMNS
+            
+            if values.dtype.kind in 'biuf':
+                keys = values.astype(float)
+            elif col_key in numeric_cols:
+                keys = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=float)
+            else:
+                keys = np.array(
+                    [None if pd.isna(value) else str(value) for value in values.tolist()],
+                    dtype=object
+                )
+            self._sort_keys[column] = keys
+        return keys
 
 
 class DataTableView(QWidget):
     """数据表格视图"""
+    # 信号定义
+    row_activated = pyqtSignal(dict)  # 双击行时发出该行数据
     
-    def __init__(self):
+    def __init__(self, columns=None):
+        """
+        Args:
+            columns: 显示列配置（默认 config.DISPLAY_COLUMNS）
+        """
         super().__init__()
         self.current_data = None
+        self.columns = columns or config.DISPLAY_COLUMNS
         self.init_ui()
     
     def init_ui(self):
@@ -41,24 +194,29 @@ class DataTableView(QWidget):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         
-        # 创建表格
-        self.table = QTableWidget()
+        # 创建模型和表格（点击表头时由模型按类型化数组排序）
+        self.model = StockTableModel(self, self.columns, self)
+        
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.setSortingEnabled(True)
+        self.table.verticalHeader().setDefaultSectionSize(35)
+        self.table.doubleClicked.connect(self.on_double_clicked)
         
         # 设置表格样式
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 1px solid #ddd;
                 gridline-color: #ddd;
                 background-color: white;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #667eea;
                 color: white;
             }
@@ -78,13 +236,8 @@ class DataTableView(QWidget):
     
     def setup_columns(self):
         """设置表格列"""
-        self.table.setColumnCount(len(config.DISPLAY_COLUMNS))
-        
-        headers = [col['name'] for col in config.DISPLAY_COLUMNS]
-        self.table.setHorizontalHeaderLabels(headers)
-        
         # 设置列宽
-        for idx, col in enumerate(config.DISPLAY_COLUMNS):
+        for idx, col in enumerate(self.columns):
             self.table.setColumnWidth(idx, col['width'])
         
         # 设置最后一列自适应
@@ -97,144 +250,17 @@ class DataTableView(QWidget):
         self.populate_table(df)
     
     def populate_table(self, df: pd.DataFrame):
-        """填充表格数据"""
-        if df is None or len(df) == 0:
-            self.table.setRowCount(0)
-            return
-        
-        # 优化性能：禁用UI更新和信号
+        """填充表格数据（模型只保存列数组，显示内容由视图按需请求）"""
+        # 新数据按原始顺序显示，清除上一次的排序状态
         self.table.setSortingEnabled(False)
-        self.table.setUpdatesEnabled(False)
-        self.table.blockSignals(True)
-        
-        # 设置行数
-        row_count = min(len(df), config.MAX_DISPLAY_ROWS)
-        self.table.setRowCount(row_count)
-        
-        # 填充数据
-        for row_idx in range(row_count):
-            for col_idx, col_config in enumerate(config.DISPLAY_COLUMNS):
-                col_key = col_config['key']
-                
-                # 获取值
-                if col_key in df.columns:
-                    value = df.iloc[row_idx][col_key]
-                    
-                    # 格式化显示
-                    display_text = self.format_value(value, col_key)
-                    
-                    # 为对比字段使用数值排序项，其他使用普通项
-                    if col_key in ['main_net_prev_ratio', 'volume_prev_ratio']:
-                        item = NumericTableWidgetItem(display_text)
-                        # 设置排序数据（使用原始数值）
-                        try:
-                            float_value = float(value) if not pd.isna(value) else 0.0
-                            item.setData(Qt.UserRole, float_value)
-                        except (ValueError, TypeError):
-                            item.setData(Qt.UserRole, 0.0)
-                    else:
-                        item = QTableWidgetItem(display_text)
-                    
-                    item.setTextAlignment(Qt.AlignCenter)
-                    
-                    # 设置颜色（主力净额、对比等）
-                    self.apply_color(item, value, col_key)
-                    
-                    self.table.setItem(row_idx, col_idx, item)
-            
-            # 每处理50行，处理一次事件队列，让进度条保持响应
-            if (row_idx + 1) % 50 == 0:
-                QCoreApplication.processEvents()
-        
-        # 调整行高
-        self.table.verticalHeader().setDefaultSectionSize(35)
-        
-        # 恢复UI更新和信号，重新启用排序
-        self.table.blockSignals(False)
-        self.table.setUpdatesEnabled(True)
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.model.sort(-1)
+        self.model.set_frame(df)
         self.table.setSortingEnabled(True)
     
     def format_value(self, value, col_key: str) -> str:
-        """格式化值"""
-        if pd.isna(value) or value is None:
-            return ""
-        
-        # 需要显示"万/亿"单位的字段（数据库中存储的单位是"万"）
-        money_cols = [
-            'auction_today_volume',      # 成交额
-            'auction_yesterday_volume',   # 昨日成交额
-            'real_market_value',          # 实流市值
-            'main_net_amount',            # 主力净额
-            'auction_net_amount',         # 竞价净额
-            'auction_main_net',           # 增额
-        ]
-        
-        # 百分比字段
-        percent_cols = [
-            'price_change',          # 涨幅
-            'flow_ratio',            # 净流占比
-            'net_ratio',             # 净成占比
-            'turnover_rate',         # 换手率
-            'real_turnover_rate',    # 实换手率
-        ]
-        
-        # 对比比率字段（显示为倍数）
-        ratio_cols = [
-            'main_net_prev_ratio',   # 主力净额前日对比
-            'volume_prev_ratio',     # 成交额前日对比
-        ]
-        
-        # 格式化金额字段（带万/亿单位）
-        if col_key in money_cols:
-            try:
-                num_value = float(value)
-                return self._format_money(num_value)
-            except (ValueError, TypeError):
-                return str(value)
-        
-        # 格式化对比比率字段（显示为倍数或百分比）
-        if col_key in ratio_cols:
-            try:
-                num_value = float(value)
-                return self._format_ratio(num_value)
-            except (ValueError, TypeError):
-                return "-"
-        
-        # 格式化百分比字段
-        if col_key in percent_cols:
-            try:
-                num_value = float(value)
-                if abs(num_value) >= 100:
-                    return f"{num_value:.2f}%"
-                elif abs(num_value) >= 10:
-                    return f"{num_value:.2f}%"
-                else:
-                    return f"{num_value:.2f}%"
-            except (ValueError, TypeError):
-                return str(value)
-        
-        # 其他数值字段
-        numeric_cols = [
-            'current_price', 'buy_sell_ratio', 'volume_ratio',
-            'popularity_value', 'popularity_change', 'main_net_ratio'
-        ]
-        
-        if col_key in numeric_cols:
-            try:
-                num_value = float(value)
-                # 根据数值大小决定小数位
-                if abs(num_value) >= 1000:
-                    return f"{num_value:.1f}"
-                elif abs(num_value) >= 100:
-                    return f"{num_value:.2f}"
-                elif abs(num_value) >= 1:
-                    return f"{num_value:.2f}"
-                else:
-                    return f"{num_value:.3f}"
-            except (ValueError, TypeError):
-                return str(value)
-        
-        return str(value)
+        """格式化单个值（与表格整列格式化使用同一套格式化器）"""
+        return format_column(np.array([value], dtype=object), col_key)[0]
     
     def _format_money(self, value: float) -> str:
         """
@@ -247,33 +273,7 @@ class DataTableView(QWidget):
         Returns:
             格式化后的字符串，如 "3070万"、"7315.3亿"
         """
-        if value == 0:
-            return "0"
-        
-        abs_value = abs(value)
-        
-        # 如果大于等于10000万，显示为"亿"
-        if abs_value >= 10000:
-            yi_value = value / 10000
-            # 根据数值大小决定小数位
-            if abs(yi_value) >= 1000:
-                return f"{yi_value:.1f}亿"
-            elif abs(yi_value) >= 100:
-                return f"{yi_value:.1f}亿"
-            else:
-                return f"{yi_value:.1f}亿"
-        
-        # 小于10000万，显示为"万"
-        else:
-            # 根据数值大小决定小数位
-            if abs_value >= 1000:
-                return f"{value:.1f}万"
-            elif abs_value >= 100:
-                return f"{value:.1f}万"
-            elif abs_value >= 1:
-                return f"{value:.1f}万"
-            else:
-                return f"{value:.2f}万"
+        return format_money_array(np.array([value], dtype=float))[0]
     
     def _format_ratio(self, value: float) -> str:
         """
@@ -285,59 +285,46 @@ class DataTableView(QWidget):
         Returns:
             格式化后的字符串，统一为百分比格式，如 "50%"、"-20%"、"0%"
         """
-        # 计算百分比变化
-        percent_change = (value - 1) * 100
-        
-        # 统一显示为百分比，正数不带+号
-        if percent_change == 0:
-            return "0%"
-        else:
-            return f"{percent_change:.1f}%"
+        return format_ratio_array(np.array([value], dtype=float))[0]
     
-    def apply_color(self, item: QTableWidgetItem, value, col_key: str):
-        """应用颜色"""
+    def get_foreground(self, value, col_key: str):
+        """获取文字颜色（主力净额、对比等），无需着色时返回None"""
         # 主力净额相关列
         if col_key in ['main_net_amount', 'auction_net_amount']:
             try:
                 num_value = float(value)
                 if num_value > 0:
-                    item.setForeground(QColor(220, 53, 69))  # 红色（流入）
+                    return QColor(220, 53, 69)  # 红色（流入）
                 elif num_value < 0:
-                    item.setForeground(QColor(40, 167, 69))  # 绿色（流出）
+                    return QColor(40, 167, 69)  # 绿色（流出）
             except (ValueError, TypeError):
                 pass
         
-        # 主力净额对比
-        elif col_key == 'main_net_ratio':
+        # 主力净额对比、前日对比列（主力净额前日对比、成交额前日对比）
+        elif col_key in ['main_net_ratio', 'main_net_prev_ratio', 'volume_prev_ratio']:
             try:
                 ratio = float(value)
                 if ratio > 1:
-                    item.setForeground(QColor(220, 53, 69))  # 红色（增长）
+                    return QColor(220, 53, 69)  # 红色（增长）
                 elif ratio < 1:
-                    item.setForeground(QColor(40, 167, 69))  # 绿色（下降）
-            except (ValueError, TypeError):
-                pass
-        
-        # 前日对比列（主力净额前日对比、成交额前日对比）
-        elif col_key in ['main_net_prev_ratio', 'volume_prev_ratio']:
-            try:
-                ratio = float(value)
-                if ratio > 1:
-                    item.setForeground(QColor(220, 53, 69))  # 红色（增长）
-                    item.setFont(item.font())  # 保持原字体
-                elif ratio < 1:
-                    item.setForeground(QColor(40, 167, 69))  # 绿色（下降）
+                    return QColor(40, 167, 69)  # 绿色（下降）
                 # ratio == 1 保持默认颜色
             except (ValueError, TypeError):
                 pass
         
+        return None
+    
+    def get_background(self, value, col_key: str):
+        """获取背景颜色，无需着色时返回None"""
         # 竞价增额（标记颜色）
-        elif col_key == 'auction_increase':
+        if col_key == 'auction_increase':
             str_value = str(value).strip()
             if '5' in str_value or 'X5' in str_value:
-                item.setBackground(QColor(220, 53, 69, 50))  # 浅红色背景
+                return QColor(220, 53, 69, 50)  # 浅红色背景
             elif '3' in str_value or 'X3' in str_value:
-                item.setBackground(QColor(255, 193, 7, 50))  # 浅黄色背景
+                return QColor(255, 193, 7, 50)  # 浅黄色背景
+        
+        return None
     
     def get_selected_row_data(self) -> dict:
         """获取选中行的数据"""
@@ -345,15 +332,27 @@ class DataTableView(QWidget):
         if not selected_rows:
             return None
         
-        row_idx = selected_rows[0].row()
+        # 排序后视图行号与数据行号不同，需映射回数据行
+        row_idx = self.model.source_row(selected_rows[0].row())
         
         if self.current_data is None or row_idx >= len(self.current_data):
             return None
         
-        return self.current_data.iloc[row_idx].to_dict()
+        row_data = self.current_data.iloc[row_idx].to_dict()
+        # float32列按其最短十进制表示还原（如 12.34 而不是 12.340000152587891）
+        for key, value in row_data.items():
+            if isinstance(value, np.float32):
+                row_data[key] = float(str(value))
+        return row_data
+    
+    def on_double_clicked(self, index):
+        """双击行：发出该行数据"""
+        row_data = self.get_selected_row_data()
+        if row_data:
+            self.row_activated.emit(row_data)
     
     def clear(self):
         """清空表格"""
-        self.table.setRowCount(0)
+        self.model.set_frame(None)
         self.current_data = None
 
@@ -0,0 +1,277 @@
+"""
+数据导出对话框
+直接从数据库按块导出任意日期范围的数据，导出在后台线程中执行，不受表格显示行数限制
+"""
+import os
+import logging
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QComboBox,
+    QLineEdit, QPushButton, QFileDialog, QProgressBar, QMessageBox,
+    QGroupBox, QCheckBox
+)
+
+import config
+from database.db_manager import DEFAULT_QUERY_COLUMNS
+from utils.export_utils import EXPORT_FORMATS, parquet_available, column_headers
+from utils.thread_worker import ExportWorker
+
+
+class ExportDialog(QDialog):
+    """数据导出对话框"""
+
+    def __init__(self, db_manager, filter_params: dict = None, parent=None):
+        """
+        初始化导出对话框
+
+        Args:
+            db_manager: 数据库管理器
+            filter_params: 当前的筛选条件（trade_date、stock_code、sector），作为默认导出范围
+            parent: 父窗口
+        """
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.filter_params = filter_params or {}
+        self.worker = None
+
+        self.init_ui()
+        self.load_options()
+
+    def init_ui(self):
+        """初始化UI"""
+        self.setWindowTitle("导出数据")
+        self.setModal(True)
+        self.setMinimumWidth(600)
+
+        layout = QVBoxLayout(self)
+
+        # 导出范围
+        range_group = QGroupBox("导出范围")
+        range_layout = QGridLayout(range_group)
+
+        range_layout.addWidget(QLabel("开始日期:"), 0, 0)
+        self.start_combo = QComboBox()
+        self.start_combo.setMinimumWidth(120)
+        range_layout.addWidget(self.start_combo, 0, 1)
+        range_layout.addWidget(QLabel("结束日期:"), 0, 2)
+        self.end_combo = QComboBox()
+        self.end_combo.setMinimumWidth(120)
+        range_layout.addWidget(self.end_combo, 0, 3)
+
+        range_layout.addWidget(QLabel("股票代码:"), 1, 0)
+        self.code_input = QLineEdit()
+        self.code_input.setPlaceholderText("全部")
+        range_layout.addWidget(self.code_input, 1, 1)
+        range_layout.addWidget(QLabel("板块:"), 1, 2)
+        self.sector_combo = QComboBox()
+        range_layout.addWidget(self.sector_combo, 1, 3)
+
+        layout.addWidget(range_group)
+
+        # 导出文件
+        file_group = QGroupBox("导出文件")
+        file_layout = QGridLayout(file_group)
+
+        file_layout.addWidget(QLabel("格式:"), 0, 0)
+        self.format_combo = QComboBox()
+        for key, (title, extension) in EXPORT_FORMATS.items():
+            self.format_combo.addItem(f"{title} ({extension})", key)
+        if not parquet_available():
+            # 未安装 pyarrow 时禁用 Parquet 选项
+            index = self.format_combo.findData('parquet')
+            self.format_combo.model().item(index).setEnabled(False)
+            self.format_combo.setItemText(index, self.format_combo.itemText(index) + " - 需要安装 pyarrow")
+        self.format_combo.currentIndexChanged.connect(self.on_format_changed)
+        file_layout.addWidget(self.format_combo, 0, 1)
+
+        self.header_checkbox = QCheckBox("使用中文表头")
+        self.header_checkbox.setChecked(True)
+        file_layout.addWidget(self.header_checkbox, 0, 2)
+
+        file_layout.addWidget(QLabel("保存到:"), 1, 0)
+        self.path_input = QLineEdit()
+        file_layout.addWidget(self.path_input, 1, 1)
+        btn_browse = QPushButton("浏览...")
+        btn_browse.clicked.connect(self.select_path)
+        file_layout.addWidget(btn_browse, 1, 2)
+
+        layout.addWidget(file_group)
+
+        # 进度条
+        progress_group = QGroupBox("导出进度")
+        progress_layout = QVBoxLayout(progress_group)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        progress_layout.addWidget(self.progress_bar)
+
+        self.progress_label = QLabel("等待开始...")
+        progress_layout.addWidget(self.progress_label)
+
+        layout.addWidget(progress_group)
+
+        # 按钮区域
+        button_layout = QHBoxLayout()
+
+        self.btn_start = QPushButton("开始导出")
+        self.btn_start.clicked.connect(self.start_export)
+        self.btn_start.setStyleSheet("""
+            QPushButton {
+                background-color: #667eea;
+                color: white;
+                border: none;
+                padding: 10px 20px;
+                font-size: 14px;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #5568d3;
+            }
+            QPushButton:disabled {
+                background-color: #ccc;
+            }
+        """)
+
+        self.btn_cancel = QPushButton("关闭")
+        self.btn_cancel.clicked.connect(self.close_dialog)
+
+        button_layout.addStretch()
+        button_layout.addWidget(self.btn_start)
+        button_layout.addWidget(self.btn_cancel)
+
+        layout.addLayout(button_layout)
+
+    def load_options(self):
+        """加载日期和板块选项，默认范围为当前筛选条件"""
+        dates = self.db_manager.get_all_dates()  # 降序
+        for combo in (self.start_combo, self.end_combo):
+            for date in dates:
+                combo.addItem(date, date)
+
+        trade_date = self.filter_params.get('trade_date')
+        if trade_date in dates:
+            self.start_combo.setCurrentIndex(dates.index(trade_date))
+            self.end_combo.setCurrentIndex(dates.index(trade_date))
+
+        self.sector_combo.addItem("全部", None)
+        for sector in self.db_manager.get_all_sectors():
+            if sector:
+                self.sector_combo.addItem(sector, sector)
+        sector_index = self.sector_combo.findData(self.filter_params.get('sector'))
+        if sector_index >= 0:
+            self.sector_combo.setCurrentIndex(sector_index)
+
+        self.code_input.setText(self.filter_params.get('stock_code') or "")
+        self.btn_start.setEnabled(bool(dates))
+
+    def on_format_changed(self):
+        """切换格式时同步修改保存路径的扩展名"""
+        path = self.path_input.text().strip()
+        if path:
+            _, extension = EXPORT_FORMATS[self.format_combo.currentData()]
+            self.path_input.setText(os.path.splitext(path)[0] + extension)
+
+    def select_path(self):
+        """选择保存路径"""
+        title, extension = EXPORT_FORMATS[self.format_combo.currentData()]
+        default_name = f"股票数据_{self.start_combo.currentData()}_{self.end_combo.currentData()}{extension}"
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "导出数据", self.path_input.text().strip() or default_name,
+            f"{title} (*{extension})"
+        )
+        if file_path:
+            if not file_path.lower().endswith(extension):
+                file_path += extension
+            self.path_input.setText(file_path)
+
+    def set_inputs_enabled(self, enabled: bool):
+        """导出期间禁用输入"""
+        for widget in (self.start_combo, self.end_combo, self.code_input, self.sector_combo,
+                       self.format_combo, self.header_checkbox, self.path_input, self.btn_start):
+            widget.setEnabled(enabled)
+
+    def start_export(self):
+        """开始导出"""
+        file_path = self.path_input.text().strip()
+        if not file_path:
+            QMessageBox.warning(self, "提示", "请选择保存路径")
+            return
+
+        start_date = self.start_combo.currentData()
+        end_date = self.end_combo.currentData()
+        if start_date > end_date:
+            start_date, end_date = end_date, start_date
+
+        columns = list(DEFAULT_QUERY_COLUMNS)
+        headers = column_headers(columns, config.DISPLAY_COLUMNS) if self.header_checkbox.isChecked() else None
+
+        self.set_inputs_enabled(False)
+        self.btn_cancel.setText("取消")
+        self.progress_bar.setValue(0)
+        self.progress_label.setText("正在统计记录数...")
+
+        # 创建工作线程
+        self.worker = ExportWorker(
+            self.db_manager,
+            file_path,
+            self.format_combo.currentData(),
+            columns,
+            start_date,
+            end_date,
+            stock_code=self.code_input.text().strip() or None,
+            sector=self.sector_combo.currentData(),
+            headers=headers
+        )
+
+        # 连接信号
+        self.worker.progress_updated.connect(self.on_progress_updated)
+        self.worker.export_completed.connect(self.on_export_completed)
+        self.worker.export_failed.connect(self.on_export_failed)
+        self.worker.export_cancelled.connect(self.on_export_cancelled)
+
+        # 启动线程
+        self.worker.start()
+        logging.info(f"开始导出: {start_date} ~ {end_date} -> {file_path}")
+
+    def on_progress_updated(self, written: int, total: int):
+        """进度更新"""
+        if total > 0:
+            self.progress_bar.setValue(int(written / total * 100))
+        self.progress_label.setText(f"已导出 {written} / {total} 行")
+
+    def on_export_completed(self, rows: int, file_path: str, seconds: float):
+        """导出完成"""
+        self.progress_bar.setValue(100)
+        self.progress_label.setText(f"导出完成：{rows} 行，耗时 {seconds:.1f} 秒")
+        self.set_inputs_enabled(True)
+        self.btn_cancel.setText("关闭")
+        QMessageBox.information(self, "成功", f"已导出 {rows} 行数据到:\n{file_path}")
+
+    def on_export_failed(self, message: str):
+        """导出失败"""
+        self.progress_label.setText(message)
+        self.set_inputs_enabled(True)
+        self.btn_cancel.setText("关闭")
+        QMessageBox.critical(self, "错误", message)
+
+    def on_export_cancelled(self):
+        """导出已取消"""
+        self.progress_bar.setValue(0)
+        self.progress_label.setText("导出已取消")
+        self.set_inputs_enabled(True)
+        self.btn_cancel.setText("关闭")
+
+    def close_dialog(self):
+        """取消导出或关闭对话框"""
+        if self.worker and self.worker.isRunning():
+            self.progress_label.setText("正在取消...")
+            self.worker.stop()
+            self.worker.wait()
+        else:
+            self.accept()
+
+    def closeEvent(self, event):
+        """窗口关闭事件：正在导出时先取消"""
+        if self.worker and self.worker.isRunning():
+            self.worker.stop()
+            self.worker.wait()
+        event.accept()
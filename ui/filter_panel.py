@@ -115,8 +115,12 @@ class FilterPanel(QWidget):
         layout.addWidget(self.btn_clear)
         layout.addStretch()
         
-        # 回车键触发筛选
+        # 回车键触发筛选（股票代码为精确匹配，输入过程中不自动筛选）
         self.search_input.returnPressed.connect(self.apply_filter)
+        
+        # 日期、板块选择变化时自动筛选（主窗口的查询调度器会合并快速连续的变化）
+        self.date_combo.activated.connect(self.apply_filter)
+        self.sector_combo.activated.connect(self.apply_filter)
     
     def update_date_list(self):
         """更新日期列表"""
@@ -150,14 +154,18 @@ class FilterPanel(QWidget):
         except Exception as e:
             logging.error(f"更新板块列表失败: {str(e)}")
     
-    def apply_filter(self):
-        """应用筛选"""
-        # 获取筛选参数
-        filter_params = {
+    def get_filter_params(self) -> dict:
+        """获取当前的筛选参数"""
+        return {
             'trade_date': self.date_combo.currentData(),
             'stock_code': self.search_input.text().strip() if self.search_input.text().strip() else None,
             'sector': self.sector_combo.currentData()
         }
+    
+    def apply_filter(self):
+        """应用筛选"""
+        # 获取筛选参数
+        filter_params = self.get_filter_params()
         
         # 发送信号
         self.filter_applied.emit(filter_params)
@@ -1,22 +1,47 @@
 """
 日志查看器窗口
+跟随读取日志文件：每次刷新只读取新追加的内容，追加到纯文本控件中；
+最近的日志行保存在内存缓冲区中，按级别筛选不再读取文件
 """
 import os
+from itertools import groupby
+from operator import itemgetter
 from PyQt5.QtWidgets import (
-    QDialog, QVBoxLayout, QTextEdit, QPushButton,
+    QDialog, QVBoxLayout, QPlainTextEdit, QPushButton,
     QHBoxLayout, QLabel, QComboBox
 )
 from PyQt5.QtCore import QTimer
-from PyQt5.QtGui import QFont, QTextCursor
+from PyQt5.QtGui import QFont, QTextCursor, QTextCharFormat, QColor
+
+from utils.log_utils import LogTailer, LogBuffer
+import config
+
+
+# 保留和显示的最大行数
+MAX_LOG_LINES = 5000
+
+# 各级别的显示颜色
+LEVEL_COLORS = {
+    'CRITICAL': '#f48771',  # 红色
+    'ERROR': '#f48771',  # 红色
+    'WARNING': '#dcdcaa',  # 黄色
+    'INFO': '#4ec9b0',  # 青色
+    'DEBUG': '#858585',  # 灰色
+}
+DEFAULT_COLOR = '#d4d4d4'  # 白色
 
 
 class LogViewer(QDialog):
     """日志查看器"""
     
-    def __init__(self, log_file="stock_analysis.log", parent=None):
+    def __init__(self, log_file=config.LOG_FILE, parent=None):
         super().__init__(parent)
         self.log_file = log_file
         self.auto_refresh = False
+        self.tailer = LogTailer(log_file)
+        self.buffer = LogBuffer(MAX_LOG_LINES)
+        self._formats = {}
+        self._shown_lines = False  # 文本控件中是否已有日志行
         self.init_ui()
         self.load_log()
         
@@ -66,15 +91,16 @@ class LogViewer(QDialog):
         
         layout.addLayout(toolbar)
         
-        # 日志文本显示
-        self.log_text = QTextEdit()
+        # 日志文本显示（超过最大行数时自动丢弃最早的行）
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
         self.log_text.setFont(QFont("Consolas", 9))
-        self.log_text.setLineWrapMode(QTextEdit.NoWrap)
+        self.log_text.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.log_text.setMaximumBlockCount(MAX_LOG_LINES)
         
         # 设置样式
         self.log_text.setStyleSheet("""
-            QTextEdit {
+            QPlainTextEdit {
                 background-color: #1e1e1e;
                 color: #d4d4d4;
                 border: 1px solid #444;
@@ -100,75 +126,92 @@ class LogViewer(QDialog):
         layout.addWidget(btn_close)
     
     def load_log(self):
-        """加载日志文件"""
+        """读取日志文件新追加的内容（文件被轮转或清空时重新加载）"""
         if not os.path.exists(self.log_file):
-            self.log_text.setPlainText("日志文件不存在")
+            self.tailer.reset()
+            self.buffer.clear()
+            self.clear_view()
+            self.log_text.setPlaceholderText("日志文件不存在")
             self.status_label.setText("日志文件不存在")
             return
         
         try:
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # 显示最后1000行
-            lines = content.split('\n')
-            if len(lines) > 1000:
-                lines = lines[-1000:]
-                content = '\n'.join(lines)
-            
-            self.full_log = content
-            self.filter_log()
-            
-            # 更新状态
-            file_size = os.path.getsize(self.log_file) / 1024  # KB
-            self.status_label.setText(f"日志文件: {file_size:.2f} KB")
-            
-            # 滚动到底部
-            self.log_text.moveCursor(QTextCursor.End)
-            
+            lines, restarted = self.tailer.read_new_lines()
         except Exception as e:
-            self.log_text.setPlainText(f"加载日志失败: {str(e)}")
             self.status_label.setText(f"加载失败: {str(e)}")
+            return
+        
+        if restarted:
+            self.buffer.clear()
+            self.clear_view()
+        
+        if lines:
+            entries = self.buffer.extend(lines)
+            level = self.current_level()
+            if level is not None:
+                entries = [entry for entry in entries if entry[0] == level]
+            self.append_entries(entries)
+        
+        # 更新状态
+        file_size = self.tailer.offset / 1024  # KB
+        self.status_label.setText(f"日志文件: {file_size:.2f} KB")
     
-    def filter_log(self):
-        """筛选日志"""
+    def current_level(self):
+        """当前筛选的级别（None 表示全部）"""
         level = self.level_combo.currentText()
+        return None if level == "全部" else level
+    
+    def filter_log(self):
+        """按级别筛选缓冲区中的日志行并重新显示"""
+        self.clear_view()
+        self.append_entries(self.buffer.filtered(self.current_level()))
+    
+    def _line_format(self, level: str) -> QTextCharFormat:
+        """获取级别对应的文字格式"""
+        text_format = self._formats.get(level)
+        if text_format is None:
+            text_format = QTextCharFormat()
+            text_format.setForeground(QColor(LEVEL_COLORS.get(level, DEFAULT_COLOR)))
+            self._formats[level] = text_format
+        return text_format
+    
+    def append_entries(self, entries):
+        """
+        在末尾追加带颜色的日志行
         
-        if level == "全部":
-            filtered_content = self.full_log
-        else:
-            lines = self.full_log.split('\n')
-            filtered_lines = [line for line in lines if level in line]
-            filtered_content = '\n'.join(filtered_lines)
+        查看位置在末尾时追加后保持在末尾，向上翻看时不打断当前位置。
         
-        # 高亮显示不同级别
-        html_content = self.format_log_html(filtered_content)
-        self.log_text.setHtml(html_content)
+        Args:
+            entries: (级别, 行) 列表
+        """
+        if entries:
+            scroll_bar = self.log_text.verticalScrollBar()
+            at_bottom = scroll_bar.value() >= scroll_bar.maximum()
+            
+            cursor = QTextCursor(self.log_text.document())
+            cursor.movePosition(QTextCursor.End)
+            cursor.beginEditBlock()
+            # 连续的同级别行合并为一次插入
+            for level, group in groupby(entries, key=itemgetter(0)):
+                text = "\n".join(line for _, line in group)
+                if self._shown_lines:
+                    text = "\n" + text
+                cursor.insertText(text, self._line_format(level))
+                self._shown_lines = True
+            cursor.endEditBlock()
+            
+            if at_bottom:
+                scroll_bar.setValue(scroll_bar.maximum())
         
         # 更新行数
-        line_count = len(filtered_content.split('\n'))
+        line_count = self.log_text.blockCount() if self._shown_lines else 0
         self.line_count_label.setText(f"共 {line_count} 行")
     
-    def format_log_html(self, content):
-        """格式化日志为HTML（带颜色）"""
-        lines = content.split('\n')
-        html_lines = []
-        
-        for line in lines:
-            if 'ERROR' in line:
-                color = '#f48771'  # 红色
-            elif 'WARNING' in line:
-                color = '#dcdcaa'  # 黄色
-            elif 'INFO' in line:
-                color = '#4ec9b0'  # 青色
-            elif 'DEBUG' in line:
-                color = '#858585'  # 灰色
-            else:
-                color = '#d4d4d4'  # 白色
-            
-            html_lines.append(f'<span style="color:{color};">{line}</span>')
-        
-        return '<pre style="font-family: Consolas; font-size: 9pt;">' + '<br>'.join(html_lines) + '</pre>'
+    def clear_view(self):
+        """清空显示"""
+        self.log_text.clear()
+        self._shown_lines = False
+        self.line_count_label.setText("共 0 行")
     
     def toggle_auto_refresh(self, checked):
         """切换自动刷新"""
@@ -197,6 +240,9 @@ class LogViewer(QDialog):
             try:
                 with open(self.log_file, 'w', encoding='utf-8') as f:
                     f.write('')
+                self.tailer.reset()
+                self.buffer.clear()
+                self.clear_view()
                 self.load_log()
                 self.status_label.setText("日志已清空")
             except Exception as e:
@@ -213,7 +259,7 @@ class LogViewer(QDialog):
         if file_path:
             try:
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(self.full_log)
+                    f.write('\n'.join(line for _, line in self.buffer.filtered()))
                 QMessageBox.information(self, "成功", f"日志已导出到:\n{file_path}")
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"导出失败: {str(e)}")
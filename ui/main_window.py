@@ -5,10 +5,10 @@ import sys
 import os
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-    QAction, QFileDialog, QMessageBox, QLabel,
-    QStatusBar, QPushButton, QSplitter, QProgressDialog
+    QAction, QMessageBox, QLabel,
+    QStatusBar, QPushButton, QSplitter, QProgressBar
 )
-from PyQt5.QtCore import Qt, QTimer, QCoreApplication
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QIcon
 import logging
 
@@ -16,9 +16,13 @@ from ui.data_table_view import DataTableView
 from ui.filter_panel import FilterPanel
 from ui.data_import_dialog import DataImportDialog
 from ui.log_viewer import LogViewer
+from ui.statistics_dialog import StatisticsDialog
+from ui.stock_history_dialog import StockHistoryDialog
+from ui.export_dialog import ExportDialog
+from ui.performance_dialog import PerformanceDialog
 from database import DatabaseManager
 from data_processor import ExcelParser
-from utils.thread_worker import WorkerThread
+from utils.query_scheduler import QueryScheduler
 import config
 
 
@@ -30,10 +34,14 @@ class MainWindow(QMainWindow):
         self.db_manager = DatabaseManager(config.DB_PATH)
         self.excel_parser = ExcelParser()
         self.current_data = None
-        self.worker_thread = None  # 用于异步加载数据的线程
-        self.progress_dialog = None  # 加载进度对话框
+        
+        # 查询调度器：新查询取代旧查询，过期结果直接丢弃
+        self.query_scheduler = QueryScheduler(self.db_manager, parent=self)
+        self.query_scheduler.query_completed.connect(self.on_query_completed)
+        self.query_scheduler.query_failed.connect(self.on_data_load_failed)
         
         self.init_ui()
+        self.query_scheduler.busy_changed.connect(self.busy_bar.setVisible)
         self.load_initial_data()
     
     def init_ui(self):
@@ -78,13 +86,17 @@ class MainWindow(QMainWindow):
         btn_refresh.clicked.connect(self.refresh_data)
         
         # 导出按钮
-        btn_export = QPushButton("📥 导出到Excel")
+        btn_export = QPushButton("📥 导出数据")
         btn_export.clicked.connect(self.export_data)
         
         # 统计按钮
         btn_statistics = QPushButton("📊 统计信息")
         btn_statistics.clicked.connect(self.show_statistics)
         
+        # 性能按钮
+        btn_performance = QPushButton("⏱ 性能")
+        btn_performance.clicked.connect(self.show_performance)
+        
         # 日志按钮
         btn_log = QPushButton("📋 查看日志")
         btn_log.clicked.connect(self.show_log_viewer)
@@ -106,6 +118,7 @@ class MainWindow(QMainWindow):
         toolbar_layout.addWidget(btn_refresh)
         toolbar_layout.addWidget(btn_export)
         toolbar_layout.addWidget(btn_statistics)
+        toolbar_layout.addWidget(btn_performance)
         toolbar_layout.addWidget(btn_log)
         toolbar_layout.addStretch()
         
@@ -121,6 +134,7 @@ class MainWindow(QMainWindow):
         
         # 数据表格
         self.table_view = DataTableView()
+        self.table_view.row_activated.connect(self.show_stock_history)
         splitter.addWidget(self.table_view)
         
         # 设置分割器比例
@@ -177,6 +191,11 @@ class MainWindow(QMainWindow):
         log_action.triggered.connect(self.show_log_viewer)
         tools_menu.addAction(log_action)
         
+        performance_action = QAction('性能', self)
+        performance_action.setShortcut('Ctrl+P')
+        performance_action.triggered.connect(self.show_performance)
+        tools_menu.addAction(performance_action)
+        
         # 帮助菜单
         help_menu = menubar.addMenu('帮助')
         
@@ -193,6 +212,15 @@ class MainWindow(QMainWindow):
         self.status_label = QLabel("就绪")
         self.statusBar.addWidget(self.status_label)
         
+        # 查询进行中的忙碌指示
+        self.busy_bar = QProgressBar()
+        self.busy_bar.setRange(0, 0)
+        self.busy_bar.setMaximumWidth(120)
+        self.busy_bar.setMaximumHeight(14)
+        self.busy_bar.setTextVisible(False)
+        self.busy_bar.hide()
+        self.statusBar.addPermanentWidget(self.busy_bar)
+        
         # 记录数标签
         self.records_label = QLabel("共 0 条数据")
         self.statusBar.addPermanentWidget(self.records_label)
@@ -213,9 +241,8 @@ class MainWindow(QMainWindow):
     def load_initial_data(self):
         """加载初始数据"""
         # 获取最近的交易日期
-        dates = self.db_manager.get_all_dates()
-        if dates:
-            latest_date = dates[0]
+        latest_date = self.db_manager.get_latest_date()
+        if latest_date:
             self.load_data_by_date(latest_date)
             self.status_label.setText(f"已加载 {latest_date} 的数据")
         else:
@@ -223,30 +250,15 @@ class MainWindow(QMainWindow):
     
     def load_data_by_date(self, trade_date: str):
         """按日期加载数据（包含前日对比） - 异步方式"""
-        # 如果有正在运行的线程，不启动新查询
-        if self.worker_thread and self.worker_thread.isRunning():
-            logging.warning("已有查询正在进行中，请稍候")
-            return
-        
-        # 设置加载状态和进度提示
-        self.set_loading_state(True, f"正在加载 {trade_date} 的数据...")
         self.status_label.setText(f"正在加载 {trade_date} 的数据...")
         
-        # 创建工作线程执行查询
-        self.worker_thread = WorkerThread(
+        # 提交查询，取代进行中的查询
+        self.query_scheduler.submit(
             self.db_manager.query_by_date_with_comparison,
             trade_date,
-            limit=config.MAX_DISPLAY_ROWS
-        )
-        
-        # 连接信号
-        self.worker_thread.task_completed.connect(
-            lambda df: self.on_data_loaded(df, trade_date)
+            limit=config.MAX_DISPLAY_ROWS,
+            context={'trade_date': trade_date}
         )
-        self.worker_thread.task_failed.connect(self.on_data_load_failed)
-        
-        # 启动线程
-        self.worker_thread.start()
     
     def open_import_dialog(self):
         """打开导入对话框"""
@@ -257,7 +269,7 @@ class MainWindow(QMainWindow):
             self.update_status_bar()
     
     def apply_filter(self, filter_params: dict):
-        """应用筛选（包含前日对比） - 异步方式"""
+        """应用筛选（包含前日对比） - 异步方式，快速连续的筛选只执行最后一次"""
         trade_date = filter_params.get('trade_date')
         stock_code = filter_params.get('stock_code')
         sector = filter_params.get('sector')
@@ -266,11 +278,6 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "提示", "请选择交易日期")
             return
         
-        # 如果有正在运行的线程，不启动新查询
-        if self.worker_thread and self.worker_thread.isRunning():
-            logging.warning("已有查询正在进行中，请稍候")
-            return
-        
         # 设置加载状态和进度提示
         filter_desc = f"{trade_date}"
         if stock_code:
@@ -278,90 +285,26 @@ class MainWindow(QMainWindow):
         if sector:
             filter_desc += f" (板块: {sector})"
         
-        self.set_loading_state(True, f"正在筛选数据...\n{filter_desc}")
-        self.status_label.setText("正在筛选数据...")
+        self.status_label.setText(f"正在筛选数据... {filter_desc}")
         
-        # 创建工作线程执行查询
-        self.worker_thread = WorkerThread(
+        # 提交查询（合并快速连续的筛选变化）
+        self.query_scheduler.submit(
             self.db_manager.query_by_date_with_comparison,
             trade_date,
             stock_code=stock_code,
             sector=sector,
-            limit=config.MAX_DISPLAY_ROWS
+            limit=config.MAX_DISPLAY_ROWS,
+            context={'trade_date': trade_date, 'stock_code': stock_code, 'sector': sector},
+            debounce=True
         )
-        
-        # 连接信号
-        self.worker_thread.task_completed.connect(
-            lambda df: self.on_data_loaded(df, trade_date, stock_code, sector)
-        )
-        self.worker_thread.task_failed.connect(self.on_data_load_failed)
-        
-        # 启动线程
-        self.worker_thread.start()
     
-    def set_loading_state(self, is_loading: bool, message: str = "正在加载数据，请稍候..."):
-        """设置加载状态"""
-        # 禁用/启用筛选面板
-        self.filter_panel.set_enabled(not is_loading)
-        
-        # 禁用/启用表格排序（加载时禁止）
-        if is_loading:
-            self.table_view.table.setSortingEnabled(False)
-            
-            # 显示进度对话框
-            if self.progress_dialog is None:
-                self.progress_dialog = QProgressDialog(
-                    message,
-                    None,  # 不显示取消按钮
-                    0, 0,  # 0到0表示不确定的进度
-                    self
-                )
-                self.progress_dialog.setWindowTitle("加载中")
-                self.progress_dialog.setWindowModality(Qt.WindowModal)
-                self.progress_dialog.setMinimumDuration(0)  # 立即显示
-                self.progress_dialog.setAutoClose(True)
-                self.progress_dialog.setAutoReset(True)
-                
-                # 设置对话框样式
-                self.progress_dialog.setStyleSheet("""
-                    QProgressDialog {
-                        min-width: 350px;
-                        min-height: 120px;
-                    }
-                    QProgressBar {
-                        border: 2px solid #667eea;
-                        border-radius: 5px;
-                        text-align: center;
-                        height: 25px;
-                    }
-                    QProgressBar::chunk {
-                        background-color: #667eea;
-                    }
-                    QLabel {
-                        font-size: 13px;
-                        padding: 10px;
-                    }
-                """)
-            else:
-                # 更新进度对话框的文本
-                self.progress_dialog.setLabelText(message)
-            
-            self.progress_dialog.show()
-        else:
-            # 隐藏进度对话框
-            if self.progress_dialog:
-                self.progress_dialog.close()
-                self.progress_dialog = None
+    def on_query_completed(self, df, context: dict):
+        """查询调度器返回最新结果的回调"""
+        self.on_data_loaded(df, **context)
     
     def on_data_loaded(self, df, trade_date, stock_code=None, sector=None):
         """数据加载完成的回调"""
         try:
-            # 更新进度提示
-            if self.progress_dialog:
-                self.progress_dialog.setLabelText(f"正在填充表格...\n共 {len(df)} 条数据")
-                # 处理事件队列，让进度条保持响应
-                QCoreApplication.processEvents()
-            
             self.current_data = df
             self.table_view.set_data(df)
             self.records_label.setText(f"共 {len(df)} 条数据")
@@ -382,18 +325,12 @@ class MainWindow(QMainWindow):
         except Exception as e:
             logging.error(f"显示数据失败: {str(e)}")
             QMessageBox.critical(self, "错误", f"显示数据失败: {str(e)}")
-        finally:
-            # 恢复UI状态
-            self.set_loading_state(False)
     
     def on_data_load_failed(self, error_msg: str):
         """数据加载失败的回调"""
         QMessageBox.critical(self, "错误", f"加载数据失败: {error_msg}")
         logging.error(f"加载数据失败: {error_msg}")
         self.status_label.setText("加载失败")
-        
-        # 恢复UI状态
-        self.set_loading_state(False)
     
     def clear_filter(self):
         """清除筛选"""
@@ -408,54 +345,42 @@ class MainWindow(QMainWindow):
         self.status_label.setText("数据已刷新")
     
     def export_data(self):
-        """导出数据到Excel"""
-        if self.current_data is None or len(self.current_data) == 0:
+        """导出数据（后台按块从数据库导出，默认范围为当前筛选条件）"""
+        if not self.db_manager.get_latest_date():
             QMessageBox.warning(self, "提示", "没有可导出的数据")
             return
         
-        try:
-            # 选择保存路径
-            file_path, _ = QFileDialog.getSaveFileName(
-                self, "导出数据", "", "Excel文件 (*.xlsx)"
-            )
-            
-            if file_path:
-                # 导出到Excel
-                self.current_data.to_excel(file_path, index=False, engine='openpyxl')
-                QMessageBox.information(self, "成功", f"数据已导出到:\n{file_path}")
-                logging.info(f"数据已导出: {file_path}")
-                
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"导出失败: {str(e)}")
-            logging.error(f"导出失败: {str(e)}")
+        dialog = ExportDialog(self.db_manager, self.filter_panel.get_filter_params(), self)
+        dialog.exec_()
     
     def show_statistics(self):
-        """显示统计信息"""
-        dates = self.db_manager.get_all_dates()
-        if not dates:
+        """显示统计信息（当日汇总、板块统计和近期趋势）"""
+        if not self.db_manager.get_latest_date():
             QMessageBox.information(self, "统计信息", "数据库中没有数据")
             return
         
-        latest_date = dates[0]
-        stats = self.db_manager.get_statistics(latest_date)
-        
-        msg = f"""
-        <h3>统计信息 - {latest_date}</h3>
-        <p><b>总股票数:</b> {stats['total_count']}</p>
-        <p><b>主力净流入股票数:</b> {stats['positive_main_count']}</p>
-        <p><b>成交额增长股票数:</b> {stats['positive_volume_count']}</p>
-        <p><b>平均换手率:</b> {stats['avg_turnover']}%</p>
-        <hr>
-        <p><b>数据库中共有 {len(dates)} 个交易日的数据</b></p>
-        """
+        dialog = StatisticsDialog(self.db_manager, self.filter_panel.get_current_date(), self)
+        dialog.exec_()
+    
+    def show_stock_history(self, row_data: dict):
+        """显示选中股票的历史数据（双击表格行）"""
+        stock_code = row_data.get('stock_code')
+        if not stock_code:
+            return
         
-        QMessageBox.information(self, "统计信息", msg)
+        dialog = StockHistoryDialog(self.db_manager, stock_code, row_data.get('stock_name'), self)
+        dialog.exec_()
     
     def show_log_viewer(self):
         """显示日志查看器"""
         log_viewer = LogViewer(parent=self)
         log_viewer.exec_()
     
+    def show_performance(self):
+        """显示查询性能统计"""
+        dialog = PerformanceDialog(self.db_manager.profiler, self)
+        dialog.exec_()
+    
     def show_about(self):
         """显示关于对话框"""
         msg = f"""
@@ -493,14 +418,8 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.Yes:
-            # 停止运行中的线程
-            if self.worker_thread and self.worker_thread.isRunning():
-                self.worker_thread.terminate()
-                self.worker_thread.wait()
-            
-            # 关闭进度对话框
-            if self.progress_dialog:
-                self.progress_dialog.close()
+            # 中断进行中的查询并等待查询线程退出
+            self.query_scheduler.shutdown()
             
             # 关闭数据库连接
             self.db_manager.close()
@@ -0,0 +1,171 @@
+"""
+性能对话框
+显示各查询方法的耗时分布（p50/p95，SQLite与DataFrame分开）和最近的慢查询
+"""
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QCheckBox, QSpinBox,
+    QTableWidget, QTableWidgetItem, QPlainTextEdit, QGroupBox, QHeaderView,
+    QAbstractItemView
+)
+from PyQt5.QtCore import Qt, QTimer
+
+
+# 统计表的列：(字段, 标题, 格式)
+STATS_COLUMNS = [
+    ('method', '操作', '{}'),
+    ('count', '次数', '{}'),
+    ('p50_ms', 'p50 (ms)', '{:.1f}'),
+    ('p95_ms', 'p95 (ms)', '{:.1f}'),
+    ('max_ms', '最大 (ms)', '{:.1f}'),
+    ('sqlite_p50_ms', 'SQLite p50 (ms)', '{:.1f}'),
+    ('frame_p50_ms', 'DataFrame p50 (ms)', '{:.1f}'),
+    ('avg_rows', '平均行数', '{:.0f}'),
+]
+
+# 自动刷新间隔（毫秒）
+REFRESH_INTERVAL_MS = 1000
+
+
+class PerformanceDialog(QDialog):
+    """查询性能对话框"""
+
+    def __init__(self, profiler, parent=None):
+        """
+        初始化性能对话框
+
+        Args:
+            profiler: 查询性能分析器（DatabaseManager.profiler）
+            parent: 父窗口
+        """
+        super().__init__(parent)
+        self.profiler = profiler
+        self._last_slow = ()  # 已显示的最新一条慢查询，有新的慢查询时才重绘
+
+        self.init_ui()
+        self.refresh()
+
+        # 对话框打开期间定时刷新
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(REFRESH_INTERVAL_MS)
+
+    def init_ui(self):
+        """初始化UI"""
+        self.setWindowTitle("性能")
+        self.setMinimumSize(900, 600)
+
+        layout = QVBoxLayout(self)
+
+        # 分析开关和慢查询阈值
+        option_layout = QHBoxLayout()
+        self.enable_checkbox = QCheckBox("启用性能分析")
+        self.enable_checkbox.setChecked(self.profiler.enabled)
+        self.enable_checkbox.toggled.connect(self.on_enable_toggled)
+        option_layout.addWidget(self.enable_checkbox)
+
+        option_layout.addWidget(QLabel("慢查询阈值:"))
+        self.threshold_spin = QSpinBox()
+        self.threshold_spin.setRange(1, 60000)
+        self.threshold_spin.setSuffix(" ms")
+        self.threshold_spin.setValue(int(self.profiler.slow_threshold_ms))
+        self.threshold_spin.valueChanged.connect(self.on_threshold_changed)
+        option_layout.addWidget(self.threshold_spin)
+        option_layout.addStretch()
+
+        btn_reset = QPushButton("重置统计")
+        btn_reset.clicked.connect(self.reset)
+        option_layout.addWidget(btn_reset)
+        layout.addLayout(option_layout)
+
+        self.hint_label = QLabel()
+        self.hint_label.setStyleSheet("color: #666;")
+        layout.addWidget(self.hint_label)
+
+        # 各操作的耗时统计
+        stats_group = QGroupBox(f"各操作耗时（最近 {self.profiler.window} 次）")
+        stats_layout = QVBoxLayout(stats_group)
+        self.stats_table = QTableWidget(0, len(STATS_COLUMNS))
+        self.stats_table.setHorizontalHeaderLabels([title for _, title, _ in STATS_COLUMNS])
+        self.stats_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.stats_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.stats_table.verticalHeader().setVisible(False)
+        self.stats_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.stats_table.horizontalHeader().setStretchLastSection(True)
+        stats_layout.addWidget(self.stats_table)
+        layout.addWidget(stats_group, 3)
+
+        # 最近的慢查询
+        slow_group = QGroupBox("最近的慢查询")
+        slow_layout = QVBoxLayout(slow_group)
+        self.slow_text = QPlainTextEdit()
+        self.slow_text.setReadOnly(True)
+        self.slow_text.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.slow_text.setStyleSheet("font-family: Consolas, monospace;")
+        slow_layout.addWidget(self.slow_text)
+        layout.addWidget(slow_group, 2)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        btn_close = QPushButton("关闭")
+        btn_close.clicked.connect(self.accept)
+        button_layout.addWidget(btn_close)
+        layout.addLayout(button_layout)
+
+    def on_enable_toggled(self, checked: bool):
+        """启用或停用性能分析"""
+        self.profiler.enabled = checked
+        self.refresh()
+
+    def on_threshold_changed(self, value: int):
+        """修改慢查询阈值"""
+        self.profiler.slow_threshold_ms = value
+
+    def reset(self):
+        """清空统计"""
+        self.profiler.reset()
+        self.refresh()
+
+    def refresh(self):
+        """刷新统计表和慢查询列表"""
+        stats = self.profiler.stats()
+        if not self.profiler.enabled:
+            self.hint_label.setText("性能分析未启用，勾选后开始记录查询耗时")
+        elif not stats:
+            self.hint_label.setText("暂无记录，切换日期或筛选后查看")
+        else:
+            self.hint_label.setText("DataFrame 耗时包含构建结果、类型转换及读取列式缓存的时间")
+
+        self.stats_table.setRowCount(len(stats))
+        for row, item in enumerate(stats):
+            for col, (key, _, fmt) in enumerate(STATS_COLUMNS):
+                cell = QTableWidgetItem(fmt.format(item[key]))
+                if col > 0:
+                    cell.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.stats_table.setItem(row, col, cell)
+
+        slow_queries = self.profiler.slow_queries()
+        last_slow = slow_queries[-1] if slow_queries else None
+        if last_slow is not self._last_slow:
+            self._last_slow = last_slow
+            self.slow_text.setPlainText(self._format_slow_queries(slow_queries))
+
+    @staticmethod
+    def _format_slow_queries(slow_queries) -> str:
+        """慢查询列表（最新的在前）"""
+        lines = []
+        for entry in reversed(slow_queries):
+            lines.append(
+                f"[{entry['time']}] {entry['method']}  {entry['total_ms']:.1f} ms"
+                f"（SQLite {entry['sqlite_ms']:.1f} ms，DataFrame {entry['frame_ms']:.1f} ms），{entry['rows']} 行"
+            )
+            for statement in entry['statements']:
+                lines.append(f"    {statement['sql']}")
+                lines.append(f"    参数: {statement['params']}")
+                lines.extend(f"      {detail}" for detail in statement['plan'])
+            lines.append("")
+        return "\n".join(lines)
+
+    def done(self, result: int):
+        """关闭时停止刷新"""
+        self.timer.stop()
+        super().done(result)
@@ -0,0 +1,256 @@
+"""
+统计信息对话框
+所有数据来自导入时生成的每日汇总和板块汇总，不扫描 stock_daily
+"""
+import logging
+import numpy as np
+import pandas as pd
+from PyQt5.QtWidgets import (
+    QDialog, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QComboBox,
+    QPushButton, QTabWidget, QTableWidget, QTableWidgetItem, QSpinBox,
+    QGroupBox, QHeaderView, QAbstractItemView
+)
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor
+
+from ui.column_formatters import format_money_array
+
+
+# 板块统计表的列：(字段, 标题, 格式)
+SECTOR_COLUMNS = [
+    ('sector', '板块', 'text'),
+    ('stock_count', '股票数', 'int'),
+    ('total_main_net', '主力净额', 'money'),
+    ('positive_main_count', '净流入数', 'int'),
+    ('up_count', '上涨数', 'int'),
+    ('down_count', '下跌数', 'int'),
+    ('breadth', '上涨占比', 'percent'),
+    ('avg_price_change', '平均涨幅', 'percent'),
+    ('avg_turnover', '平均换手率', 'percent'),
+    ('total_volume', '成交额', 'money'),
+]
+
+# 趋势表的列
+TREND_COLUMNS = [
+    ('trade_date', '交易日期', 'text'),
+    ('total_count', '股票数', 'int'),
+    ('total_main_net', '主力净额', 'money'),
+    ('positive_main_count', '净流入数', 'int'),
+    ('up_count', '上涨数', 'int'),
+    ('down_count', '下跌数', 'int'),
+    ('breadth', '上涨占比', 'percent'),
+    ('avg_price_change', '平均涨幅', 'percent'),
+    ('avg_turnover', '平均换手率', 'percent'),
+    ('total_volume', '成交额', 'money'),
+]
+
+
+class SortableItem(QTableWidgetItem):
+    """按原始数值排序的表格项"""
+
+    def __init__(self, text: str, sort_value):
+        super().__init__(text)
+        self.sort_value = sort_value
+
+    def __lt__(self, other):
+        if isinstance(other, SortableItem):
+            return self.sort_value < other.sort_value
+        return super().__lt__(other)
+
+
+class StatisticsDialog(QDialog):
+    """统计信息对话框"""
+
+    def __init__(self, db_manager, trade_date: str = None, parent=None):
+        """
+        初始化统计信息对话框
+
+        Args:
+            db_manager: 数据库管理器
+            trade_date: 默认显示的交易日期（None表示最近交易日）
+            parent: 父窗口
+        """
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.init_ui()
+        self.load_dates(trade_date)
+
+    def init_ui(self):
+        """初始化UI"""
+        self.setWindowTitle("统计信息")
+        self.setMinimumSize(1000, 650)
+
+        layout = QVBoxLayout(self)
+
+        # 顶部：日期选择
+        toolbar = QHBoxLayout()
+        toolbar.addWidget(QLabel("交易日期:"))
+        self.date_combo = QComboBox()
+        self.date_combo.setMinimumWidth(120)
+        self.date_combo.currentIndexChanged.connect(self.load_date_statistics)
+        toolbar.addWidget(self.date_combo)
+        toolbar.addStretch()
+        self.days_label = QLabel("")
+        toolbar.addWidget(self.days_label)
+        layout.addLayout(toolbar)
+
+        # 当日汇总
+        summary_box = QGroupBox("当日汇总")
+        summary_layout = QGridLayout(summary_box)
+        self.summary_labels = {}
+        summary_fields = [
+            ('total_count', '总股票数'), ('positive_main_count', '主力净流入股票数'),
+            ('negative_main_count', '主力净流出股票数'), ('positive_volume_count', '成交额增长股票数'),
+            ('up_count', '上涨股票数'), ('down_count', '下跌股票数'),
+            ('total_main_net', '主力净额合计'), ('avg_turnover', '平均换手率'),
+        ]
+        for idx, (key, title) in enumerate(summary_fields):
+            value_label = QLabel("-")
+            value_label.setStyleSheet("font-weight: bold;")
+            summary_layout.addWidget(QLabel(f"{title}:"), idx // 4, (idx % 4) * 2)
+            summary_layout.addWidget(value_label, idx // 4, (idx % 4) * 2 + 1)
+            self.summary_labels[key] = value_label
+        layout.addWidget(summary_box)
+
+        # 板块统计 / 近期趋势
+        self.tabs = QTabWidget()
+
+        self.sector_table = self._create_table(SECTOR_COLUMNS)
+        self.tabs.addTab(self.sector_table, "板块统计")
+
+        trend_widget = QWidget()
+        trend_layout = QVBoxLayout(trend_widget)
+        trend_layout.setContentsMargins(0, 0, 0, 0)
+        trend_toolbar = QHBoxLayout()
+        trend_toolbar.addWidget(QLabel("板块:"))
+        self.trend_sector_combo = QComboBox()
+        self.trend_sector_combo.setMinimumWidth(150)
+        self.trend_sector_combo.currentIndexChanged.connect(self.load_trend)
+        trend_toolbar.addWidget(self.trend_sector_combo)
+        trend_toolbar.addWidget(QLabel("交易日数:"))
+        self.days_spin = QSpinBox()
+        self.days_spin.setRange(2, 1000)
+        self.days_spin.setValue(30)
+        self.days_spin.valueChanged.connect(self.load_trend)
+        trend_toolbar.addWidget(self.days_spin)
+        trend_toolbar.addStretch()
+        trend_layout.addLayout(trend_toolbar)
+        self.trend_table = self._create_table(TREND_COLUMNS)
+        trend_layout.addWidget(self.trend_table)
+        self.tabs.addTab(trend_widget, "近期趋势")
+
+        layout.addWidget(self.tabs)
+
+        # 关闭按钮
+        btn_close = QPushButton("关闭")
+        btn_close.clicked.connect(self.close)
+        layout.addWidget(btn_close)
+
+    @staticmethod
+    def _create_table(columns) -> QTableWidget:
+        """创建只读表格"""
+        table = QTableWidget()
+        table.setColumnCount(len(columns))
+        table.setHorizontalHeaderLabels([title for _, title, _ in columns])
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setAlternatingRowColors(True)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.verticalHeader().setVisible(False)
+        # 默认保持查询返回的顺序，点击表头后再排序
+        table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        return table
+
+    def load_dates(self, trade_date: str = None):
+        """加载交易日期和板块列表"""
+        dates = self.db_manager.get_all_dates()
+        self.days_label.setText(f"数据库中共有 {len(dates)} 个交易日的数据")
+
+        self.trend_sector_combo.blockSignals(True)
+        self.trend_sector_combo.clear()
+        self.trend_sector_combo.addItem("全部", None)
+        for sector in self.db_manager.get_all_sectors():
+            self.trend_sector_combo.addItem(sector, sector)
+        self.trend_sector_combo.blockSignals(False)
+
+        self.date_combo.blockSignals(True)
+        self.date_combo.clear()
+        for date in dates:
+            self.date_combo.addItem(date, date)
+        if trade_date and trade_date in dates:
+            self.date_combo.setCurrentIndex(dates.index(trade_date))
+        self.date_combo.blockSignals(False)
+
+        self.load_date_statistics()
+        self.load_trend()
+
+    def load_date_statistics(self):
+        """加载选中日期的汇总和板块统计"""
+        trade_date = self.date_combo.currentData()
+        if not trade_date:
+            return
+
+        try:
+            stats = self.db_manager.get_statistics(trade_date)
+            for key, label in self.summary_labels.items():
+                value = stats.get(key, 0)
+                if key == 'total_main_net':
+                    label.setText(format_money_array(np.array([value], dtype=float))[0])
+                elif key == 'avg_turnover':
+                    label.setText(f"{value}%")
+                else:
+                    label.setText(str(value))
+
+            sector_df = self.db_manager.get_sector_statistics(trade_date)
+            sector_df['breadth'] = sector_df['up_count'] / sector_df['stock_count'] * 100
+            self._fill_table(self.sector_table, SECTOR_COLUMNS, sector_df)
+        except Exception as e:
+            logging.error(f"加载统计信息失败: {str(e)}")
+
+    def load_trend(self):
+        """加载近期趋势"""
+        try:
+            trend_df = self.db_manager.get_statistics_trend(
+                self.days_spin.value(), sector=self.trend_sector_combo.currentData()
+            )
+            trend_df['breadth'] = trend_df['up_count'] / trend_df['total_count'] * 100
+            # 最近的日期显示在最上面
+            self._fill_table(self.trend_table, TREND_COLUMNS, trend_df.iloc[::-1])
+        except Exception as e:
+            logging.error(f"加载统计趋势失败: {str(e)}")
+
+    @staticmethod
+    def _fill_table(table: QTableWidget, columns, df):
+        """用DataFrame填充表格（汇总数据行数很少，逐格创建即可）"""
+        table.setSortingEnabled(False)
+        table.setRowCount(len(df))
+
+        for col_idx, (key, _, kind) in enumerate(columns):
+            values = df[key].to_numpy()
+            if kind == 'money':
+                numbers = pd.to_numeric(df[key], errors='coerce').to_numpy(dtype=float)
+                texts = np.full(len(values), "", dtype=object)
+                valid = ~np.isnan(numbers)
+                texts[valid] = format_money_array(numbers[valid])
+            elif kind == 'percent':
+                texts = ["" if v is None or v != v else f"{v:.2f}%" for v in values.tolist()]
+            elif kind == 'int':
+                texts = [str(int(v)) for v in values.tolist()]
+            else:
+                texts = [str(v) for v in values.tolist()]
+
+            for row_idx, (text, value) in enumerate(zip(texts, values.tolist())):
+                if kind == 'text':
+                    item = QTableWidgetItem(text)
+                else:
+                    sort_value = value if value is not None and value == value else float('-inf')
+                    item = SortableItem(text, sort_value)
+                    if kind == 'money' and key == 'total_main_net' and sort_value != float('-inf'):
+                        if value > 0:
+                            item.setForeground(QColor(220, 53, 69))  # 红色（流入）
+                        elif value < 0:
+                            item.setForeground(QColor(40, 167, 69))  # 绿色（流出）
+                item.setTextAlignment(Qt.AlignCenter)
+                table.setItem(row_idx, col_idx, item)
+
+        table.setSortingEnabled(True)
@@ -0,0 +1,164 @@
+"""
+单只股票历史对话框
+数据来自按 (股票代码, 交易日期) 聚簇的股票历史表，一次读取全部历史后在内存中按区间截取
+"""
+import time
+import logging
+import numpy as np
+import pandas as pd
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QComboBox,
+    QPushButton, QGroupBox
+)
+
+import config
+from database.db_manager import HISTORY_COLUMNS
+from ui.data_table_view import DataTableView
+from ui.column_formatters import format_money_array
+
+
+# 历史表格的显示列：主表格中属于历史指标的列
+HISTORY_DISPLAY_COLUMNS = [
+    col for col in config.DISPLAY_COLUMNS
+    if col['key'] in ['trade_date'] + HISTORY_COLUMNS
+]
+
+# 区间选项：(标题, 交易日数)，None 表示全部
+RANGE_OPTIONS = [
+    ('全部', None),
+    ('近2年', 500),
+    ('近1年', 250),
+    ('近半年', 120),
+    ('近3个月', 60),
+    ('近1个月', 20),
+]
+
+
+class StockHistoryDialog(QDialog):
+    """单只股票历史对话框"""
+
+    def __init__(self, db_manager, stock_code: str, stock_name: str = None, parent=None):
+        """
+        初始化股票历史对话框
+
+        Args:
+            db_manager: 数据库管理器
+            stock_code: 股票代码
+            stock_name: 股票名称（仅用于标题）
+            parent: 父窗口
+        """
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.stock_code = stock_code
+        self.stock_name = stock_name or ""
+        self.history = None
+        self.init_ui()
+        self.load_history()
+
+    def init_ui(self):
+        """初始化UI"""
+        self.setWindowTitle(f"历史数据 - {self.stock_code} {self.stock_name}")
+        self.setMinimumSize(1100, 650)
+
+        layout = QVBoxLayout(self)
+
+        # 顶部：区间选择
+        toolbar = QHBoxLayout()
+        toolbar.addWidget(QLabel("区间:"))
+        self.range_combo = QComboBox()
+        for title, days in RANGE_OPTIONS:
+            self.range_combo.addItem(title, days)
+        self.range_combo.currentIndexChanged.connect(self.show_range)
+        toolbar.addWidget(self.range_combo)
+        toolbar.addStretch()
+        self.load_label = QLabel("")
+        toolbar.addWidget(self.load_label)
+        layout.addLayout(toolbar)
+
+        # 区间汇总
+        summary_box = QGroupBox("区间汇总")
+        summary_layout = QGridLayout(summary_box)
+        self.summary_labels = {}
+        summary_fields = [
+            ('days', '交易日数'), ('date_range', '日期区间'),
+            ('price_change', '区间涨跌'), ('avg_turnover', '平均换手率'),
+            ('total_main_net', '主力净额合计'), ('inflow_days', '主力净流入天数'),
+            ('max_price', '最高价'), ('min_price', '最低价'),
+        ]
+        for idx, (key, title) in enumerate(summary_fields):
+            value_label = QLabel("-")
+            value_label.setStyleSheet("font-weight: bold;")
+            summary_layout.addWidget(QLabel(f"{title}:"), idx // 4, (idx % 4) * 2)
+            summary_layout.addWidget(value_label, idx // 4, (idx % 4) * 2 + 1)
+            self.summary_labels[key] = value_label
+        layout.addWidget(summary_box)
+
+        # 历史数据表格（最近的日期在最上面）
+        self.table_view = DataTableView(HISTORY_DISPLAY_COLUMNS)
+        layout.addWidget(self.table_view)
+
+        # 关闭按钮
+        btn_close = QPushButton("关闭")
+        btn_close.clicked.connect(self.close)
+        layout.addWidget(btn_close)
+
+    def load_history(self):
+        """读取该股票的全部历史"""
+        try:
+            start = time.perf_counter()
+            self.history = self.db_manager.get_stock_history(self.stock_code)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.load_label.setText(
+                f"共 {len(self.history['trade_date'])} 个交易日，读取耗时 {elapsed_ms:.1f} ms"
+            )
+            logging.info(f"读取股票历史: {self.stock_code}, {len(self.history['trade_date'])} 条, {elapsed_ms:.1f} ms")
+        except Exception as e:
+            logging.error(f"读取股票历史失败: {str(e)}")
+            self.load_label.setText(f"读取失败: {str(e)}")
+            return
+
+        self.show_range()
+
+    def show_range(self):
+        """按选中的区间显示汇总和表格"""
+        if self.history is None:
+            return
+
+        days = self.range_combo.currentData()
+        history = {
+            key: values if days is None else values[-days:]
+            for key, values in self.history.items()
+        }
+        self.update_summary(history)
+
+        df = pd.DataFrame(history).iloc[::-1].reset_index(drop=True)
+        self.table_view.set_data(df)
+
+    def update_summary(self, history: dict):
+        """计算区间汇总"""
+        dates = history['trade_date']
+        labels = self.summary_labels
+        for label in labels.values():
+            label.setText("-")
+
+        labels['days'].setText(str(len(dates)))
+        if len(dates) == 0:
+            return
+        labels['date_range'].setText(f"{dates[0]} ~ {dates[-1]}")
+
+        prices = history['current_price']
+        valid_prices = prices[~np.isnan(prices)]
+        if len(valid_prices) > 0:
+            labels['max_price'].setText(f"{valid_prices.max():.2f}")
+            labels['min_price'].setText(f"{valid_prices.min():.2f}")
+            if len(valid_prices) > 1 and valid_prices[0] != 0:
+                labels['price_change'].setText(f"{(valid_prices[-1] / valid_prices[0] - 1) * 100:.2f}%")
+
+        main_net = history['main_net_amount']
+        if not np.isnan(main_net).all():
+            labels['total_main_net'].setText(format_money_array(np.array([np.nansum(main_net)]))[0])
+            labels['inflow_days'].setText(str(int((main_net > 0).sum())))
+
+        turnover = history['turnover_rate']
+        if not np.isnan(turnover).all():
+            labels['avg_turnover'].setText(f"{np.nanmean(turnover):.2f}%")
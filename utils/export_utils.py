@@ -0,0 +1,251 @@
+"""
+数据导出工具模块
+按块写入导出文件，每块写完即释放，内存占用与导出的总行数无关。
+
+支持格式:
+    xlsx     openpyxl 只写模式，超过单表行数上限时自动新建工作表
+    csv      UTF-8（带BOM，Excel可直接打开）
+    parquet  需要安装 pyarrow
+"""
+import os
+import logging
+from typing import Dict, List
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet 为可选格式
+    pa = None
+    pq = None
+
+
+# Excel 单个工作表的最大行数（含表头）
+XLSX_MAX_ROWS = 1048576
+
+# 格式 -> (显示名称, 扩展名)
+EXPORT_FORMATS = {
+    'xlsx': ('Excel文件', '.xlsx'),
+    'csv': ('CSV文件', '.csv'),
+    'parquet': ('Parquet文件', '.parquet'),
+}
+
+
+def parquet_available() -> bool:
+    """是否可以导出Parquet（已安装 pyarrow）"""
+    return pa is not None
+
+
+class ExportWriter:
+    """
+    分块导出写入器基类
+
+    先写入同目录下的临时文件，finish() 时再替换为目标文件；
+    abort() 删除临时文件，取消或失败时不会留下不完整的导出文件。
+    """
+
+    def __init__(self, file_path: str, columns: List[str], headers: List[str] = None):
+        """
+        Args:
+            file_path: 导出文件路径
+            columns: 导出的列
+            headers: 表头（默认使用列名）
+        """
+        self.file_path = file_path
+        self.temp_path = f"{file_path}.part"
+        self.columns = columns
+        self.headers = headers or list(columns)
+        self.rows_written = 0
+
+    def write(self, chunk: pd.DataFrame):
+        """写入一块数据"""
+        self._write(chunk[self.columns])
+        self.rows_written += len(chunk)
+
+    def _write(self, chunk: pd.DataFrame):
+        raise NotImplementedError
+
+    def _close(self):
+        """关闭临时文件"""
+        raise NotImplementedError
+
+    def finish(self):
+        """完成导出，临时文件替换为目标文件"""
+        self._close()
+        os.replace(self.temp_path, self.file_path)
+        logging.info(f"导出完成: {self.file_path}, {self.rows_written} 行")
+
+    def abort(self):
+        """放弃导出，删除临时文件"""
+        try:
+            self._close()
+        except Exception as e:
+            logging.debug(f"关闭导出文件失败: {str(e)}")
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
+
+
+class CsvExportWriter(ExportWriter):
+    """CSV导出（UTF-8带BOM）"""
+
+    def __init__(self, file_path: str, columns: List[str], headers: List[str] = None):
+        super().__init__(file_path, columns, headers)
+        self._file = open(self.temp_path, 'w', encoding='utf-8-sig', newline='')
+        self._header_written = False
+
+    def _write(self, chunk: pd.DataFrame):
+        chunk.to_csv(
+            self._file, index=False,
+            header=self.headers if not self._header_written else False
+        )
+        self._header_written = True
+
+    def _close(self):
+        if not self._file.closed:
+            if not self._header_written:
+                # 没有数据时也写出表头
+                pd.DataFrame(columns=self.headers).to_csv(self._file, index=False)
+            self._file.close()
+
+
+class XlsxExportWriter(ExportWriter):
+    """
+    Excel导出（openpyxl 只写模式）
+
+    只写模式下每行写入后即序列化到临时文件，不在内存中保留单元格对象；
+    单表写满 XLSX_MAX_ROWS 行后自动新建工作表（数据、数据_2、……）。
+    """
+
+    def __init__(self, file_path: str, columns: List[str], headers: List[str] = None,
+                 sheet_title: str = "数据", max_rows: int = XLSX_MAX_ROWS):
+        super().__init__(file_path, columns, headers)
+        from openpyxl import Workbook
+
+        self._workbook = Workbook(write_only=True)
+        self._sheet_title = sheet_title
+        self._max_data_rows = max_rows - 1  # 每个工作表第一行是表头
+        self._sheet = None
+        self._sheet_rows = 0
+        self._closed = False
+        self._new_sheet()
+
+    def _new_sheet(self):
+        """新建工作表并写入表头"""
+        sheet_count = len(self._workbook.worksheets)
+        title = self._sheet_title if sheet_count == 0 else f"{self._sheet_title}_{sheet_count + 1}"
+        self._sheet = self._workbook.create_sheet(title)
+        self._sheet.append(self.headers)
+        self._sheet_rows = 0
+
+    def _write(self, chunk: pd.DataFrame):
+        # 缺失值写为空单元格（openpyxl 不接受 NaN）
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            if self._sheet_rows >= self._max_data_rows:
+                self._new_sheet()
+            self._sheet.append(row)
+            self._sheet_rows += 1
+
+    def _close(self):
+        if not self._closed:
+            self._closed = True
+            self._workbook.save(self.temp_path)
+
+
+class ParquetExportWriter(ExportWriter):
+    """
+    Parquet导出
+
+    表结构由第一块数据确定（浮点列float64，整数列int64，其余按文本），
+    之后的每块都按同一结构写入一个行组。
+    """
+
+    def __init__(self, file_path: str, columns: List[str], headers: List[str] = None):
+        if pa is None:
+            raise RuntimeError("导出Parquet需要安装 pyarrow")
+        super().__init__(file_path, columns, headers)
+        self._writer = None
+        self._schema = None
+        self._closed = False
+
+    def _build_schema(self, chunk: pd.DataFrame):
+        fields = []
+        for column, header in zip(self.columns, self.headers):
+            dtype = chunk[column].dtype
+            if pd.api.types.is_float_dtype(dtype):
+                arrow_type = pa.float64()
+            elif pd.api.types.is_integer_dtype(dtype):
+                arrow_type = pa.int64()
+            else:
+                arrow_type = pa.string()
+            fields.append(pa.field(header, arrow_type))
+        return pa.schema(fields)
+
+    def _write(self, chunk: pd.DataFrame):
+        if self._writer is None:
+            self._schema = self._build_schema(chunk)
+            self._writer = pq.ParquetWriter(self.temp_path, self._schema)
+
+        arrays = []
+        for column, field in zip(self.columns, self._schema):
+            values = chunk[column]
+            if pa.types.is_string(field.type):
+                values = values.astype(object).where(values.notna(), None)
+                values = values.map(lambda v: v if v is None else str(v))
+            arrays.append(pa.array(values, type=field.type, from_pandas=True))
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def _close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is None:
+            # 没有数据：按全部为文本列写出空文件
+            self._schema = pa.schema([pa.field(header, pa.string()) for header in self.headers])
+            self._writer = pq.ParquetWriter(self.temp_path, self._schema)
+        self._writer.close()
+
+
+_WRITERS = {
+    'xlsx': XlsxExportWriter,
+    'csv': CsvExportWriter,
+    'parquet': ParquetExportWriter,
+}
+
+
+def create_export_writer(file_path: str, export_format: str, columns: List[str],
+                         headers: List[str] = None) -> ExportWriter:
+    """
+    创建导出写入器
+
+    Args:
+        file_path: 导出文件路径
+        export_format: 导出格式（EXPORT_FORMATS 的键）
+        columns: 导出的列
+        headers: 表头（默认使用列名）
+
+    Returns:
+        写入器
+    """
+    writer_class = _WRITERS.get(export_format)
+    if writer_class is None:
+        raise ValueError(f"不支持的导出格式: {export_format}")
+    return writer_class(file_path, columns, headers)
+
+
+def column_headers(columns: List[str], display_columns: List[Dict]) -> List[str]:
+    """
+    列名转换为中文表头（没有显示名称的列保留列名）
+
+    Args:
+        columns: 列名
+        display_columns: 显示列定义（config.DISPLAY_COLUMNS）
+
+    Returns:
+        表头列表
+    """
+    names = {col['key']: col['name'] for col in display_columns}
+    return [names.get(column, column) for column in columns]
@@ -0,0 +1,55 @@
+"""
+文件工具模块
+"""
+import os
+import hashlib
+from typing import Dict
+
+
+def normalize_path(file_path: str) -> str:
+    """
+    规范化文件路径（绝对路径，Windows下忽略大小写）
+    
+    Args:
+        file_path: 文件路径
+        
+    Returns:
+        规范化后的路径
+    """
+    return os.path.normcase(os.path.abspath(file_path))
+
+
+def get_file_signature(file_path: str) -> Dict:
+    """
+    获取文件签名（路径、大小、修改时间），只读取文件元数据
+    
+    Args:
+        file_path: 文件路径
+        
+    Returns:
+        {'file_path': 规范化路径, 'file_size': 字节数, 'file_mtime': 修改时间戳}
+    """
+    stat = os.stat(file_path)
+    return {
+        'file_path': normalize_path(file_path),
+        'file_size': stat.st_size,
+        'file_mtime': stat.st_mtime,
+    }
+
+
+def compute_file_hash(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    计算文件内容的SHA-1哈希
+    
+    Args:
+        file_path: 文件路径
+        chunk_size: 每次读取的字节数
+        
+    Returns:
+        十六进制哈希字符串
+    """
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
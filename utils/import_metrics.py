@@ -0,0 +1,119 @@
+"""
+导入指标工具模块
+汇总单个文件导入各阶段的耗时、吞吐、读取字节数和解析内存增量，并支持导出为JSON用于回归对比。
+
+阶段:
+    read       读取工作簿（流式读取或 pd.read_excel）
+    normalize  列名映射与组装DataFrame
+    clean      数据清洗（_clean_data）
+    convert    转换为写入参数（insert_batch）
+    insert     executemany 写入 stock_daily
+    derived    更新交易日历、板块、汇总等派生数据
+    commit     提交事务
+    cache      作废列式缓存分区
+"""
+import json
+import time
+from typing import Dict, List, Optional
+
+
+# (阶段键, 显示名称)，顺序即导入流程的顺序
+IMPORT_STAGES = [
+    ('read', '读取'),
+    ('normalize', '标准化'),
+    ('clean', '清洗'),
+    ('convert', '转换'),
+    ('insert', '写入'),
+    ('derived', '派生数据'),
+    ('commit', '提交'),
+    ('cache', '缓存'),
+]
+
+# 解析阶段（在解析进程中执行，并行导入时与写入重叠）
+PARSE_STAGES = ('read', 'normalize', 'clean')
+
+
+def build_file_metrics(file_name: str, trade_date: str, rows: int,
+                       parse_stats: Dict, insert_stats: Dict) -> Dict:
+    """
+    汇总单个文件的导入指标
+
+    Args:
+        file_name: 文件名
+        trade_date: 交易日期
+        rows: 写入的记录数
+        parse_stats: ExcelParser.parse_excel 回填的统计字典
+        insert_stats: DatabaseManager.insert_batch 回填的各阶段耗时
+
+    Returns:
+        指标字典（stages 中为各阶段秒数，total_seconds 为各阶段之和）
+    """
+    stage_seconds = dict(parse_stats.get('stage_seconds') or {})
+    stage_seconds.update(insert_stats or {})
+    stages = {key: round(stage_seconds[key], 4) for key, _ in IMPORT_STAGES if key in stage_seconds}
+    total_seconds = sum(stage_seconds.get(key, 0.0) for key, _ in IMPORT_STAGES)
+
+    # 解析前后解析进程的常驻内存之差（进程峰值是整个生命周期的值，不能反映单个文件）
+    rss_delta = parse_stats.get('rss_delta_mb')
+
+    return {
+        'file_name': file_name,
+        'trade_date': trade_date,
+        'rows': rows,
+        'file_bytes': parse_stats.get('file_bytes'),
+        'stages': stages,
+        'total_seconds': round(total_seconds, 4),
+        'rows_per_second': round(rows / total_seconds, 1) if total_seconds > 0 else None,
+        'rss_delta_mb': round(rss_delta, 1) if rss_delta is not None else None,
+        'unparsable_cells': parse_stats.get('unparsable_cells', 0),
+    }
+
+
+def format_metrics(metrics: Dict) -> str:
+    """
+    格式化为单行摘要（用于导入日志）
+
+    Args:
+        metrics: build_file_metrics 返回的指标
+
+    Returns:
+        如 "读取 0.52s，清洗 0.08s，…，共 0.91s，5000 行/秒，解析内存增量 12 MB"
+    """
+    parts = [
+        f"{title} {metrics['stages'][key]:.2f}s"
+        for key, title in IMPORT_STAGES if key in metrics['stages']
+    ]
+    parts.append(f"共 {metrics['total_seconds']:.2f}s")
+    if metrics.get('rows_per_second') is not None:
+        parts.append(f"{metrics['rows_per_second']:.0f} 行/秒")
+    if metrics.get('rss_delta_mb') is not None:
+        parts.append(f"解析内存增量 {metrics['rss_delta_mb']:.0f} MB")
+    return "，".join(parts)
+
+
+def dump_metrics_json(metrics_list: List[Dict], file_path: str, extra: Optional[Dict] = None):
+    """
+    导出一次批量导入的全部文件指标
+
+    Args:
+        metrics_list: 各文件的指标
+        file_path: JSON文件路径
+        extra: 附加的整体信息（如进程数、是否流式读取）
+    """
+    totals = {key: 0.0 for key, _ in IMPORT_STAGES}
+    for metrics in metrics_list:
+        for key, seconds in metrics['stages'].items():
+            totals[key] += seconds
+
+    document = {
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'file_count': len(metrics_list),
+        'rows': sum(metrics['rows'] for metrics in metrics_list),
+        'stage_totals': {key: round(seconds, 4) for key, seconds in totals.items()},
+        'files': metrics_list,
+    }
+    if extra:
+        document.update(extra)
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
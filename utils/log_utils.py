@@ -0,0 +1,256 @@
+"""
+日志工具模块
+"""
+import os
+import re
+import sys
+import queue
+import atexit
+import logging
+import logging.handlers
+import multiprocessing
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listeners: List[logging.handlers.QueueListener] = []
+_handlers: List[logging.Handler] = []
+_worker_queue = None
+
+
+def setup_logging(log_file: str, verbose: bool = False, max_bytes: int = 10 * 1024 * 1024,
+                  backup_count: int = 5, stream=None) -> logging.Handler:
+    """
+    配置异步日志：调用方只把日志记录放入内存队列，由后台监听线程写入文件和控制台
+
+    文件按大小轮转（log_file、log_file.1、……）。关闭详细日志时级别为INFO，
+    解析过程中逐列、逐行的 DEBUG 日志不会被格式化，也不会进入队列。
+
+    Args:
+        log_file: 日志文件路径
+        verbose: 是否输出 DEBUG 级别的详细日志
+        max_bytes: 单个日志文件的最大字节数
+        backup_count: 保留的轮转文件数
+        stream: 控制台输出流（默认 sys.stderr）
+
+    Returns:
+        安装到根日志器上的队列处理器
+    """
+    shutdown_logging()
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+    )
+    stream_handler = logging.StreamHandler(stream or sys.stderr)
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+        _handlers.append(handler)
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *_handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(logging.DEBUG if verbose else logging.INFO)
+
+    atexit.register(shutdown_logging)
+    return queue_handler
+
+
+def shutdown_logging():
+    """停止监听线程（写完队列中剩余的日志）并关闭日志文件"""
+    global _worker_queue
+    while _listeners:
+        _listeners.pop().stop()
+    while _handlers:
+        _handlers.pop().close()
+    _worker_queue = None
+
+
+def worker_logging_args() -> tuple:
+    """
+    子进程的日志配置参数，作为进程池的 initargs 传给 init_worker_logging
+
+    子进程的日志记录经由进程间队列送回主进程，由同一组处理器写入同一个日志文件；
+    未调用 setup_logging 时返回的队列为None，子进程沿用默认的日志配置。
+
+    Returns:
+        (进程间队列或None, 日志级别)
+    """
+    global _worker_queue
+    if not _handlers:
+        return None, logging.getLogger().level
+
+    if _worker_queue is None:
+        _worker_queue = multiprocessing.Queue()
+        listener = logging.handlers.QueueListener(_worker_queue, *_handlers, respect_handler_level=True)
+        listener.start()
+        _listeners.append(listener)
+    return _worker_queue, logging.getLogger().level
+
+
+def init_worker_logging(log_queue, level: int):
+    """
+    进程池子进程的初始化函数：日志记录全部放入进程间队列
+
+    Args:
+        log_queue: worker_logging_args() 返回的队列（None 表示不修改日志配置）
+        level: 日志级别
+    """
+    if log_queue is None:
+        return
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+
+# 日志格式中的级别字段：'%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
+_LEVEL_PATTERN = re.compile(r' - (DEBUG|INFO|WARNING|ERROR|CRITICAL) - ')
+
+
+def parse_log_level(line: str) -> Optional[str]:
+    """
+    解析日志行的级别
+
+    Args:
+        line: 日志行
+
+    Returns:
+        级别名称，不是日志记录的首行（如异常堆栈的后续行）时返回None
+    """
+    match = _LEVEL_PATTERN.search(line)
+    return match.group(1) if match else None
+
+
+class LogTailer:
+    """
+    日志文件跟随读取
+
+    记录上次读到的位置，每次只读取新追加的字节；文件被轮转（路径指向新文件）
+    或被截断（大小小于已读位置）时从头读取新文件。
+    两次读取之间不保持文件打开，不影响写入方清空或轮转日志文件。
+    """
+
+    def __init__(self, file_path: str, initial_bytes: int = 256 * 1024):
+        """
+        Args:
+            file_path: 日志文件路径
+            initial_bytes: 首次读取时最多读取文件末尾的字节数（大日志不必从头读起）
+        """
+        self.file_path = file_path
+        self.initial_bytes = initial_bytes
+        self.offset = 0
+        self._identity = None  # (st_dev, st_ino)，用于识别轮转
+        self._partial = b''  # 末尾还没写完的半行
+
+    def reset(self):
+        """重置读取位置（下次按首次读取处理）"""
+        self.offset = 0
+        self._identity = None
+        self._partial = b''
+
+    def read_new_lines(self) -> Tuple[List[str], bool]:
+        """
+        读取新追加的完整行
+
+        Returns:
+            (新行列表, 是否从新文件重新开始读取)。返回True时调用方应丢弃之前读到的内容
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            restarted = self._identity is not None
+            self.reset()
+            return [], restarted
+
+        identity = (stat.st_dev, stat.st_ino)
+        restarted = False
+        skip_first_line = False
+        if self._identity is None:
+            # 首次读取：只读末尾部分，从前一个字节开始读，丢弃到第一个换行为止的残行
+            self.offset = max(0, stat.st_size - self.initial_bytes - 1)
+            skip_first_line = self.offset > 0
+        elif identity != self._identity or stat.st_size < self.offset:
+            # 文件被轮转或清空
+            self.offset = 0
+            self._partial = b''
+            restarted = True
+        self._identity = identity
+
+        if stat.st_size == self.offset:
+            return [], restarted
+
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(stat.st_size - self.offset)
+        self.offset += len(data)
+
+        chunks = (self._partial + data).split(b'\n')
+        self._partial = chunks.pop()
+        if skip_first_line and chunks:
+            chunks = chunks[1:]
+
+        lines = [chunk.rstrip(b'\r').decode('utf-8', errors='replace') for chunk in chunks]
+        return lines, restarted
+
+
+class LogBuffer:
+    """
+    定长的日志行缓冲区（最新的 max_lines 行），每行记录其级别
+
+    异常堆栈等没有级别字段的行沿用上一条日志记录的级别，按级别筛选时随记录一起显示。
+    """
+
+    def __init__(self, max_lines: int = 5000):
+        """
+        Args:
+            max_lines: 最多保留的行数
+        """
+        self.lines: Deque[Tuple[str, str]] = deque(maxlen=max_lines)
+        self._last_level = ''
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def clear(self):
+        """清空缓冲区"""
+        self.lines.clear()
+        self._last_level = ''
+
+    def extend(self, lines: List[str]) -> List[Tuple[str, str]]:
+        """
+        追加日志行
+
+        Args:
+            lines: 新的日志行
+
+        Returns:
+            追加的 (级别, 行) 列表
+        """
+        entries = []
+        for line in lines:
+            level = parse_log_level(line)
+            if level is None:
+                level = self._last_level
+            else:
+                self._last_level = level
+            entries.append((level, line))
+        self.lines.extend(entries)
+        return entries
+
+    def filtered(self, level: str = None) -> List[Tuple[str, str]]:
+        """获取指定级别的行（None 表示全部）"""
+        if level is None:
+            return list(self.lines)
+        return [entry for entry in self.lines if entry[0] == level]
@@ -0,0 +1,62 @@
+"""
+内存统计工具模块
+"""
+import os
+import sys
+import ctypes
+from typing import Optional
+
+
+def get_rss_mb() -> Optional[float]:
+    """
+    获取当前进程此刻的常驻内存（RSS）
+    
+    与 ru_maxrss / PeakWorkingSetSize 这类进程生命周期峰值不同，该值会随内存释放而下降，
+    可在某个操作前后各取一次计算该操作的内存增量。
+    
+    Returns:
+        常驻内存（MB），当前平台不支持时返回None
+    """
+    try:
+        if sys.platform == 'win32':
+            return _get_rss_windows()
+        
+        # Linux: /proc/self/statm 第二项为常驻页数
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def _get_rss_windows() -> Optional[float]:
+    """通过 GetProcessMemoryInfo 获取 Windows 进程当前的工作集"""
+    from ctypes import wintypes
+    
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+    
+    kernel32 = ctypes.WinDLL('kernel32')
+    psapi = ctypes.WinDLL('psapi')
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    psapi.GetProcessMemoryInfo.argtypes = [
+        wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD
+    ]
+    psapi.GetProcessMemoryInfo.restype = wintypes.BOOL
+    
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(PROCESS_MEMORY_COUNTERS)
+    if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+        return None
+    return counters.WorkingSetSize / (1024 * 1024)
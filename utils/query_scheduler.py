@@ -0,0 +1,204 @@
+"""
+查询调度模块
+在常驻线程池中执行数据库查询：新查询会取代进行中的旧查询，
+快速连续的筛选变化会被合并，过期结果直接丢弃
+"""
+import logging
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+
+# 筛选变化的合并等待时间（毫秒）
+DEFAULT_DEBOUNCE_MS = 300
+
+
+class _QuerySignals(QObject):
+    """查询任务信号（QRunnable本身不能发信号）"""
+    finished = pyqtSignal(int, object)  # (查询代号, 结果)
+    failed = pyqtSignal(int, str)  # (查询代号, 错误信息)
+
+
+class _QueryTask(QRunnable):
+    """
+    线程池中的查询任务
+    """
+
+    def __init__(self, scheduler, generation: int, task_func, args, kwargs):
+        """
+        Args:
+            scheduler: 所属调度器
+            generation: 查询代号
+            task_func: 查询函数
+            args, kwargs: 查询参数
+        """
+        super().__init__()
+        self.scheduler = scheduler
+        self.generation = generation
+        self.task_func = task_func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = scheduler._signals
+
+    def run(self):
+        """执行查询"""
+        if self.scheduler.is_stale(self.generation):
+            return
+
+        try:
+            with self.scheduler.db_manager.cancellable(lambda: self.scheduler.is_stale(self.generation)):
+                result = self.task_func(*self.args, **self.kwargs)
+        except Exception as e:
+            if self.scheduler.is_stale(self.generation):
+                logging.debug(f"查询 #{self.generation} 已被新查询取代: {str(e)}")
+                return
+            error_msg = f"任务执行失败: {str(e)}"
+            logging.error(error_msg)
+            self.signals.failed.emit(self.generation, error_msg)
+            return
+
+        self.signals.finished.emit(self.generation, result)
+
+
+class QueryScheduler(QObject):
+    """
+    查询调度器
+
+    每次提交查询都会生成新的查询代号，旧代号的查询通过数据库进度回调中断，
+    完成信号只会发出最新代号的结果。
+    """
+    # 信号定义
+    query_completed = pyqtSignal(object, object)  # (结果, 提交时的上下文)
+    query_failed = pyqtSignal(str)  # 错误信息
+    busy_changed = pyqtSignal(bool)  # 是否有查询正在等待或执行
+
+    def __init__(self, db_manager, debounce_ms: int = DEFAULT_DEBOUNCE_MS, parent=None):
+        """
+        初始化查询调度器
+
+        Args:
+            db_manager: 数据库管理器
+            debounce_ms: 合并筛选变化的等待时间（毫秒）
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.db_manager = db_manager
+
+        # 被取代的查询可能还在退出，留一个线程给新查询
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(2)
+        # 线程常驻不回收，数据库读连接按线程分配，可一直复用
+        self._pool.setExpiryTimeout(-1)
+
+        self._signals = _QuerySignals()
+        self._signals.finished.connect(self._on_finished)
+        self._signals.failed.connect(self._on_failed)
+
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._pending = None  # 等待合并期结束的查询 (代号, 函数, 参数, 关键字参数)
+        self._context = None  # 最新查询的上下文
+        self._busy = False
+        self._closed = False
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(debounce_ms)
+        self._debounce_timer.timeout.connect(self._submit_pending)
+
+    def is_stale(self, generation: int) -> bool:
+        """查询是否已被更新的查询取代（可在任意线程调用）"""
+        with self._lock:
+            return generation != self._generation or self._closed
+
+    def submit(self, task_func, *args, context=None, debounce: bool = False, **kwargs):
+        """
+        提交查询，取代所有进行中和等待中的查询
+
+        Args:
+            task_func: 查询函数
+            *args, **kwargs: 查询参数
+            context: 随结果一起返回的上下文（如筛选条件）
+            debounce: 是否等待合并期结束后再执行（用于快速连续的筛选变化）
+
+        Returns:
+            本次查询的代号
+        """
+        if self._closed:
+            return None
+
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+
+        self._context = context
+        self._pending = (generation, task_func, args, kwargs)
+        self._set_busy(True)
+
+        if debounce:
+            self._debounce_timer.start()
+        else:
+            self._debounce_timer.stop()
+            self._submit_pending()
+
+        return generation
+
+    def cancel(self):
+        """取消所有进行中和等待中的查询"""
+        with self._lock:
+            self._generation += 1
+        self._debounce_timer.stop()
+        self._pending = None
+        self._set_busy(False)
+
+    def shutdown(self, timeout_ms: int = 5000) -> bool:
+        """
+        停止调度器：中断进行中的查询并等待线程池退出
+
+        Args:
+            timeout_ms: 最长等待时间（毫秒）
+
+        Returns:
+            线程池是否在超时前全部退出
+        """
+        self.cancel()
+        with self._lock:
+            self._closed = True
+
+        finished = self._pool.waitForDone(timeout_ms)
+        if not finished:
+            logging.warning("查询线程未能在超时前退出")
+        return finished
+
+    def _submit_pending(self):
+        """把等待中的查询放入线程池"""
+        if self._pending is None:
+            return
+
+        generation, task_func, args, kwargs = self._pending
+        self._pending = None
+        if self.is_stale(generation):
+            return
+
+        self._pool.start(_QueryTask(self, generation, task_func, args, kwargs))
+
+    def _on_finished(self, generation: int, result):
+        """查询完成（在GUI线程中执行），只处理最新代号的结果"""
+        if self.is_stale(generation):
+            return
+
+        self._set_busy(False)
+        self.query_completed.emit(result, self._context)
+
+    def _on_failed(self, generation: int, error_msg: str):
+        """查询失败（在GUI线程中执行）"""
+        if self.is_stale(generation):
+            return
+
+        self._set_busy(False)
+        self.query_failed.emit(error_msg)
+
+    def _set_busy(self, busy: bool):
+        """更新忙碌状态"""
+        if busy != self._busy:
+            self._busy = busy
+            self.busy_changed.emit(busy)
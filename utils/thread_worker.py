@@ -1,8 +1,16 @@
 """
 多线程工具模块
 """
-from PyQt5.QtCore import QThread, pyqtSignal
+import os
+import time
 import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from utils.export_utils import create_export_writer
+from utils.import_metrics import build_file_metrics, format_metrics
+from utils.log_utils import worker_logging_args, init_worker_logging
 
 
 class WorkerThread(QThread):
@@ -41,13 +49,18 @@ class WorkerThread(QThread):
 class BatchImportWorker(QThread):
     """
     批量导入工作线程
+    
+    Excel解析交给进程池并行执行，本线程作为唯一的数据库写入者，
+    按交易日期顺序依次写入解析结果。
     """
     # 信号定义
-    progress_updated = pyqtSignal(int, int, str)  # (当前文件索引, 总文件数, 当前文件名)
+    progress_updated = pyqtSignal(int, int, str)  # (已解析或跳过的文件数, 总文件数, 刚解析完或跳过的文件名)
     file_imported = pyqtSignal(str, int, bool, str)  # (文件名, 记录数, 成功/失败, 消息)
     all_completed = pyqtSignal(int, int, int)  # (成功数, 失败数, 总记录数)
+    file_metrics = pyqtSignal(dict)  # 单个文件的导入指标（见 utils.import_metrics.build_file_metrics）
     
-    def __init__(self, file_paths, db_manager, excel_parser, column_mapping):
+    def __init__(self, file_paths, db_manager, excel_parser, column_mapping,
+                 max_workers=None, streaming=True, force=False):
         """
         初始化批量导入线程
         
@@ -56,74 +69,315 @@ class BatchImportWorker(QThread):
             db_manager: 数据库管理器
             excel_parser: Excel解析器
             column_mapping: 列名映射
+            max_workers: 并行解析的进程数（None表示按CPU核数自动选择，1表示串行解析）
+            streaming: 是否使用流式方式读取xlsx
+            force: 是否强制重新导入（忽略导入台账中未变化的文件）
         """
         super().__init__()
         self.file_paths = file_paths
         self.db_manager = db_manager
         self.excel_parser = excel_parser
         self.column_mapping = column_mapping
+        self.max_workers = max_workers
+        self.streaming = streaming
+        self.force = force
+        self.skipped_count = 0  # 因未变化而跳过的文件数
+        self.metrics = []  # 成功导入的各文件指标
+        self._signatures = {}  # 文件路径 -> 文件签名（写入导入台账）
         self._is_running = True
     
     def stop(self):
         """停止线程"""
         self._is_running = False
     
-    def run(self):
-        """执行批量导入"""
-        total_files = len(self.file_paths)
-        success_count = 0
-        fail_count = 0
-        total_records = 0
+    def _ordered_file_paths(self):
+        """按文件名中的交易日期排序，无法识别日期的文件排在最后"""
+        def sort_key(file_path):
+            trade_date = self.excel_parser.extract_date_from_filename(os.path.basename(file_path))
+            return (trade_date is None, trade_date or '')
         
-        for idx, file_path in enumerate(self.file_paths):
+        return sorted(self.file_paths, key=sort_key)
+    
+    def _resolve_workers(self, file_count):
+        """计算实际使用的解析进程数"""
+        workers = self.max_workers or os.cpu_count() or 1
+        return max(1, min(workers, file_count))
+    
+    def _iter_parsed(self, file_paths):
+        """
+        按顺序产出解析结果
+        
+        并行模式下最多同时提交 2 倍进程数的文件，避免解析结果堆积占用内存。
+        
+        Yields:
+            (文件路径, (DataFrame, 交易日期, 统计字典) 或 None, 异常或None)
+        """
+        workers = self._resolve_workers(len(file_paths))
+        
+        if workers == 1:
+            for file_path in file_paths:
+                if not self._is_running:
+                    return
+                try:
+                    parsed = self.excel_parser.parse_excel_with_stats(
+                        file_path, self.column_mapping, self.streaming
+                    )
+                    yield file_path, parsed, None
+                except Exception as e:
+                    yield file_path, None, e
+            return
+        
+        logging.info(f"使用 {workers} 个进程并行解析 {len(file_paths)} 个文件")
+        # 子进程的日志经进程间队列交给主进程的日志线程写入
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker_logging,
+            initargs=worker_logging_args()
+        )
+        pending = deque()
+        next_index = 0
+        try:
+            while next_index < len(file_paths) or pending:
+                # 补充提交，保持进程池满载
+                while next_index < len(file_paths) and len(pending) < workers * 2:
+                    file_path = file_paths[next_index]
+                    future = executor.submit(
+                        self.excel_parser.parse_excel_with_stats,
+                        file_path, self.column_mapping, self.streaming
+                    )
+                    pending.append((file_path, future))
+                    next_index += 1
+                
+                if not self._is_running:
+                    return
+                
+                file_path, future = pending.popleft()
+                try:
+                    yield file_path, future.result(), None
+                except Exception as e:
+                    yield file_path, None, e
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+    
+    def _filter_unchanged(self, file_paths, total_files):
+        """
+        对照导入台账跳过未变化的文件（在解析之前完成，不会打开工作簿）
+        
+        Returns:
+            需要导入的文件路径列表
+        """
+        to_import = []
+        for file_path in file_paths:
             if not self._is_running:
                 break
             
+            filename = os.path.basename(file_path)
             try:
-                # 发送进度信号
-                import os
-                filename = os.path.basename(file_path)
-                self.progress_updated.emit(idx + 1, total_files, filename)
-                
-                # 解析Excel
-                df, trade_date = self.excel_parser.parse_excel(file_path, self.column_mapping)
-                
-                if trade_date is None:
-                    raise ValueError("无法提取交易日期")
-                
-                # 插入数据库
-                inserted, skipped = self.db_manager.insert_batch(df, trade_date)
-                
-                # 记录导入历史
-                self.db_manager.add_import_history(
-                    filename, trade_date, inserted, 'success', None
+                record, signature = self.db_manager.find_unchanged_import(
+                    file_path, self.excel_parser.extract_date_from_filename(filename)
                 )
-                
-                # 发送文件导入完成信号
-                self.file_imported.emit(
-                    filename, inserted, True, 
-                    f"成功导入 {inserted} 条，跳过 {skipped} 条"
+            except OSError as e:
+                logging.warning(f"读取文件信息失败: {file_path}, 错误: {str(e)}")
+                to_import.append(file_path)
+                continue
+            
+            self._signatures[file_path] = signature
+            
+            if record is None or self.force:
+                to_import.append(file_path)
+                continue
+            
+            # 文件被移动或修改时间变化但内容相同，记录新的签名以便下次快速命中
+            if record['matched_by'] == 'hash':
+                self.db_manager.add_import_history(
+                    filename, record['trade_date'], 0, 'unchanged', None, signature
                 )
+            
+            self.skipped_count += 1
+            self.progress_updated.emit(self.skipped_count, total_files, filename)
+            self.file_imported.emit(
+                filename, 0, True,
+                f"文件未变化，已跳过（{record['trade_date']}，上次导入于 {record['import_date']}）"
+            )
+        
+        return to_import
+    
+    def run(self):
+        """执行批量导入"""
+        start = time.perf_counter()
+        file_paths = self._ordered_file_paths()
+        total_files = len(file_paths)
+        success_count = 0
+        fail_count = 0
+        total_records = 0
+        unparsable_cells = 0
+        
+        file_paths = self._filter_unchanged(file_paths, total_files)
+        
+        # 各文件逐个提交，派生数据（交易日历、板块、汇总等）在全部写入后一次刷新
+        with self.db_manager.deferred_maintenance():
+            for offset, (file_path, parsed, error) in enumerate(self._iter_parsed(file_paths)):
+                if not self._is_running:
+                    break
                 
-                success_count += 1
-                total_records += inserted
-                
-            except Exception as e:
-                error_msg = str(e)
-                logging.error(f"导入文件失败: {file_path}, 错误: {error_msg}")
+                idx = self.skipped_count + offset
+                filename = os.path.basename(file_path)
+                trade_date = None
                 
-                # 记录导入历史
                 try:
+                    # 发送进度信号（解析结果返回后、写入之前）
+                    self.progress_updated.emit(idx + 1, total_files, filename)
+                    
+                    if error is not None:
+                        raise error
+                    
+                    df, trade_date, parse_stats = parsed
+                    unparsable_cells += parse_stats.get('unparsable_cells', 0)
+                    
+                    if trade_date is None:
+                        raise ValueError("无法提取交易日期")
+                    
+                    # 插入数据库
+                    insert_stats = {}
+                    inserted, skipped = self.db_manager.insert_batch(df, trade_date, stats=insert_stats)
+                    metrics = build_file_metrics(filename, trade_date, inserted, parse_stats, insert_stats)
+                    
+                    # 记录导入历史
                     self.db_manager.add_import_history(
-                        filename, None, 0, 'failed', error_msg
+                        filename, trade_date, inserted, 'success', None,
+                        self._signatures.get(file_path), metrics
                     )
-                except:
-                    pass
-                
-                # 发送文件导入失败信号
-                self.file_imported.emit(filename, 0, False, error_msg)
-                fail_count += 1
+                    
+                    # 发送文件导入完成信号
+                    self.metrics.append(metrics)
+                    self.file_metrics.emit(metrics)
+                    logging.info(f"导入指标: {filename}, {format_metrics(metrics)}")
+                    self.file_imported.emit(filename, inserted, True, f"成功导入 {inserted} 条，跳过 {skipped} 条")
+                    
+                    success_count += 1
+                    total_records += inserted
+                    
+                except Exception as e:
+                    error_msg = str(e)
+                    logging.error(f"导入文件失败: {file_path}, 错误: {error_msg}")
+                    
+                    # 记录导入历史
+                    try:
+                        self.db_manager.add_import_history(
+                            filename, trade_date, 0, 'failed', error_msg
+                        )
+                    except:
+                        pass
+                    
+                    # 发送文件导入失败信号
+                    self.file_imported.emit(filename, 0, False, error_msg)
+                    fail_count += 1
+        
+        # 本线程即将结束，关闭它在连接池中的读连接
+        self.db_manager.release_thread_connection()
+        
+        logging.info(
+            "批量导入完成: 成功 %d 个文件，失败 %d 个，跳过 %d 个，共 %d 条记录，无法解析的单元格 %d 个，耗时 %.1f 秒",
+            success_count, fail_count, self.skipped_count, total_records, unparsable_cells,
+            time.perf_counter() - start
+        )
         
         # 发送全部完成信号
         self.all_completed.emit(success_count, fail_count, total_records)
 
+
+class ExportWorker(QThread):
+    """
+    导出工作线程
+    
+    在后台线程中按块读取查询结果并写入导出文件，不经过界面上已加载的数据，
+    导出的行数不受显示行数限制，内存占用与导出行数无关。
+    """
+    # 信号定义
+    progress_updated = pyqtSignal(int, int)  # (已导出行数, 总行数)
+    export_completed = pyqtSignal(int, str, float)  # (导出行数, 文件路径, 耗时秒数)
+    export_failed = pyqtSignal(str)  # 导出失败，返回错误信息
+    export_cancelled = pyqtSignal()  # 导出已取消（未完成的文件已删除）
+    
+    def __init__(self, db_manager, file_path, export_format, columns, start_date, end_date,
+                 stock_code=None, sector=None, headers=None):
+        """
+        初始化导出线程
+        
+        Args:
+            db_manager: 数据库管理器
+            file_path: 导出文件路径
+            export_format: 导出格式（xlsx / csv / parquet）
+            columns: 导出的列
+            start_date: 开始日期
+            end_date: 结束日期
+            stock_code: 股票代码（可选）
+            sector: 板块（可选）
+            headers: 表头（默认使用列名）
+        """
+        super().__init__()
+        self.db_manager = db_manager
+        self.file_path = file_path
+        self.export_format = export_format
+        self.columns = columns
+        self.start_date = start_date
+        self.end_date = end_date
+        self.stock_code = stock_code
+        self.sector = sector
+        self.headers = headers
+        self._is_running = True
+    
+    def stop(self):
+        """停止导出（正在执行的查询会被中断）"""
+        self._is_running = False
+    
+    def run(self):
+        """执行导出"""
+        start = time.perf_counter()
+        writer = None
+        chunks = None
+        completed = False
+        try:
+            writer = create_export_writer(self.file_path, self.export_format, self.columns, self.headers)
+            with self.db_manager.cancellable(lambda: not self._is_running):
+                total = self.db_manager.count_date_range(
+                    self.start_date, self.end_date, self.stock_code, self.sector
+                )
+                self.progress_updated.emit(0, total)
+                
+                chunks = self.db_manager.iter_date_range(
+                    self.start_date, self.end_date, self.stock_code, self.sector, self.columns
+                )
+                for chunk in chunks:
+                    if not self._is_running:
+                        break
+                    writer.write(chunk)
+                    self.progress_updated.emit(writer.rows_written, max(total, writer.rows_written))
+                
+                if self._is_running:
+                    writer.finish()
+                    completed = True
+            
+            if completed:
+                self.export_completed.emit(writer.rows_written, self.file_path, time.perf_counter() - start)
+            else:
+                logging.info(f"导出已取消: {self.file_path}, 已写入 {writer.rows_written} 行")
+                writer.abort()
+                self.export_cancelled.emit()
+        except Exception as e:
+            if writer is not None and not completed:
+                writer.abort()
+            if not self._is_running:
+                # 取消时正在执行的查询被中断
+                self.export_cancelled.emit()
+            else:
+                error_msg = f"导出失败: {str(e)}"
+                logging.error(error_msg)
+                self.export_failed.emit(error_msg)
+        finally:
+            if chunks is not None:
+                chunks.close()
+            # 本线程即将结束，关闭它在连接池中的读连接
+            self.db_manager.release_thread_connection()